@@ -0,0 +1,137 @@
+"""Ticks/s against client count for the tick broadcast path.
+
+Compares the previous path (decode, re-encode per tick and once more per
+client) with the current one, where every tick is read as raw bytes and
+the same buffer is written to all clients.
+
+Run from ./backend/:  python -m benchmarks.broadcast_bench
+"""
+
+import json
+import time
+import ijson
+import asyncio
+import argparse
+from pathlib import Path
+from tornado.escape import utf8
+from tornado.ioloop import IOLoop
+from demodata_server import DemodataServer
+from .common import demo_ticks_files, write_results
+
+
+class BenchClient:
+    """Stands in for DemoDataWSH, encoding messages like a websocket."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def write_message(self, message, binary=False):
+        message = utf8(message)
+        self.frames += 1
+        self.bytes += len(message)
+
+
+def legacy_ticks(ticks_filename: Path):
+    """The previous _ticks_chopper: ijson items re-encoded as str."""
+    with open(ticks_filename, "r") as file:
+        for tick in ijson.items(file, "ticks.item", use_float=True):
+            yield json.dumps(tick)
+
+
+async def legacy_transmit(client: BenchClient, tick: dict) -> None:
+    """The previous _transmit_ticks: one json.dumps per client."""
+    await client.write_message(json.dumps(tick))
+
+
+async def drain(clients: list[BenchClient], expected_frames: int) -> None:
+    """Runs the event loop until every client has received its frames."""
+    while any(client.frames < expected_frames for client in clients):
+        await asyncio.sleep(0)
+
+
+async def run_legacy(
+    ticks_filename: Path, clients: list[BenchClient], burst_size: int
+) -> int:
+    sent = 0
+    ticks = legacy_ticks(ticks_filename)
+    while True:
+        burst = []
+        for tick in ticks:
+            burst.append(json.loads(tick))
+            if len(burst) == burst_size:
+                break
+        if not burst:
+            return sent
+        for client in clients:
+            for tick in burst:
+                IOLoop.current().add_callback(legacy_transmit, client, tick)
+        sent += len(burst)
+        await drain(clients, sent)
+
+
+async def run_broadcast(
+    ticks_filename: Path, clients: list[BenchClient], burst_size: int
+) -> int:
+    sent = 0
+    server = DemodataServer()
+    server.ticks_file(ticks_filename)
+    server._read_source()
+    server.burst_size = burst_size
+    server.queue_size = burst_size
+    for client in clients:
+        server._add_session(client, server.source)
+    while True:
+        burst_length = 0
+        for client, session in server.sessions.items():
+            burst = session.next_burst()
+            server._send_burst_data(client, burst)
+            burst_length = len(burst)
+        if not burst_length:
+            return sent
+        sent += burst_length
+        await drain(clients, sent)
+
+
+def measure(runner, ticks_filename: Path, client_count: int, burst_size: int):
+    clients = [BenchClient() for _ in range(client_count)]
+    start = time.perf_counter()
+    ticks = asyncio.run(runner(ticks_filename, clients, burst_size))
+    elapsed = time.perf_counter() - start
+    return ticks, elapsed, clients[0].bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--clients", type=int, nargs="+", default=[1, 5, 20, 50, 100]
+    )
+    parser.add_argument("--burst", type=int, default=16)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        for client_count in args.clients:
+            for name, runner in (
+                ("legacy", run_legacy),
+                ("broadcast", run_broadcast),
+            ):
+                ticks, elapsed, client_bytes = measure(
+                    runner, ticks_filename, client_count, args.burst
+                )
+                results.append(
+                    {
+                        "demo": ticks_filename.stem,
+                        "path": name,
+                        "clients": client_count,
+                        "ticks": ticks,
+                        "ticks_per_s": ticks / elapsed,
+                        "client_mb": client_bytes / 1e6,
+                    }
+                )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Loop mode passes over a demo with different tick cache budgets.
+
+Every pass reads the whole demo like a looping session. With a budget
+that fits the demo, passes after the first are served from memory.
+
+Run from ./backend/:  python -m benchmarks.cache_bench
+"""
+
+import time
+import argparse
+from demodata_server.source import TickSource
+from demodata_server.tick_cache import TickCache
+from .common import demo_ticks_files, write_results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument(
+        "--budgets-mb", type=int, nargs="+", default=[0, 8, 256]
+    )
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        for budget_mb in args.budgets_mb:
+            cache = TickCache(budget_mb << 20)
+            source = TickSource(ticks_filename, cache=cache).load()
+            pass_times = []
+            for _ in range(args.passes):
+                start = time.perf_counter()
+                for entry in range(0, len(source), source.chunk_size):
+                    source.read(entry, source.chunk_size)
+                pass_times.append(time.perf_counter() - start)
+            stats = cache.stats()
+            results.append(
+                {
+                    "demo": ticks_filename.stem,
+                    "budget_mb": budget_mb,
+                    "first_pass_ms": pass_times[0] * 1000,
+                    "next_passes_ms": sum(pass_times[1:])
+                    / max(1, len(pass_times) - 1)
+                    * 1000,
+                    "hit_rate": stats["hit_rate"],
+                    "cached_mb": stats["bytes"] / 1e6,
+                }
+            )
+            source.close()
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import json
+import random
+import logging
+import tempfile
+from pathlib import Path
+from demodata_parser import DemodataParser
+
+TEST_DEMOS = Path(__file__).parent.parent / "demofiles" / "test_demos"
+PARSER_LIBRARY = (
+    Path(__file__).parent.parent / "demodata_parser" / "demoparser.so"
+)
+
+
+def _synthetic_player(slot: int, tick: int) -> dict:
+    """Creates a moving player following the JSON specification."""
+    return {
+        "sid": 76561198000000000 + slot,
+        "name": f"player_{slot}",
+        "clan": "Team A" if slot < 5 else "Team B",
+        "team": "T" if slot < 5 else "CT",
+        "hp": 100 - (tick // 64 + slot) % 100,
+        "money": 800 + 50 * slot,
+        "x": -1000.0 + slot * 100 + random.random() * tick % 500,
+        "y": -2000.0 + random.random() * 100,
+        "z": -160.03125,
+        "view_x": random.uniform(0, 360),
+        "view_y": random.uniform(-90, 90),
+        "actv_itm": "AK-47" if slot < 5 else "M4A4",
+        "items": ["Knife", "Glock-18", "AK-47" if slot < 5 else "M4A4"],
+        "helmet": True,
+        "armor": 100,
+        "kit": slot >= 5,
+        "is_ducking": False,
+        "is_walking": False,
+        "is_standing": True,
+        "is_air": False,
+        "is_rld": False,
+        "kills": tick // 5000,
+        "deaths": tick // 7000,
+        "assists": 0,
+        "dmg": tick // 50,
+        "adr": tick / 5000,
+        "is_planting": False,
+        "is_defusing": False,
+    }
+
+
+def synthetic_tick(tick: int) -> dict:
+    """Creates a ten player tick following the JSON specification."""
+    return {
+        "tick": tick,
+        "round_time": tick / 64,
+        "round_start": tick % 6400 == 0,
+        "switch": False,
+        "is_freeze": tick % 6400 < 960,
+        "is_halftime": False,
+        "t": "Team A",
+        "ct": "Team B",
+        "t_wins": tick // 12800,
+        "ct_wins": tick // 19200,
+        "players": [_synthetic_player(slot, tick) for slot in range(10)],
+        "shooting": [76561198000000003] if tick % 7 == 0 else None,
+        "kills": None,
+        "nades": None,
+        "infernos": None,
+        "nade_event": None,
+        "bomb": {
+            "carrier": "player_2",
+            "x": 392.8011474609375,
+            "y": 336.8455810546875,
+            "z": -251.96875,
+            "planted": False,
+            "defused": False,
+            "exploded": False,
+            "planted_by": "",
+            "defused_by": "",
+        },
+    }
+
+
+def synthetic_ticks_file(filename: Path, total_ticks: int) -> Path:
+    """Writes synthetic ticks and config using the Go parser's layout."""
+    random.seed(total_ticks)
+    with open(filename, "w") as f:
+        f.write('{"ticks": [\n')
+        for tick in range(total_ticks):
+            if tick:
+                f.write(",\n")
+            f.write(json.dumps(synthetic_tick(tick), separators=(",", ":")))
+        f.write("\n]}")
+    config = {
+        "tickrate": 64,
+        "total_ticks": total_ticks,
+        "map_name": "de_mirage",
+        "round_time": 115,
+        "freeze_time": 15,
+        "bomb_time": 40,
+    }
+    with open(filename.with_name(f"{filename.stem}_config.json"), "w") as f:
+        json.dump(config, f)
+    return filename
+
+
+def demo_ticks_files(synthetic_ticks: int = 20000) -> list[Path]:
+    """Returns parsed $.json files of the test demos.
+
+    Demos are parsed with DemodataParser when the Go library has been
+    built. Without it, a single synthetic demo is written to a temporary
+    folder so the benchmarks can still be run.
+    """
+    ticks_files = []
+    for demo_filename in sorted(TEST_DEMOS.glob("*.dem")):
+        parser = DemodataParser()
+        parser.demofile(demo_filename)
+        json_filename = parser.parse_filename()
+        if json_filename.exists() or (
+            PARSER_LIBRARY.exists() and parser.parse()
+        ):
+            ticks_files.append(json_filename)
+    if not ticks_files:
+        logging.warning(
+            "BENCHMARK - No parsed test demos, using a synthetic demo"
+        )
+        tmp_dir = Path(tempfile.mkdtemp(prefix="eeict_bench_"))
+        ticks_files.append(
+            synthetic_ticks_file(tmp_dir / "synthetic.json", synthetic_ticks)
+        )
+    return ticks_files
+
+
+def write_results(results: list[dict], output: str | None) -> None:
+    """Prints results as a table and optionally writes them as JSON."""
+    if results:
+        keys = list(results[0].keys())
+        print(" | ".join(keys))
+        for row in results:
+            print(
+                " | ".join(
+                    (
+                        f"{row[key]:.2f}"
+                        if isinstance(row[key], float)
+                        else str(row[key])
+                    )
+                    for key in keys
+                )
+            )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=4)
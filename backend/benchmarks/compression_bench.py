@@ -0,0 +1,112 @@
+"""Bytes and CPU per tick of permessage-deflate and batched frames.
+
+Frames of a demo are made by a PlaybackSession in full and delta stream
+mode, with a frame per tick or a frame per burst (batch), and compressed
+the way tornado does permessage-deflate: a raw deflate stream flushed
+with Z_SYNC_FLUSH after every frame, with the 4 byte flush trailer
+removed. Without context takeover every frame gets a new compressor.
+Bytes include the websocket frame header of every frame.
+
+Run from ./backend/:  python -m benchmarks.compression_bench
+"""
+
+import time
+import zlib
+import argparse
+from demodata_server.session import PlaybackSession
+from demodata_server.source import TickSource
+from .common import demo_ticks_files, write_results
+
+# Compression level (None: off), mem_level, context takeover
+SETTINGS = (
+    (None, 8, True),
+    (1, 8, True),
+    (6, 8, True),
+    (9, 8, True),
+    (6, 4, True),
+    (1, 8, False),
+    (6, 8, False),
+)
+
+
+def frame_header_size(payload_size: int) -> int:
+    """Returns the size of an unmasked (server) websocket frame header."""
+    if payload_size < 126:
+        return 2
+    if payload_size < 1 << 16:
+        return 4
+    return 10
+
+
+def session_frames(
+    ticks_filename, mode: str, batch: bool, max_ticks: int, burst: int
+) -> tuple[list[bytes], int]:
+    """Returns the frames a session sends and the number of ticks."""
+    source = TickSource(ticks_filename).load()
+    session = PlaybackSession(source, burst, batch=batch)
+    session.set_mode(mode)
+    frames = []
+    while not session.ended and session.cursor < max_ticks:
+        frames.extend(session.next_burst())
+    source.close()
+    return frames, session.cursor
+
+
+def compressed_size(
+    frames: list[bytes], level: int | None, mem_level: int, takeover: bool
+) -> tuple[int, float]:
+    """Returns the bytes on the wire and the CPU seconds to compress."""
+    start = time.process_time()
+    total = 0
+    compressor = None
+    for frame in frames:
+        if level is not None:
+            if compressor is None or not takeover:
+                compressor = zlib.compressobj(
+                    level, zlib.DEFLATED, -zlib.MAX_WBITS, mem_level
+                )
+            frame = compressor.compress(frame) + compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+            frame = frame[:-4]
+        total += len(frame) + frame_header_size(len(frame))
+    return total, time.process_time() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--burst", type=int, default=16)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        for mode in ("full", "delta"):
+            for batch in (False, True):
+                frames, ticks = session_frames(
+                    ticks_filename, mode, batch, args.ticks, args.burst
+                )
+                uncompressed, _ = compressed_size(frames, None, 8, True)
+                for level, mem_level, takeover in SETTINGS:
+                    total, cpu_s = compressed_size(
+                        frames, level, mem_level, takeover
+                    )
+                    results.append(
+                        {
+                            "demo": ticks_filename.stem,
+                            "mode": mode,
+                            "batch": batch,
+                            "level": "off" if level is None else level,
+                            "mem_level": mem_level,
+                            "takeover": takeover,
+                            "bytes_per_tick": total / ticks,
+                            "ratio": uncompressed / total,
+                            "cpu_us_per_tick": cpu_s / ticks * 1e6,
+                        }
+                    )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
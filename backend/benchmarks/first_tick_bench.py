@@ -0,0 +1,136 @@
+"""Time to first tick, parsing the whole demo first or streaming while parsing.
+
+With the Go library built, the test demos are parsed again with
+DemodataParser. Without it, a parser is simulated by a process writing
+synthetic ticks in the Go parser's layout at --parse-rate ticks/s.
+
+Run from ./backend/:  python -m benchmarks.first_tick_bench
+"""
+
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from multiprocessing import Process
+from demodata_parser import DemodataParser
+from demodata_parser.tick_index import parsing_filename
+from demodata_server.session import PlaybackSession
+from demodata_server.source import TickSource
+from .common import PARSER_LIBRARY, TEST_DEMOS, synthetic_tick, write_results
+
+
+def simulated_parser(
+    ticks_filename: Path, total_ticks: int, parse_rate: int
+) -> None:
+    """Writes ticks like the Go parser: one write per tick, config last."""
+    marker = parsing_filename(ticks_filename)
+    marker.touch()
+    start = time.perf_counter()
+    with open(ticks_filename, "wb", buffering=0) as file:
+        file.write(b'{"ticks": [\n')
+        for tick in range(total_ticks):
+            if tick:
+                file.write(b",\n")
+            file.write(
+                json.dumps(synthetic_tick(tick), separators=(",", ":")).encode(
+                    "utf-8"
+                )
+            )
+            # Keep to the parse rate
+            delay = start + (tick + 1) / parse_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        file.write(b"\n]}")
+    config = {"tickrate": 64, "total_ticks": total_ticks, "map_name": ""}
+    with open(
+        ticks_filename.with_name(f"{ticks_filename.stem}_config.json"), "w"
+    ) as f:
+        json.dump(config, f)
+    marker.unlink()
+
+
+def demo_parser(demo_filename: Path) -> None:
+    parser = DemodataParser()
+    parser.demofile(demo_filename, overwrite=True)
+    parser.parse()
+
+
+def parser_targets(args) -> list[tuple[str, Path, tuple]]:
+    """Returns (name, ticks file, parser process args) of each demo."""
+    targets = []
+    if PARSER_LIBRARY.exists():
+        for demo_filename in sorted(TEST_DEMOS.glob("*.dem")):
+            targets.append(
+                (
+                    demo_filename.stem,
+                    demo_filename.with_suffix(".json"),
+                    (demo_parser, (demo_filename,)),
+                )
+            )
+    if not targets:
+        ticks_filename = Path(tempfile.mkdtemp()) / "synthetic.json"
+        targets.append(
+            (
+                "synthetic",
+                ticks_filename,
+                (
+                    simulated_parser,
+                    (ticks_filename, args.ticks, args.parse_rate),
+                ),
+            )
+        )
+    return targets
+
+
+def first_tick(ticks_filename: Path, parser, streaming: bool) -> dict:
+    """Starts the parser and measures when a session gets its first burst."""
+    target, target_args = parser
+    parsing_filename(ticks_filename).unlink(missing_ok=True)
+    start = time.perf_counter()
+    process = Process(target=target, args=target_args)
+    process.start()
+    if streaming:
+        while (
+            process.is_alive()
+            and not parsing_filename(ticks_filename).exists()
+        ):
+            time.sleep(0.001)
+        source = TickSource(ticks_filename, growing=True).load()
+        while not len(source):
+            time.sleep(0.005)
+            source.refresh()
+    else:
+        process.join()
+        source = TickSource(ticks_filename).load()
+    burst = PlaybackSession(source).next_burst()
+    first_tick_s = time.perf_counter() - start
+    process.join()
+    parse_s = time.perf_counter() - start
+    source.close()
+    assert burst, "No ticks received"
+    return {"first_tick_s": first_tick_s, "parse_s": parse_s}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--parse-rate", type=int, default=10000)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for name, ticks_filename, target in parser_targets(args):
+        for mode, streaming in (("parse first", False), ("streaming", True)):
+            results.append(
+                {
+                    "demo": name,
+                    "mode": mode,
+                    **first_tick(ticks_filename, target, streaming),
+                }
+            )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""Load test of the demodata server with hundreds of websocket clients.
+
+Replays the parsed test demos (or a synthetic demo) through
+DemodataServer, running in its own process(es) like `eeict.py -l`, to
+websocket clients simulated by separate client processes. Reports:
+
+- ticks_per_s and mb_per_s: frames and bytes delivered to all clients,
+  and paced_ticks_per_s, the ticks per second the clients would get on
+  the 1/tickrate schedule, which bounds ticks_per_s
+- jitter_p50_ms and jitter_p99_ms: how far the time between two ticks
+  received by a client is from their distance on the 1/tickrate
+  schedule (at the playback speed); ticks are sent in bursts, so use
+  --burst 1 to measure the pacing of single ticks
+- server_rss_mb, rss_per_client_kb: peak resident memory of the server
+  processes, and its growth per connected client
+- server_cpu_pct: CPU time of the server processes over the run, and
+  worker_cpu_pct of each worker, which shows how the clients spread
+  over the workers
+- client_cpu_pct: CPU time of the client processes over the run; when
+  it nears 100 per client process, the clients are the bottleneck
+
+Results are written as JSON with --output. With --baseline, results are
+compared to an earlier output, and the run fails if throughput falls or
+p99 jitter grows by more than --tolerance.
+
+Run from ./backend/:  python -m benchmarks.load_test --clients 100 300
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+from array import array
+from pathlib import Path
+from multiprocessing import Process, Queue
+from tornado.ioloop import IOLoop
+from tornado.websocket import websocket_connect
+from demodata_server import DemodataServer
+from demodata_server.coordinator import LiveCoordinator
+from .common import demo_ticks_files, write_results
+
+ENDPOINT = "/demodata"
+TICK_PREFIX = b'{"tick":'
+# Rows of a baseline are compared by these keys
+RUN_KEYS = ("demo", "workers", "clients")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_worker(
+    ticks_filename: Path,
+    port: int,
+    speed: float,
+    burst_size: int,
+    coordinator: LiveCoordinator | None,
+    ready,
+) -> None:
+    """Runs a server process in loop mode, as started by eeict.py.
+
+    Puts its pid to ready once it is listening.
+    """
+    server = DemodataServer()
+    server.ticks_file(ticks_filename)
+    IOLoop.current().add_callback(ready.put, os.getpid())
+    server.start_server(
+        "127.0.0.1",
+        port,
+        ENDPOINT,
+        loop_mode=True,
+        burst_size=burst_size,
+        speed=speed,
+        coordinator=coordinator,
+    )
+
+
+def process_usage(pid: int) -> dict:
+    """Returns RSS, peak RSS (bytes) and CPU time (s) of a process."""
+    usage = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                usage[key] = int(value.split()[0]) * 1024
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    usage["cpu_s"] = (int(fields[11]) + int(fields[12])) / os.sysconf(
+        "SC_CLK_TCK"
+    )
+    return usage
+
+
+def frame_tick(frame: bytes | str) -> int | None:
+    """Returns the tick of a full tick frame without decoding it."""
+    if isinstance(frame, str):
+        frame = frame.encode("utf-8")
+    if not frame.startswith(TICK_PREFIX):
+        return None
+    end = frame.index(b",", len(TICK_PREFIX))
+    return int(frame[len(TICK_PREFIX) : end])
+
+
+class ClientRecorder:
+    """Counts the frames of a client and the jitter between its ticks."""
+
+    def __init__(self, ticks_per_s: float):
+        self.ticks_per_s: float = ticks_per_s
+        self.frames: int = 0
+        self.bytes: int = 0
+        self.jitter = array("d")  # Seconds
+        self._previous: tuple[int, float] | None = None
+
+    def record(self, frame: bytes | str, arrival: float) -> None:
+        self.frames += 1
+        self.bytes += len(frame)
+        tick = frame_tick(frame)
+        if tick is None:
+            return
+        if self._previous is not None and tick > self._previous[0]:
+            previous_tick, previous_arrival = self._previous
+            expected = (tick - previous_tick) / self.ticks_per_s
+            self.jitter.append(abs(arrival - previous_arrival - expected))
+        self._previous = (tick, arrival)
+
+
+async def receive(
+    url: str, clients: int, seconds: float, ticks_per_s: float
+) -> list[ClientRecorder]:
+    """Connects clients and records the frames of those that connected."""
+    connections = [
+        connection
+        for connection in await asyncio.gather(
+            *(websocket_connect(url) for _ in range(clients)),
+            return_exceptions=True,
+        )
+        if not isinstance(connection, BaseException)
+    ]
+    deadline = time.monotonic() + seconds
+
+    async def read(connection) -> ClientRecorder:
+        recorder = ClientRecorder(ticks_per_s)
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                frame = await asyncio.wait_for(
+                    connection.read_message(), remaining
+                )
+            except asyncio.TimeoutError:
+                break
+            if frame is None:
+                break
+            recorder.record(frame, time.monotonic())
+        return recorder
+
+    recorders = await asyncio.gather(
+        *(read(connection) for connection in connections)
+    )
+    for connection in connections:
+        connection.close()
+    return recorders
+
+
+def client_process(
+    url: str, clients: int, seconds: float, ticks_per_s: float, queue
+) -> None:
+    """Runs clients and puts their results to queue.
+
+    The results are the clients that connected, their frames, bytes and
+    jitter, and the CPU time of the process.
+    """
+    recorders = asyncio.run(receive(url, clients, seconds, ticks_per_s))
+    jitter = array("d")
+    for recorder in recorders:
+        jitter.extend(recorder.jitter)
+    queue.put(
+        (
+            len(recorders),
+            sum(recorder.frames for recorder in recorders),
+            sum(recorder.bytes for recorder in recorders),
+            jitter.tobytes(),
+            time.process_time(),
+        )
+    )
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, round(p * (len(values) - 1)))]
+
+
+def run(
+    ticks_filename: Path,
+    workers: int = 1,
+    clients: int = 100,
+    client_processes: int = 2,
+    speed: float = 1.0,
+    seconds: float = 10.0,
+    burst_size: int = 16,
+    tickrate: int = 64,
+) -> dict:
+    """Runs the server and the clients once, returns the measurements."""
+    port = free_port()
+    coordinator = LiveCoordinator() if workers > 1 else None
+    ready = Queue()
+    servers = [
+        Process(
+            target=server_worker,
+            args=(
+                ticks_filename,
+                port,
+                speed,
+                burst_size,
+                coordinator,
+                ready,
+            ),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for server in servers:
+        server.start()
+    for _ in servers:
+        # Clients connected before a worker listens would all go to the
+        # others
+        ready.get(timeout=30)
+    before = [process_usage(server.pid) for server in servers]
+    queue = Queue()
+    url = f"ws://127.0.0.1:{port}{ENDPOINT}"
+    client_processes = max(1, min(client_processes, clients))
+    per_process, remainder = divmod(clients, client_processes)
+    receivers = [
+        Process(
+            target=client_process,
+            args=(
+                url,
+                per_process + (number < remainder),
+                seconds,
+                tickrate * speed,
+                queue,
+            ),
+        )
+        for number in range(client_processes)
+    ]
+    start = time.monotonic()
+    for receiver in receivers:
+        receiver.start()
+    received = [queue.get() for _ in receivers]
+    elapsed = time.monotonic() - start
+    after = [process_usage(server.pid) for server in servers]
+    for receiver in receivers:
+        receiver.join()
+    for server in servers:
+        server.terminate()
+        server.join()
+    connected = sum(count for count, _, _, _, _ in received)
+    frames = sum(frames for _, frames, _, _, _ in received)
+    sent_bytes = sum(sent_bytes for _, _, sent_bytes, _, _ in received)
+    client_cpu_s = sum(cpu_s for _, _, _, _, cpu_s in received)
+    jitter = array("d")
+    for _, _, _, samples, _ in received:
+        jitter.frombytes(samples)
+    jitter = sorted(jitter)
+    rss = sum(usage["VmRSS"] for usage in before)
+    peak_rss = sum(usage["VmHWM"] for usage in after)
+    worker_cpu_s = [
+        usage["cpu_s"] - previous["cpu_s"]
+        for previous, usage in zip(before, after)
+    ]
+    cpu_s = sum(worker_cpu_s)
+    return {
+        "demo": ticks_filename.stem,
+        "workers": workers,
+        "clients": connected,
+        "ticks_per_s": frames / seconds,
+        "paced_ticks_per_s": connected * tickrate * speed,
+        "mb_per_s": sent_bytes / 1e6 / seconds,
+        "jitter_p50_ms": percentile(jitter, 0.5) * 1000,
+        "jitter_p99_ms": percentile(jitter, 0.99) * 1000,
+        "server_rss_mb": peak_rss / 1e6,
+        "rss_per_client_kb": (
+            max(0, peak_rss - rss) / max(1, connected) / 1e3
+        ),
+        "server_cpu_pct": 100 * cpu_s / elapsed,
+        "worker_cpu_pct": [
+            round(100 * worker_s / elapsed, 1) for worker_s in worker_cpu_s
+        ],
+        "client_cpu_pct": 100 * client_cpu_s / elapsed,
+    }
+
+
+def regressions(
+    results: list[dict], baseline: list[dict], tolerance: float
+) -> list[str]:
+    """Compares results to a baseline run with the same demo and load."""
+    previous = {tuple(row[key] for key in RUN_KEYS): row for row in baseline}
+    found = []
+    for row in results:
+        old = previous.get(tuple(row[key] for key in RUN_KEYS))
+        if old is None:
+            continue
+        if row["ticks_per_s"] < old["ticks_per_s"] * (1 - tolerance):
+            found.append(
+                f"{row['demo']}, {row['clients']} clients: ticks/s "
+                f"{old['ticks_per_s']:.0f} -> {row['ticks_per_s']:.0f}"
+            )
+        if row["jitter_p99_ms"] > old["jitter_p99_ms"] * (1 + tolerance):
+            found.append(
+                f"{row['demo']}, {row['clients']} clients: p99 jitter "
+                f"{old['jitter_p99_ms']:.2f} -> {row['jitter_p99_ms']:.2f} ms"
+            )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--burst", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        with open(
+            ticks_filename.with_name(f"{ticks_filename.stem}_config.json")
+        ) as f:
+            tickrate = max(64, json.load(f)["tickrate"])
+        for clients in args.clients:
+            results.append(
+                run(
+                    ticks_filename,
+                    args.workers,
+                    clients,
+                    args.client_processes,
+                    args.speed,
+                    args.seconds,
+                    args.burst,
+                    tickrate,
+                )
+            )
+    write_results(results, args.output)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION: {regression}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
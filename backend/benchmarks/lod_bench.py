@@ -0,0 +1,79 @@
+"""Ticks and bytes sent per second of playback, with and without LOD tracks.
+
+Plays a demo at different speeds with a session on a simulated clock,
+reading every tick (lod 1) and reading the LOD track of the speed
+(auto). Reports the ticks and bytes sent and the CPU time spent per
+second of wall clock playback, and the time to write the tracks once.
+
+Run from ./backend/:  python -m benchmarks.lod_bench --speeds 1 2 4 8
+"""
+
+import time
+import argparse
+from pathlib import Path
+from demodata_parser.lod import LEVELS, write_tracks
+from demodata_server.session import PlaybackSession
+from demodata_server.source import TickSource
+from .common import demo_ticks_files, write_results
+
+
+def play(
+    source: TickSource, speed: float, lod: int | None, seconds: float
+) -> dict:
+    """Plays seconds of wall clock time, one server interval at a time."""
+    now = [0.0]
+    session = PlaybackSession(source, clock=lambda: now[0])
+    session.set_rate(speed)
+    session.set_lod(lod)
+    interval = 1 / source.tickrate
+    ticks = 0
+    sent = 0
+    cpu = 0.0
+    while now[0] < seconds and not session.ended:
+        start = time.process_time()
+        frames = session.advance()
+        cpu += time.process_time() - start
+        ticks += len(frames)
+        sent += sum(len(frame) for frame in frames)
+        now[0] += interval
+    played = max(now[0], interval)
+    return {
+        "lod_level": session.track.level,
+        "ticks_per_s": ticks / played,
+        "kb_per_s": sent / played / 1e3,
+        "cpu_ms_per_s": cpu * 1000 / played,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--speeds", type=float, nargs="+", default=[1, 2, 4, 8]
+    )
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        start = time.perf_counter()
+        write_tracks(ticks_filename, LEVELS)
+        write_s = time.perf_counter() - start
+        for speed in args.speeds:
+            for lod in (1, None):
+                source = TickSource(ticks_filename).load()
+                results.append(
+                    {
+                        "demo": Path(ticks_filename).stem,
+                        "speed": speed,
+                        "lod": "auto" if lod is None else lod,
+                        **play(source, speed, lod, args.seconds),
+                        "write_tracks_s": write_s,
+                    }
+                )
+                source.close()
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Frames/s of the file and memory-mapped read paths, without caching.
+
+Reads every tick of the JSON and packed files as frames through a
+TickSource with an empty cache budget, so every chunk is read again, as
+with many demos or server processes that share one node.
+
+Run from ./backend/:  python -m benchmarks.mapped_bench
+"""
+
+import time
+import argparse
+from pathlib import Path
+from demodata_parser.packed import PackedWriter, packed_filename
+from demodata_server.source import TickSource
+from demodata_server.tick_cache import TickCache
+from .common import demo_ticks_files, write_results
+
+
+def read_frames(
+    ticks_filename: Path, packed: bool, mapped: bool, passes: int
+) -> float:
+    """Returns frames/s over every tick of the demo."""
+    source = TickSource(
+        ticks_filename, cache=TickCache(0), packed=packed, mapped=mapped
+    ).load()
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(passes):
+        for entry in range(0, len(source), source.chunk_size):
+            frames += len(source.read(entry, source.chunk_size))
+    elapsed = time.perf_counter() - start
+    source.close()
+    return frames / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        if not packed_filename(ticks_filename).exists():
+            PackedWriter().write(ticks_filename)
+        for packed in (False, True):
+            for mapped in (False, True):
+                results.append(
+                    {
+                        "demo": ticks_filename.stem,
+                        "file": "packed" if packed else "json",
+                        "reader": "mmap" if mapped else "read",
+                        "frames_per_s": read_frames(
+                            ticks_filename, packed, mapped, args.passes
+                        ),
+                    }
+                )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
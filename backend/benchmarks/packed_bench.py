@@ -0,0 +1,115 @@
+"""File size and decode ticks/s of the JSON and packed ticks files.
+
+"json frames" and "packed frames" are the frames the server streams:
+JSON lines are sent as read, packed records are decoded and encoded to
+JSON again, so streaming from the packed file is slower, and saves disk
+space and reads instead.
+
+Run from ./backend/:  python -m benchmarks.packed_bench
+"""
+
+import json
+import time
+import ijson
+import argparse
+from pathlib import Path
+from demodata_parser.packed import PackedWriter, packed_filename
+from demodata_parser.tick_index import TickIndex
+from demodata_server.packed_reader import PackedReader
+from demodata_server.source import TickSource
+from .common import demo_ticks_files, write_results
+
+
+def decode_ijson(ticks_filename: Path) -> int:
+    """The previous server read path: ijson items from the whole file."""
+    ticks = 0
+    with open(ticks_filename, "rb") as file:
+        for _ in ijson.items(file, "ticks.item", use_float=True):
+            ticks += 1
+    return ticks
+
+
+def decode_json_lines(ticks_filename: Path) -> int:
+    """json.loads on every tick line of the JSON file."""
+    ticks = 0
+    source = TickSource(ticks_filename).load()
+    for entry in range(0, len(source), source.chunk_size):
+        for frame in source.read(entry, source.chunk_size):
+            json.loads(frame)
+            ticks += 1
+    source.close()
+    return ticks
+
+
+def frames_json_lines(ticks_filename: Path) -> int:
+    """JSON lines read as frames, as streamed by the server."""
+    ticks = 0
+    source = TickSource(ticks_filename).load()
+    for entry in range(0, len(source), source.chunk_size):
+        ticks += len(source.read(entry, source.chunk_size))
+    source.close()
+    return ticks
+
+
+def decode_packed(ticks_filename: Path) -> int:
+    """PackedReader.decode on every record of the packed file."""
+    ticks = 0
+    packed_file = packed_filename(ticks_filename)
+    reader = PackedReader(packed_file)
+    index = TickIndex.read(TickIndex.index_filename(packed_file))
+    with open(packed_file, "rb") as file:
+        data = file.read()
+    for offset, length in zip(index.offsets, index.lengths):
+        reader.decode(data[offset : offset + length])
+        ticks += 1
+    return ticks
+
+
+def frames_packed(ticks_filename: Path) -> int:
+    """Packed records decoded to JSON frames, as streamed by the server."""
+    ticks = 0
+    source = TickSource(ticks_filename, packed=True).load()
+    for entry in range(0, len(source), source.chunk_size):
+        ticks += len(source.read(entry, source.chunk_size))
+    source.close()
+    return ticks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        start = time.perf_counter()
+        packed_file = PackedWriter().write(ticks_filename)
+        pack_s = time.perf_counter() - start
+        json_mb = ticks_filename.stat().st_size / 1e6
+        packed_mb = packed_file.stat().st_size / 1e6
+        for name, decode in (
+            ("ijson", decode_ijson),
+            ("json lines", decode_json_lines),
+            ("packed", decode_packed),
+            ("json frames", frames_json_lines),
+            ("packed frames", frames_packed),
+        ):
+            start = time.perf_counter()
+            ticks = decode(ticks_filename)
+            elapsed = time.perf_counter() - start
+            results.append(
+                {
+                    "demo": ticks_filename.stem,
+                    "decoder": name,
+                    "json_mb": json_mb,
+                    "packed_mb": packed_mb,
+                    "pack_s": pack_s,
+                    "ticks": ticks,
+                    "ticks_per_s": ticks / elapsed,
+                }
+            )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
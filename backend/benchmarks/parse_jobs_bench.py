@@ -0,0 +1,118 @@
+"""Jobs/s of the parse service against a new process per parse.
+
+Parses --jobs copies of a demo, the way eeict.py does (a new process per
+parse, one at a time), and with ParseJobs and different numbers of warm
+workers. With the Go library built, the test demos are parsed. Without
+it, copies of a synthetic demo are "parsed before", so a job writes the
+tick index and timeline, and the numbers show the overhead per job and
+the scaling of the work after the Go parser.
+
+Run from ./backend/:  python -m benchmarks.parse_jobs_bench
+"""
+
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from multiprocessing import Process
+from demodata_server.parse_jobs import ParseJobs, parse_job
+from .common import (
+    PARSER_LIBRARY,
+    TEST_DEMOS,
+    demo_ticks_files,
+    write_results,
+)
+
+
+def demo_copies(folder: Path, jobs: int) -> tuple[list[str], bool]:
+    """Copies a demo to folder.
+
+    Returns the names of the copies, and whether they are parsed again
+    (overwrite) or were "parsed before".
+    """
+    demos = sorted(TEST_DEMOS.glob("*.dem"))
+    names = [f"demo_{number}.dem" for number in range(jobs)]
+    if PARSER_LIBRARY.exists() and demos:
+        for name in names:
+            shutil.copyfile(demos[0], folder / name)
+        return names, True
+    ticks_filename = demo_ticks_files(synthetic_ticks=2000)[0]
+    for name in names:
+        (folder / name).touch()
+        shutil.copyfile(ticks_filename, (folder / name).with_suffix(".json"))
+    return names, False
+
+
+def clean(folder: Path) -> None:
+    """Removes the outputs of the previous run, but not "parsed" ticks."""
+    for pattern in ("*_index.bin", "*_timeline.json"):
+        for filename in folder.glob(pattern):
+            filename.unlink()
+
+
+def run_processes(folder: Path, names: list[str], overwrite: bool) -> float:
+    """Parses demos one at a time, each in a new process."""
+    start = time.perf_counter()
+    for name in names:
+        process = Process(target=parse_job, args=(folder / name, overwrite))
+        process.start()
+        process.join()
+    return time.perf_counter() - start
+
+
+def run_jobs(
+    folder: Path, names: list[str], overwrite: bool, workers: int
+) -> float:
+    """Parses demos with a ParseJobs of the given workers."""
+    parse_jobs = ParseJobs(folder, workers)
+
+    async def run() -> float:
+        start = time.perf_counter()
+        for name in names:
+            parse_jobs.submit(name, overwrite)
+        while parse_jobs.unfinished():
+            await asyncio.sleep(0.005)
+        return time.perf_counter() - start
+
+    try:
+        return asyncio.run(run())
+    finally:
+        parse_jobs.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    folder = Path(tempfile.mkdtemp(prefix="eeict_bench_"))
+    names, overwrite = demo_copies(folder, args.jobs)
+    results = []
+    runs = [("process per parse", 1, None)] + [
+        ("parse jobs", workers, workers) for workers in args.workers
+    ]
+    for name, workers, pool_workers in runs:
+        clean(folder)
+        if pool_workers is None:
+            seconds = run_processes(folder, names, overwrite)
+        else:
+            seconds = run_jobs(folder, names, overwrite, pool_workers)
+        results.append(
+            {
+                "run": name,
+                "workers": workers,
+                "jobs": len(names),
+                "seconds": seconds,
+                "jobs_per_s": len(names) / seconds,
+            }
+        )
+    shutil.rmtree(folder)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
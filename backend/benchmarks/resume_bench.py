@@ -0,0 +1,83 @@
+"""Latency of catching up a reconnected client, ring against a re-read.
+
+A session streams a demo in the delta stream mode, and a client that
+lost its connection reconnects having received up to some ticks back.
+The frames it missed are taken from the session's FrameRing, and for
+comparison the session seeks back and encodes the ticks again, with a
+cold cache (read from the ticks file) and a warm cache.
+
+Run from ./backend/:  python -m benchmarks.resume_bench --missed 16 128
+"""
+
+import time
+import argparse
+from demodata_server.session import PlaybackSession
+from demodata_server.source import TickSource
+from .common import demo_ticks_files, write_results
+
+
+def streamed_session(source: TickSource, ring_size: int) -> PlaybackSession:
+    """A delta stream session, a ring's worth of ticks into the demo."""
+    session = PlaybackSession(source, ring_size=ring_size)
+    session.set_mode("delta")
+    while len(session.recent) < ring_size and not session.ended:
+        session.next_burst()
+    return session
+
+
+def reread(session: PlaybackSession, last_tick: int, missed: int) -> int:
+    """Seeks back after the last tick received and encodes the ticks."""
+    cursor = session.cursor
+    session.seek(last_tick + 1)
+    frames = session.next_burst(missed)
+    session.cursor = cursor
+    return len(frames)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--missed", type=int, nargs="+", default=[16, 128])
+    parser.add_argument("--ring-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        source = TickSource(ticks_filename).load()
+        for missed in args.missed:
+            missed = min(missed, args.ring_size - 1)
+            runs = {"ring": [], "reread_cold": [], "reread_warm": []}
+            for _ in range(args.repeat):
+                session = streamed_session(source, args.ring_size)
+                last_tick = session.recent.frames[-missed - 1][0]
+                start = time.perf_counter()
+                frames = len(session.recent.since(last_tick))
+                runs["ring"].append(time.perf_counter() - start)
+                for run, cold in (
+                    ("reread_cold", True),
+                    ("reread_warm", False),
+                ):
+                    if cold:
+                        source.cache.clear()
+                    start = time.perf_counter()
+                    reread(session, last_tick, missed)
+                    runs[run].append(time.perf_counter() - start)
+            results.append(
+                {
+                    "demo": ticks_filename.stem,
+                    "missed": missed,
+                    "frames": frames,
+                    **{
+                        f"{run}_ms": sorted(latencies)[len(latencies) // 2]
+                        * 1000
+                        for run, latencies in runs.items()
+                    },
+                }
+            )
+        source.close()
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Seek latency percentiles, from a seek command to the first burst.
+
+Seeks to random ticks and to every round start through the tick index,
+with a cold cache (cleared before every seek) and a warm cache. For
+comparison, the previous way of finding a tick by reading the ticks file
+from the start is measured on a few seeks.
+
+Run from ./backend/:  python -m benchmarks.seek_bench
+"""
+
+import time
+import ijson
+import random
+import argparse
+from pathlib import Path
+from demodata_server.session import PlaybackSession
+from demodata_server.source import TickSource
+from .common import demo_ticks_files, write_results
+
+
+def percentiles(latencies: list[float]) -> dict:
+    """Returns p50/p95/p99/max of latencies in milliseconds."""
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        position = min(len(latencies) - 1, round(p * (len(latencies) - 1)))
+        return latencies[position] * 1000
+
+    return {
+        "seeks": len(latencies),
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def measure_index(session: PlaybackSession, targets: list, cold: bool):
+    latencies = []
+    for kind, target in targets:
+        if cold:
+            session.source.cache.clear()
+        start = time.perf_counter()
+        if kind == "round":
+            session.seek_round(target)
+        else:
+            session.seek(target)
+        burst = session.next_burst()
+        latencies.append(time.perf_counter() - start)
+        assert burst, f"Nothing after seek to {kind} {target}"
+    return latencies
+
+
+def measure_scan(ticks_filename: Path, targets: list, burst_size: int):
+    """The previous way: read the ticks from the start up to the target."""
+    latencies = []
+    for _, target in targets:
+        start = time.perf_counter()
+        burst = []
+        with open(ticks_filename, "rb") as file:
+            for tick in ijson.items(file, "ticks.item", use_float=True):
+                if tick["tick"] >= target or burst:
+                    burst.append(tick)
+                    if len(burst) == burst_size:
+                        break
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeks", type=int, default=1000)
+    parser.add_argument("--scan-seeks", type=int, default=5)
+    parser.add_argument("--burst", type=int, default=16)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = []
+    for ticks_filename in demo_ticks_files():
+        source = TickSource(ticks_filename).load()
+        session = PlaybackSession(source, args.burst)
+        ticks = source.index.ticks
+        targets = [
+            ("tick", random.randint(ticks[0], ticks[-1]))
+            for _ in range(args.seeks)
+        ]
+        targets += [
+            ("round", number)
+            for number in range(1, len(source.round_starts()) + 1)
+        ]
+        random.shuffle(targets)
+        for name, latencies in (
+            ("index, cold cache", measure_index(session, targets, True)),
+            ("index, warm cache", measure_index(session, targets, False)),
+            (
+                "scan from start",
+                measure_scan(
+                    ticks_filename,
+                    [t for t in targets if t[0] == "tick"][: args.scan_seeks],
+                    args.burst,
+                ),
+            ),
+        ):
+            results.append(
+                {
+                    "demo": ticks_filename.stem,
+                    "ticks": len(source),
+                    "path": name,
+                    **percentiles(latencies),
+                }
+            )
+        source.close()
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
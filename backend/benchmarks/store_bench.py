@@ -0,0 +1,81 @@
+"""Analytics queries on the columnar tick store against an ijson pass.
+
+Answers the same question, the seconds each CT player spent in a zone,
+with an ijson pass over $.json, and with TickStore queries. Reports the
+time to build the store once, to load it from $_store.npz, and per
+query. Needs numpy.
+
+Run from ./backend/:  python -m benchmarks.store_bench
+"""
+
+import time
+import ijson
+import argparse
+from pathlib import Path
+from demodata_parser.tick_store import TickStore, store_filename
+from .common import demo_ticks_files, write_results
+
+# A 500 x 500 square around the middle of the map
+ZONE = ((-250.0, 250.0), (-250.0, 250.0))
+
+
+def time_in_zone_ijson(ticks_filename: Path, tickrate: int) -> dict:
+    """The seconds each CT player spent in ZONE, one tick at a time."""
+    (x_min, x_max), (y_min, y_max) = ZONE
+    seconds = {}
+    with open(ticks_filename, "rb") as file:
+        for tick in ijson.items(file, "ticks.item", use_float=True):
+            for player in tick["players"] or ():
+                if (
+                    player["team"] == "CT"
+                    and player["hp"] > 0
+                    and x_min <= player["x"] <= x_max
+                    and y_min <= player["y"] <= y_max
+                ):
+                    name = player["name"]
+                    seconds[name] = seconds.get(name, 0.0) + 1 / tickrate
+    return seconds
+
+
+def timed(function, *args, **kwargs) -> float:
+    """Returns the milliseconds a call takes."""
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for ticks_filename in demo_ticks_files():
+        store_filename(ticks_filename).unlink(missing_ok=True)
+        build_ms = timed(TickStore.load, ticks_filename)
+        start = time.perf_counter()
+        store = TickStore.load(ticks_filename)
+        load_ms = (time.perf_counter() - start) * 1000
+        player = str(store.names[0])
+        results.append(
+            {
+                "demo": ticks_filename.stem,
+                "ticks": len(store),
+                "store_mb": store_filename(ticks_filename).stat().st_size
+                / 1e6,
+                "build_ms": build_ms,
+                "load_ms": load_ms,
+                "ijson_zone_ms": timed(
+                    time_in_zone_ijson, ticks_filename, store.tickrate
+                ),
+                "zone_ms": timed(store.time_in_zone, *ZONE, team="CT"),
+                "heatmap_ms": timed(store.heatmap, team="T"),
+                "series_ms": timed(store.series, "dmg", player),
+                "distance_ms": timed(store.distance_travelled),
+            }
+        )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Delivered ticks/s against the number of server worker processes.
+
+Starts the server as N worker processes sharing one port (SO_REUSEPORT)
+and a LiveCoordinator, like `eeict.py -n N -l`, and runs the clients of
+the load test against them. A single Python client process receives
+fewer ticks per second than a worker sends, so by default there are two
+client processes per worker, and the throughput scales with the workers
+up to the cores of the machine. worker_cpu_pct shows how the clients
+spread over the workers, and client_cpu_pct near 100 per client process
+means the clients, not the server, limit the throughput. Use enough
+clients that paced_ticks_per_s is above what one worker delivers.
+
+Run from ./backend/:  python -m benchmarks.workers_bench
+"""
+
+import argparse
+from .common import demo_ticks_files, write_results
+from .load_test import run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--client-processes", type=int, default=None)
+    parser.add_argument("--speed", type=float, default=8.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    ticks_filename = demo_ticks_files()[0]
+    results = []
+    for workers in args.workers:
+        result = run(
+            ticks_filename,
+            workers,
+            args.clients,
+            args.client_processes or 2 * workers,
+            args.speed,
+            args.seconds,
+        )
+        results.append(
+            {
+                key: result[key]
+                for key in (
+                    "demo",
+                    "workers",
+                    "clients",
+                    "ticks_per_s",
+                    "paced_ticks_per_s",
+                    "server_cpu_pct",
+                    "worker_cpu_pct",
+                    "client_cpu_pct",
+                )
+            }
+        )
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
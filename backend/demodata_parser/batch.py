@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from . import messages as msg
+from .parser import DemodataParser
+from .tick_index import TickIndex
+
+
+def content_hash(filename: Path, chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_demo(
+    demo_filename: Path,
+    cache_filename: Path,
+    packed: bool = False,
+    processors: list[str] | None = None,
+    lod_levels: list[int] | None = None,
+) -> dict:
+    """Parses a demo into the cache under its content hash (worker).
+
+    The Go parser writes its output next to the demo, so the demo is
+    linked into the cache as {hash}.dem for the parse, and the link is
+    removed afterwards.
+    """
+    start = time.perf_counter()
+    try:
+        os.link(demo_filename, cache_filename)
+    except OSError:
+        shutil.copyfile(demo_filename, cache_filename)
+    try:
+        parser = DemodataParser()
+        parser.demofile(
+            cache_filename,
+            overwrite=True,
+            packed=packed,
+            processors=processors,
+            lod_levels=lod_levels,
+        )
+        status = parser.parse()
+    finally:
+        cache_filename.unlink(missing_ok=True)
+    return {
+        "status": "parsed" if status else "failed",
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class BatchParser:
+    """Parses every demo of a folder in parallel, once per content.
+
+    Outputs are written to the cache folder as {hash}.json (with config,
+    index, packed, processed and LOD files), keyed by the SHA-256 of the demo.
+    Renamed and duplicate demos are not parsed again, while a changed demo
+    with the same name is. The manifest maps demo names to their hashes.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(
+        self,
+        cache_folder: Path,
+        workers: int | None = None,
+        packed: bool = False,
+        processors: list[str] | None = None,
+        lod_levels: list[int] | None = None,
+    ):
+        self.cache_folder: Path = cache_folder
+        self.workers: int = workers or os.cpu_count() or 1
+        self.packed: bool = packed
+        self.processors: list[str] = list(processors or [])
+        self.lod_levels: list[int] = list(lod_levels or [])
+        self.manifest: dict[str, str] = {}  # Demo name -> content hash
+
+    def _log(self, message: str, level: str = "info") -> None:
+        """Helper method for logging messages with class name."""
+        class_name = "BATCH"
+        log_func = getattr(logging, level, logging.info)
+        log_func(f"{class_name} - {message}")
+
+    def ticks_filename(self, demo_hash: str) -> Path:
+        """Returns the cached $.json path of a content hash."""
+        return self.cache_folder / f"{demo_hash}.json"
+
+    def is_cached(self, demo_hash: str) -> bool:
+        """Checks if a content hash has been parsed completely."""
+        ticks_filename = self.ticks_filename(demo_hash)
+        return (
+            ticks_filename.exists()
+            and ticks_filename.with_name(f"{demo_hash}_config.json").exists()
+            and TickIndex.index_filename(ticks_filename).exists()
+        )
+
+    def _write_manifest(self) -> None:
+        with open(self.cache_folder / self.MANIFEST, "w") as f:
+            json.dump({"demos": self.manifest}, f, indent=4, sort_keys=True)
+
+    def plan(self, demo_files: dict[str, Path]) -> tuple[dict, dict]:
+        """Hashes the demos and finds the ones to parse.
+
+        Returns the jobs as hash -> name, one per uncached content, and the
+        hashes of every demo as name -> hash.
+        """
+        hashes = {
+            name: content_hash(path) for name, path in demo_files.items()
+        }
+        jobs = {}
+        for name, demo_hash in hashes.items():
+            if not self.is_cached(demo_hash):
+                jobs.setdefault(demo_hash, name)
+        return jobs, hashes
+
+    def _result(
+        self, name: str, demo_hash: str, status: str, seconds: float
+    ) -> dict:
+        """Formats the result of a demo with its size and throughput."""
+        ticks_filename = self.ticks_filename(demo_hash)
+        index_filename = TickIndex.index_filename(ticks_filename)
+        size = ticks_filename.stat().st_size if ticks_filename.exists() else 0
+        ticks = (
+            len(TickIndex.read(index_filename))
+            if index_filename.exists()
+            else 0
+        )
+        return {
+            "demo": name,
+            "hash": demo_hash,
+            "status": status,
+            "seconds": seconds,
+            "ticks": ticks,
+            "ticks_per_s": ticks / seconds if seconds else 0.0,
+            "mb_per_s": size / 1e6 / seconds if seconds else 0.0,
+        }
+
+    def _report(self, done: int, total: int, result: dict) -> None:
+        self._log(
+            f"[{done}/{total}] {result['demo']}: {result['status']}, "
+            f"{result['ticks']} ticks in {result['seconds']:.2f} s "
+            f"({result['ticks_per_s']:.0f} ticks/s, "
+            f"{result['mb_per_s']:.2f} MB/s)"
+        )
+
+    def run(self, demo_folder: Path) -> list[dict]:
+        """Parses the demos of a folder and returns a result per demo."""
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        cache_folder = self.cache_folder.resolve()
+        demo_files = {
+            path.relative_to(demo_folder).with_suffix("").as_posix(): path
+            for path in sorted(demo_folder.rglob("*.dem"))
+            if not path.resolve().is_relative_to(cache_folder)
+        }
+        jobs, hashes = self.plan(demo_files)
+        total = len(demo_files)
+        self._log(
+            f"{msg.BATCH_STARTING}: {total} demos, {len(jobs)} to parse, "
+            f"{self.workers} workers"
+        )
+        start = time.perf_counter()
+        results = {}
+        if jobs:
+            with ProcessPoolExecutor(self.workers) as pool:
+                futures = {
+                    pool.submit(
+                        parse_demo,
+                        demo_files[name],
+                        self.cache_folder / f"{demo_hash}.dem",
+                        self.packed,
+                        self.processors,
+                        self.lod_levels,
+                    ): (name, demo_hash)
+                    for demo_hash, name in jobs.items()
+                }
+                for future in as_completed(futures):
+                    name, demo_hash = futures[future]
+                    try:
+                        parsed = future.result()
+                    except Exception as e:
+                        self._log(f"{msg.PARSE_FAILED}: {e}", level="error")
+                        parsed = {"status": "failed", "seconds": 0.0}
+                    results[name] = self._result(
+                        name, demo_hash, parsed["status"], parsed["seconds"]
+                    )
+                    self._report(len(results), total, results[name])
+        self.manifest = {}
+        for name, demo_hash in hashes.items():
+            if name not in results:
+                status = "cached"
+                if demo_hash in jobs:
+                    parsed = results[jobs[demo_hash]]["status"] == "parsed"
+                    status = "duplicate" if parsed else "failed"
+                results[name] = self._result(name, demo_hash, status, 0.0)
+                self._report(len(results), total, results[name])
+            if results[name]["status"] != "failed":
+                self.manifest[name] = demo_hash
+        self._write_manifest()
+        statuses = [result["status"] for result in results.values()]
+        self._log(
+            f"{msg.BATCH_COMPLETED}: {statuses.count('parsed')} parsed, "
+            f"{statuses.count('failed')} failed in "
+            f"{time.perf_counter() - start:.2f} s"
+        )
+        return [results[name] for name in demo_files]
@@ -0,0 +1,180 @@
+"""Downsampled level of detail (LOD) tracks of parsed ticks.
+
+A track of level N has every Nth tick of the demo, so a client watching
+at N times the speed, or on a link too slow for every tick, is sent the
+ticks it can use without the server reading and sending the rest.
+The last tick, and ticks with discrete events, are always kept: round
+starts, side switches, kills, nade events, and changes of the score or
+of the bomb (planted, defused, exploded, carrier). Players shooting in
+a left out tick are added to "shooting" of the next kept tick.
+
+Players of a kept tick have interpolation hints dx, dy and dz, the
+change of x, y and z per tick towards their position in the next tick
+of the track, so a client can move them smoothly in between. Zero
+hints, and hints towards a round start, are left out.
+
+Tracks are written once by the parser, through the same post-processors
+as $_processed.json, to $_lod{N}.json with the tick per line layout of
+$.json and their own tick index. The levels and the processors are
+written to $_lod_info.json.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterator
+from .postprocess import (
+    HINTS,
+    POSITION,
+    InternPlayers,
+    Pipeline,
+    read_processed_info,
+    read_ticks,
+    write_ticks,
+)
+
+LEVELS = (2, 4, 8)
+# Changes of these fields are events, kept in every track
+SCORE = ("t_wins", "ct_wins", "is_halftime")
+BOMB_STATE = ("planted", "defused", "exploded", "carrier")
+
+
+def lod_filename(ticks_filename: Path, level: int) -> Path:
+    """Creates $_lod{level}.json path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_lod{level}.json")
+
+
+def lod_info_filename(ticks_filename: Path) -> Path:
+    """Creates $_lod_info.json path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_lod_info.json")
+
+
+def is_event(tick: dict, previous: dict | None) -> bool:
+    """Checks if a tick has an event that every track must keep."""
+    if (
+        previous is None
+        or tick.get("round_start")
+        or tick.get("switch")
+        or tick.get("kills")
+        or tick.get("nade_event")
+    ):
+        return True
+    if any(tick.get(field) != previous.get(field) for field in SCORE):
+        return True
+    bomb = tick.get("bomb") or {}
+    previous_bomb = previous.get("bomb") or {}
+    return any(
+        bomb.get(field) != previous_bomb.get(field) for field in BOMB_STATE
+    )
+
+
+def add_hints(tick: dict, next_tick: dict) -> None:
+    """Adds the position change per tick towards the next kept tick."""
+    ticks = next_tick["tick"] - tick["tick"]
+    if ticks <= 0 or next_tick.get("round_start"):
+        return  # Players are moved to spawn, not towards it
+    following = {
+        player["sid"]: player for player in next_tick.get("players") or ()
+    }
+    for player in tick.get("players") or ():
+        target = following.get(player["sid"])
+        if target is None:
+            continue
+        for field, hint in zip(POSITION, HINTS):
+            if field in player and field in target:
+                change = round((target[field] - player[field]) / ticks, 3)
+                if change:
+                    player[hint] = change
+
+
+def downsample(ticks: Iterator[dict], level: int) -> Iterator[dict]:
+    """Yields every level-th tick, the ticks with events and the last."""
+    kept = None  # Waiting for the next kept tick, for its hints
+    previous = None
+    shooting = []  # Players shooting in left out ticks
+    for count, tick in enumerate(ticks):
+        if count % level and not is_event(tick, previous):
+            shooting.extend(tick.get("shooting") or ())
+            previous = tick
+            continue
+        previous = tick
+        if shooting:
+            shooting.extend(tick.get("shooting") or ())
+            tick["shooting"] = list(dict.fromkeys(shooting))
+            shooting = []
+        if kept is not None:
+            add_hints(kept, tick)
+            yield kept
+        kept = tick
+    if previous is not kept:
+        # The end of the demo, with the shooting before it
+        if shooting:
+            previous["shooting"] = list(dict.fromkeys(shooting))
+        add_hints(kept, previous)
+        yield kept
+        kept = previous
+    if kept is not None:
+        yield kept
+
+
+def _pipeline(ticks_filename: Path, processors: list[str]) -> Pipeline:
+    """Creates the post-processors of the tracks.
+
+    Players are interned with the numbers of $_processed.json, so the
+    numbers stay the same when a client changes tracks.
+    """
+    pipeline = Pipeline.from_names(processors)
+    players = read_processed_info(ticks_filename).get("players")
+    pipeline.processors = [
+        (
+            InternPlayers(players)
+            if isinstance(processor, InternPlayers)
+            else processor
+        )
+        for processor in pipeline.processors
+    ]
+    return pipeline
+
+
+def write_tracks(
+    ticks_filename: Path,
+    levels: list[int] | tuple[int, ...] = LEVELS,
+    processors: list[str] | None = None,
+) -> list[Path]:
+    """Writes the LOD tracks of $.json and $_lod_info.json."""
+    levels = sorted({int(level) for level in levels})
+    if not levels or levels[0] < 2:
+        raise ValueError(f"Invalid LOD levels: {levels}")
+    processors = list(processors or [])
+    output_filenames = []
+    for level in levels:
+        pipeline = _pipeline(ticks_filename, processors)
+        output_filenames.append(
+            write_ticks(
+                pipeline.process(
+                    downsample(read_ticks(ticks_filename), level)
+                ),
+                lod_filename(ticks_filename, level),
+            )
+        )
+    with open(lod_info_filename(ticks_filename), "w") as f:
+        json.dump({"levels": levels, "processors": processors}, f)
+    return output_filenames
+
+
+def track_levels(ticks_filename: Path, processors: list[str]) -> list[int]:
+    """Returns the levels of the tracks written with the given processors.
+
+    Empty if there are no tracks, or they were processed differently.
+    """
+    try:
+        with open(lod_info_filename(ticks_filename)) as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if info.get("processors") != list(processors):
+        return []
+    return [
+        level
+        for level in info.get("levels", [])
+        if lod_filename(ticks_filename, level).exists()
+    ]
@@ -6,3 +6,16 @@ PARSE_SKIP = "already exists, skipping parser!"
 PARSE_STARTING = "received, starting a new parse!"
 PARSE_COMPLETED = "Demofile parsed successfully"
 PARSE_FAILED = "Demofile parsing failed"
+INDEX_CREATED = "Tick index created"
+INDEX_FAILED = "Tick index could not be created"
+PACK_CREATED = "Packed ticks file created"
+PACK_FAILED = "Packed ticks file could not be created"
+PROCESS_CREATED = "Processed ticks file created"
+PROCESS_FAILED = "Processed ticks file could not be created"
+LOD_CREATED = "LOD tracks created"
+LOD_FAILED = "LOD tracks could not be created"
+TIMELINE_CREATED = "Timeline created"
+TIMELINE_FAILED = "Timeline could not be created"
+PARSE_MARKER_FAILED = "Parsing marker could not be written"
+BATCH_STARTING = "Batch parse starting"
+BATCH_COMPLETED = "Batch parse completed"
@@ -0,0 +1,269 @@
+"""Compact binary container for parsed ticks ($_packed.bin).
+
+Ticks are stored as struct-packed little-endian records in the same order
+as in $.json. Strings (names, clans, weapons, items...) are interned into a
+string table at the end of the file, and records refer to them by number.
+A null list is stored with the length NULL. Floats that hold whole numbers
+in $.json (the Go parser writes -160.0 as -160) are flagged, so they are
+decoded as ints. The file ends with a footer
+pointing to the string table, and a tick index of the records is written
+to $_packed_index.bin.
+"""
+
+import json
+import struct
+from pathlib import Path
+from .tick_index import TickIndex, TICKS_HEADER, TICK_LINE_PREFIX
+
+MAGIC = b"EEIP"
+VERSION = 2
+NULL = 0xFFFF  # Length of a null list
+
+HEADER = struct.Struct("<4sH")  # magic, version
+FOOTER = struct.Struct("<QI4s")  # string table offset, strings, magic
+STRING_LENGTH = struct.Struct("<H")
+# tick, round_time, flags, t, ct, t_wins, ct_wins
+TICK = struct.Struct("<idBIIii")
+# players, shooting, kills, nades, infernos, has nade_event
+COUNTS = struct.Struct("<HHHHHB")
+# sid, name, clan, team, hp, money, x, y, z, view_x, view_y, actv_itm,
+# armor, kills, deaths, assists, dmg, adr, flags, items
+PLAYER = struct.Struct("<QIIIiidddddIiiiiidHH")
+ITEM = struct.Struct("<I")
+SHOOTING = struct.Struct("<Q")
+KILL = struct.Struct("<IIIBi")  # killer, victim, weapon, is_hs, penetrations
+NADE = struct.Struct("<qIdddIB")  # id, type, x, y, z, team, int flags
+INFERNO = struct.Struct("<qH")  # id, fires
+FIRE = struct.Struct("<dddB")  # x, y, z, int flags
+NADE_EVENT = struct.Struct("<IdddB")  # type, x, y, z, int flags
+BOMB = struct.Struct("<IdddBII")  # carrier, x, y, z, flags, planted/defused_by
+
+# Boolean fields packed into flags, in bit order
+TICK_FLAGS = ("round_start", "switch", "is_freeze", "is_halftime")
+PLAYER_FLAGS = (
+    "helmet",
+    "kit",
+    "is_ducking",
+    "is_walking",
+    "is_standing",
+    "is_air",
+    "is_rld",
+    "is_planting",
+    "is_defusing",
+)
+BOMB_FLAGS = ("planted", "defused", "exploded")
+# Float fields flagged when they hold whole numbers, in bit order after
+# the boolean flags of the record
+TICK_FLOATS = ("round_time",)
+PLAYER_FLOATS = ("x", "y", "z", "view_x", "view_y", "adr")
+POSITION_FLOATS = ("x", "y", "z")
+
+
+def packed_filename(ticks_filename: Path) -> Path:
+    """Creates $_packed.bin path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_packed.bin")
+
+
+def pack_flags(data: dict, keys: tuple[str, ...]) -> int:
+    flags = 0
+    for bit, key in enumerate(keys):
+        if data[key]:
+            flags |= 1 << bit
+    return flags
+
+
+def unpack_flags(flags: int, keys: tuple[str, ...]) -> dict:
+    return {key: bool(flags & (1 << bit)) for bit, key in enumerate(keys)}
+
+
+def pack_ints(data: dict, keys: tuple[str, ...], first_bit: int = 0) -> int:
+    """Flags the float fields that hold ints."""
+    flags = 0
+    for bit, key in enumerate(keys, first_bit):
+        if type(data[key]) is int:
+            flags |= 1 << bit
+    return flags
+
+
+def unpack_ints(
+    data: dict, flags: int, keys: tuple[str, ...], first_bit: int = 0
+) -> dict:
+    """Turns the flagged float fields of decoded data back to ints."""
+    for bit, key in enumerate(keys, first_bit):
+        if flags & (1 << bit):
+            data[key] = int(data[key])
+    return data
+
+
+def list_length(values: list | None) -> int:
+    return NULL if values is None else len(values)
+
+
+class PackedWriter:
+    """Converts a parsed $.json (ticks) file to the packed container."""
+
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+
+    def _string(self, value: str) -> int:
+        """Interns a string and returns its number in the string table."""
+        number = self.strings.get(value)
+        if number is None:
+            number = self.strings[value] = len(self.strings)
+        return number
+
+    def _pack_player(self, player: dict) -> bytes:
+        items = player["items"]
+        record = PLAYER.pack(
+            player["sid"],
+            self._string(player["name"]),
+            self._string(player["clan"]),
+            self._string(player["team"]),
+            player["hp"],
+            player["money"],
+            player["x"],
+            player["y"],
+            player["z"],
+            player["view_x"],
+            player["view_y"],
+            self._string(player["actv_itm"]),
+            player["armor"],
+            player["kills"],
+            player["deaths"],
+            player["assists"],
+            player["dmg"],
+            player["adr"],
+            pack_flags(player, PLAYER_FLAGS)
+            | pack_ints(player, PLAYER_FLOATS, len(PLAYER_FLAGS)),
+            list_length(items),
+        )
+        return record + b"".join(
+            ITEM.pack(self._string(item)) for item in items or ()
+        )
+
+    def _pack_inferno(self, inferno: dict) -> bytes:
+        fires = inferno["fires"]
+        record = INFERNO.pack(inferno["id"], list_length(fires))
+        return record + b"".join(
+            FIRE.pack(
+                fire["x"],
+                fire["y"],
+                fire["z"],
+                pack_ints(fire, POSITION_FLOATS),
+            )
+            for fire in fires or ()
+        )
+
+    def pack_tick(self, tick: dict) -> bytes:
+        """Packs a tick into a binary record."""
+        players = tick["players"]
+        shooting = tick["shooting"]
+        kills = tick["kills"]
+        nades = tick["nades"]
+        infernos = tick["infernos"]
+        nade_event = tick["nade_event"]
+        bomb = tick["bomb"]
+        parts = [
+            TICK.pack(
+                tick["tick"],
+                tick["round_time"],
+                pack_flags(tick, TICK_FLAGS)
+                | pack_ints(tick, TICK_FLOATS, len(TICK_FLAGS)),
+                self._string(tick["t"]),
+                self._string(tick["ct"]),
+                tick["t_wins"],
+                tick["ct_wins"],
+            ),
+            COUNTS.pack(
+                list_length(players),
+                list_length(shooting),
+                list_length(kills),
+                list_length(nades),
+                list_length(infernos),
+                nade_event is not None,
+            ),
+        ]
+        parts.extend(self._pack_player(player) for player in players or ())
+        parts.extend(SHOOTING.pack(sid) for sid in shooting or ())
+        parts.extend(
+            KILL.pack(
+                self._string(kill["killer"]),
+                self._string(kill["victim"]),
+                self._string(kill["weapon"]),
+                kill["is_hs"],
+                kill["penetrations"],
+            )
+            for kill in kills or ()
+        )
+        parts.extend(
+            NADE.pack(
+                nade["id"],
+                self._string(nade["type"]),
+                nade["x"],
+                nade["y"],
+                nade["z"],
+                self._string(nade["team"]),
+                pack_ints(nade, POSITION_FLOATS),
+            )
+            for nade in nades or ()
+        )
+        parts.extend(self._pack_inferno(inferno) for inferno in infernos or ())
+        if nade_event is not None:
+            parts.append(
+                NADE_EVENT.pack(
+                    self._string(nade_event["type"]),
+                    nade_event["x"],
+                    nade_event["y"],
+                    nade_event["z"],
+                    pack_ints(nade_event, POSITION_FLOATS),
+                )
+            )
+        parts.append(
+            BOMB.pack(
+                self._string(bomb["carrier"]),
+                bomb["x"],
+                bomb["y"],
+                bomb["z"],
+                pack_flags(bomb, BOMB_FLAGS)
+                | pack_ints(bomb, POSITION_FLOATS, len(BOMB_FLAGS)),
+                self._string(bomb["planted_by"]),
+                self._string(bomb["defused_by"]),
+            )
+        )
+        return b"".join(parts)
+
+    def _write_strings(self, file) -> None:
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            file.write(STRING_LENGTH.pack(len(encoded)))
+            file.write(encoded)
+
+    def write(self, ticks_filename: Path) -> Path:
+        """Writes $_packed.bin and its tick index from a ticks file."""
+        output_filename = packed_filename(ticks_filename)
+        index = TickIndex()
+        self.strings = {}
+        with open(ticks_filename, "rb") as ticks, open(
+            output_filename, "wb"
+        ) as file:
+            if ticks.readline().strip() != TICKS_HEADER:
+                raise ValueError(f"Not a ticks file: {ticks_filename}")
+            file.write(HEADER.pack(MAGIC, VERSION))
+            for line in ticks:
+                if not line.startswith(TICK_LINE_PREFIX):
+                    continue
+                tick_json = line.rstrip(b",\r\n")
+                tick = json.loads(tick_json)
+                record = self.pack_tick(tick)
+                index.append(
+                    tick["tick"],
+                    file.tell(),
+                    len(record),
+                    TickIndex.tick_flags(tick_json),
+                )
+                file.write(record)
+            strings_offset = file.tell()
+            self._write_strings(file)
+            file.write(FOOTER.pack(strings_offset, len(self.strings), MAGIC))
+        index.write(TickIndex.index_filename(output_filename))
+        return output_filename
@@ -1,14 +1,39 @@
+import time
 import ctypes
+import struct
 import logging
 from pathlib import Path
 from . import messages as msg
-
+from .lod import lod_info_filename, track_levels, write_tracks
+from .packed import PackedWriter, packed_filename
+from .postprocess import (
+    Pipeline,
+    is_processed,
+    lines_filename,
+    processed_info_filename,
+)
+from .tick_index import TickIndex, parsing_filename
+from .timeline import timeline_filename, write_timeline
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+LIBRARY_PATH = Path(__file__).parent / "demoparser.so"
+_demoparser: ctypes.CDLL | None = None  # Loaded once per process
+
+
+def load_library() -> ctypes.CDLL:
+    """Loads the Go based library, once per process."""
+    global _demoparser
+    if _demoparser is None:
+        demoparser = ctypes.CDLL(str(LIBRARY_PATH))
+        demoparser.ParseDemo.argtypes = [ctypes.c_char_p]
+        demoparser.ParseDemo.restype = ctypes.c_bool
+        _demoparser = demoparser
+    return _demoparser
+
 
 class DemodataParser:
     """A parser for CS2-demodata files that uses an external Go-based library."""
@@ -18,24 +43,37 @@ class DemodataParser:
         self.demo_filename: Path = Path()
         self.json_filename: Path = Path()
         self.overwrite: bool = False
+        self.packed: bool = False  # Also write $_packed.bin
+        self.processors: list[str] = []  # Write $_processed.json with these
+        self.lod_levels: list[int] = []  # Write $_lod{N}.json of these
         self.parsing_result = False
+        self.timings: dict[str, float] = {}  # Seconds per parse stage
 
     def _ext_parser(self) -> None:
         """Uses an external Go based library to parse the demo file."""
-        library_path = str(Path(__file__).parent / "demoparser.so")
-        demoparser = ctypes.CDLL(library_path)
-        demoparser.ParseDemo.argtypes = [ctypes.c_char_p]
-        demoparser.ParseDemo.restype = ctypes.c_bool
-        self.parsing_result = demoparser.ParseDemo(
+        self.parsing_result = load_library().ParseDemo(
             ctypes.c_char_p(str(self.demo_filename).encode("utf-8"))
         )
 
-    def demofile(self, filename: Path, overwrite: bool = False) -> Path:
-        """Checks that the file extension is .dem and sets overwrite status."""
+    def demofile(
+        self,
+        filename: Path,
+        overwrite: bool = False,
+        packed: bool = False,
+        processors: list[str] | None = None,
+        lod_levels: list[int] | None = None,
+    ) -> Path:
+        """Checks that the file extension is .dem.
+
+        Also sets overwrite, packed, the post-processors and LOD levels.
+        """
         if filename.suffix != ".dem":
             raise ValueError(msg.INVALID_DEMOFILE)
         self.demo_filename = filename
         self.overwrite = overwrite
+        self.packed = packed
+        self.processors = list(processors or [])
+        self.lod_levels = sorted(set(lod_levels or []))
         return self.demo_filename
 
     def parse_filename(self) -> Path:
@@ -50,24 +88,161 @@ class DemodataParser:
         self.json_filename = Path(json_filepath.decode("utf-8"))
         return self.json_filename
 
+    def index_filename(self) -> Path:
+        """Creates $_index.bin path next to $_config.json."""
+        return TickIndex.index_filename(self.json_filename)
+
+    def _timed(self, stage: str, function) -> bool:
+        """Runs a parse stage and records its duration in timings."""
+        start = time.perf_counter()
+        try:
+            return function()
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    def build_index(self) -> bool:
+        """Builds the tick index sidecar for the parsed ticks file."""
+        try:
+            TickIndex.build(self.json_filename).write(self.index_filename())
+        except (OSError, ValueError) as e:
+            logging.warning(f"{self.class_name} - {msg.INDEX_FAILED}: {e}")
+            return False
+        logging.info(
+            f"{self.class_name} - {msg.INDEX_CREATED}: {self.index_filename()}"
+        )
+        return True
+
+    def build_timeline(self) -> bool:
+        """Writes the round and event timeline of the parsed ticks."""
+        try:
+            output_filename = write_timeline(self.json_filename)
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"{self.class_name} - {msg.TIMELINE_FAILED}: {e}")
+            return False
+        logging.info(
+            f"{self.class_name} - {msg.TIMELINE_CREATED}: {output_filename}"
+        )
+        return True
+
+    def pack(self) -> bool:
+        """Writes the ticks to the compact binary container."""
+        try:
+            output_filename = PackedWriter().write(self.json_filename)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logging.warning(f"{self.class_name} - {msg.PACK_FAILED}: {e}")
+            return False
+        logging.info(
+            f"{self.class_name} - {msg.PACK_CREATED}: {output_filename}"
+        )
+        return True
+
+    def post_process(self) -> bool:
+        """Writes the ticks through the post-processors once."""
+        try:
+            output_filename = Pipeline.from_names(self.processors).write(
+                self.json_filename
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"{self.class_name} - {msg.PROCESS_FAILED}: {e}")
+            return False
+        logging.info(
+            f"{self.class_name} - {msg.PROCESS_CREATED}: {output_filename}"
+        )
+        return True
+
+    def build_lod(self) -> bool:
+        """Writes the downsampled LOD tracks of the ticks."""
+        try:
+            output_filenames = write_tracks(
+                self.json_filename, self.lod_levels, self.processors
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"{self.class_name} - {msg.LOD_FAILED}: {e}")
+            return False
+        logging.info(
+            f"{self.class_name} - {msg.LOD_CREATED}: "
+            f"{', '.join(str(f) for f in output_filenames)}"
+        )
+        return True
+
+    def parsing_filename(self) -> Path:
+        """Creates $_parsing marker path, which exists while parsing."""
+        return parsing_filename(self.json_filename)
+
+    def _start_marker(self) -> None:
+        """Marks the ticks file incomplete for readers of a growing file.
+
+        Old output is removed first, so that it cannot be read as the
+        beginning of the new ticks file.
+        """
+        try:
+            for filename in (
+                self.json_filename,
+                self.index_filename(),
+                timeline_filename(self.json_filename),
+                packed_filename(self.json_filename),
+                lines_filename(self.json_filename),
+                processed_info_filename(self.json_filename),
+                lod_info_filename(self.json_filename),
+            ):
+                filename.unlink(missing_ok=True)
+            self.parsing_filename().touch()
+        except OSError as e:
+            logging.warning(
+                f"{self.class_name} - {msg.PARSE_MARKER_FAILED}: {e}"
+            )
+
     def parse(self) -> bool:
         """Initiates the parsing process and handles the result."""
         self.parse_filename()
+        self.timings = {}
         if self.json_filename.exists() and self.overwrite == False:
             logging.info(
                 f"{self.class_name} - {self.json_filename} {msg.PARSE_SKIP}"
             )
+            if not self.index_filename().exists():
+                self._timed("index", self.build_index)
+            if not timeline_filename(self.json_filename).exists():
+                self._timed("timeline", self.build_timeline)
+            if (
+                self.packed
+                and not packed_filename(self.json_filename).exists()
+            ):
+                self._timed("pack", self.pack)
+            processed = self.processors and not is_processed(
+                self.json_filename, self.processors
+            )
+            if processed:
+                self._timed("process", self.post_process)
+            if self.lod_levels and (
+                processed
+                or track_levels(self.json_filename, self.processors)
+                != self.lod_levels
+            ):
+                self._timed("lod", self.build_lod)
             return True
         else:
             logging.info(
                 f"{self.class_name} - {self.demo_filename} {msg.PARSE_STARTING}"
             )
         # Initiate external parser
-        self._ext_parser()
+        self._start_marker()
+        try:
+            self._timed("parse", self._ext_parser)
+        finally:
+            self.parsing_filename().unlink(missing_ok=True)
         if self.parsing_result:
             logging.info(
                 f"{self.class_name} - {msg.PARSE_COMPLETED}: {self.demo_filename}"
             )
+            self._timed("index", self.build_index)
+            self._timed("timeline", self.build_timeline)
+            if self.packed:
+                self._timed("pack", self.pack)
+            if self.processors:
+                self._timed("process", self.post_process)
+            if self.lod_levels:
+                self._timed("lod", self.build_lod)
             return True
         else:
             logging.warning(
@@ -0,0 +1,290 @@
+"""Post-processing of parsed ticks into $_processed.json.
+
+Runs once over the ticks of $.json after parsing, so the server can
+stream the result as is instead of transforming ticks for every client.
+A post-processor is called with an iterator of ticks and yields the
+transformed ticks, so processors compose like generators:
+
+    pipeline = Pipeline.from_names(["flip_yz", "quantize"])
+    pipeline.write(ticks_filename)  # $_processed.json
+
+The output has the same tick per line layout as $.json, with its own tick
+index ($_processed_index.bin). Ticks are never dropped, so entries of
+the timeline are the same. The processors used, and what clients need
+to read the ticks (e.g. the steam ids of interned players), are written
+to $_processed_info.json.
+"""
+
+import json
+import ijson
+from pathlib import Path
+from typing import Iterator
+from .tick_index import TickIndex, TICKS_HEADER, TICK_LINE_PREFIX
+
+# Fields of entities that have a position
+POSITION = ("x", "y", "z")
+HINTS = ("dx", "dy", "dz")  # Position change per tick, of LOD tracks
+VIEW = ("view_x", "view_y")
+
+
+def processed_filename(ticks_filename: Path) -> Path:
+    """Creates $_processed.json path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_processed.json")
+
+
+def lines_filename(ticks_filename: Path) -> Path:
+    """Creates $_lines.json path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_lines.json")
+
+
+def processed_info_filename(ticks_filename: Path) -> Path:
+    """Creates $_processed_info.json path from $.json path."""
+    return ticks_filename.with_name(
+        f"{ticks_filename.stem}_processed_info.json"
+    )
+
+
+def read_ticks(ticks_filename: Path) -> Iterator[dict]:
+    """Reads the ticks of a ticks file one at a time."""
+    with open(ticks_filename, "rb") as file:
+        if file.readline().strip() != TICKS_HEADER:
+            raise ValueError(f"Not a ticks file: {ticks_filename}")
+        for line in file:
+            if line.startswith(TICK_LINE_PREFIX):
+                yield json.loads(line.rstrip(b",\r\n"))
+
+
+def positions(tick: dict) -> Iterator[dict]:
+    """Yields every part of a tick with x, y and z coordinates."""
+    yield from tick.get("players") or ()
+    yield from tick.get("nades") or ()
+    for inferno in tick.get("infernos") or ():
+        yield from inferno.get("fires") or ()
+    if tick.get("nade_event"):
+        yield tick["nade_event"]
+    if tick.get("bomb"):
+        yield tick["bomb"]
+
+
+class FlipYZ:
+    """Swaps Y and Z of all coordinates, Unity's axes are Y up."""
+
+    name = "flip_yz"
+
+    def __call__(self, ticks: Iterator[dict]) -> Iterator[dict]:
+        for tick in ticks:
+            for entity in positions(tick):
+                if "y" in entity and "z" in entity:
+                    entity["y"], entity["z"] = entity["z"], entity["y"]
+                if "dy" in entity or "dz" in entity:
+                    dy, dz = entity.pop("dy", None), entity.pop("dz", None)
+                    if dz is not None:
+                        entity["dy"] = dz
+                    if dy is not None:
+                        entity["dz"] = dy
+            yield tick
+
+
+class Quantize:
+    """Rounds coordinates and view angles to the given decimals."""
+
+    name = "quantize"
+
+    def __init__(self, decimals: int = 1):
+        self.decimals: int = decimals
+
+    def _round(self, value: float) -> float | int:
+        if self.decimals <= 0:
+            return round(value)
+        return round(value, self.decimals)
+
+    def __call__(self, ticks: Iterator[dict]) -> Iterator[dict]:
+        for tick in ticks:
+            for entity in positions(tick):
+                for field in POSITION:
+                    if field in entity:
+                        entity[field] = self._round(entity[field])
+            for player in tick.get("players") or ():
+                for field in VIEW:
+                    if field in player:
+                        player[field] = self._round(player[field])
+            yield tick
+
+
+class InternPlayers:
+    """Replaces steam ids with small numbers, in order of appearance.
+
+    The steam id of number N is the Nth of "players" in the info file.
+    """
+
+    name = "intern_players"
+
+    def __init__(self, players: list[int] | None = None):
+        # Steam id -> number, continuing from the given players
+        self.sids: dict[int, int] = {
+            sid: number for number, sid in enumerate(players or ())
+        }
+
+    def _number(self, sid: int) -> int:
+        number = self.sids.get(sid)
+        if number is None:
+            number = self.sids[sid] = len(self.sids)
+        return number
+
+    def __call__(self, ticks: Iterator[dict]) -> Iterator[dict]:
+        for tick in ticks:
+            for player in tick.get("players") or ():
+                player["sid"] = self._number(player["sid"])
+            if tick.get("shooting"):
+                tick["shooting"] = [
+                    self._number(sid) for sid in tick["shooting"]
+                ]
+            yield tick
+
+    def info(self) -> dict:
+        return {"players": list(self.sids)}
+
+
+class DropStationary:
+    """Leaves out positions and view angles that did not change.
+
+    Players, nades and the bomb keep x, y and z (and players view_x and
+    view_y) only when they changed since the previous tick. Every
+    keyframe_interval ticks, and when a round starts, ticks are whole
+    again, so a client that starts in between has every position soon.
+    """
+
+    name = "drop_stationary"
+
+    def __init__(self, keyframe_interval: int = 64):
+        self.keyframe_interval: int = max(1, keyframe_interval)
+        self.previous: dict[tuple, tuple] = {}  # (entity, fields) -> values
+
+    def _entities(self, tick: dict) -> Iterator[tuple]:
+        for player in tick.get("players") or ():
+            yield ("player", player["sid"]), player, (POSITION, VIEW)
+        for nade in tick.get("nades") or ():
+            yield ("nade", nade["id"]), nade, (POSITION,)
+        if tick.get("bomb"):
+            yield ("bomb",), tick["bomb"], (POSITION,)
+
+    def __call__(self, ticks: Iterator[dict]) -> Iterator[dict]:
+        for count, tick in enumerate(ticks):
+            whole = count % self.keyframe_interval == 0 or tick.get(
+                "round_start"
+            )
+            for key, entity, groups in self._entities(tick):
+                for fields in groups:
+                    values = tuple(entity.get(field) for field in fields)
+                    if (
+                        not whole
+                        and self.previous.get((key, fields)) == values
+                    ):
+                        for field in fields:
+                            entity.pop(field, None)
+                    else:
+                        self.previous[(key, fields)] = values
+            yield tick
+
+
+PROCESSORS = {
+    processor.name: processor
+    for processor in (FlipYZ, Quantize, InternPlayers, DropStationary)
+}
+
+
+class Pipeline:
+    """Post-processors applied in order to the ticks of a demo."""
+
+    def __init__(self, processors: list):
+        self.processors: list = processors
+
+    @classmethod
+    def from_names(cls, names: list[str]) -> "Pipeline":
+        """Creates the processors of PROCESSORS with their defaults."""
+        unknown = [name for name in names if name not in PROCESSORS]
+        if unknown:
+            raise ValueError(f"Unknown post-processors: {unknown}")
+        return cls([PROCESSORS[name]() for name in names])
+
+    def names(self) -> list[str]:
+        return [processor.name for processor in self.processors]
+
+    def process(self, ticks: Iterator[dict]) -> Iterator[dict]:
+        for processor in self.processors:
+            ticks = processor(ticks)
+        return ticks
+
+    def info(self) -> dict:
+        """Returns the processors and what they tell clients."""
+        info = {"processors": self.names()}
+        for processor in self.processors:
+            if hasattr(processor, "info"):
+                info.update(processor.info())
+        return info
+
+    def write(self, ticks_filename: Path) -> Path:
+        """Writes $_processed.json, its tick index and info file."""
+        output_filename = write_ticks(
+            self.process(read_ticks(ticks_filename)),
+            processed_filename(ticks_filename),
+        )
+        with open(processed_info_filename(ticks_filename), "w") as f:
+            json.dump(self.info(), f)
+        return output_filename
+
+
+def write_ticks(ticks: Iterator[dict], output_filename: Path) -> Path:
+    """Writes ticks in the layout of $.json, with their tick index."""
+    index = TickIndex()
+    with open(output_filename, "wb") as file:
+        file.write(TICKS_HEADER + b"\n")
+        separator = b""
+        for tick in ticks:
+            tick_json = json.dumps(tick, separators=(",", ":")).encode("utf-8")
+            file.write(separator)
+            index.append(
+                tick["tick"],
+                file.tell(),
+                len(tick_json),
+                TickIndex.tick_flags(tick_json),
+            )
+            file.write(tick_json)
+            separator = b",\n"
+        file.write(b"\n]}")
+    index.write(TickIndex.index_filename(output_filename))
+    return output_filename
+
+
+def read_items(ticks_filename: Path) -> Iterator[dict]:
+    """Reads the ticks of a ticks file in any JSON layout, incrementally.
+
+    Slower than read_ticks, for files not written by the Go parser.
+    """
+    with open(ticks_filename, "rb") as file:
+        for tick in ijson.items(file, "ticks.item", use_float=True):
+            yield {"tick": tick["tick"], **tick}  # Tick first, as in $.json
+
+
+def write_lines(ticks_filename: Path) -> Path:
+    """Rewrites a ticks file in the layout of $.json to $_lines.json."""
+    return write_ticks(
+        read_items(ticks_filename), lines_filename(ticks_filename)
+    )
+
+
+def read_processed_info(ticks_filename: Path) -> dict:
+    """Reads $_processed_info.json, empty if missing or invalid."""
+    try:
+        with open(processed_info_filename(ticks_filename)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_processed(ticks_filename: Path, names: list[str]) -> bool:
+    """Checks if $_processed.json was written with the given processors."""
+    return (
+        read_processed_info(ticks_filename).get("processors") == list(names)
+        and processed_filename(ticks_filename).exists()
+    )
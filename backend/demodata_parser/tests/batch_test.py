@@ -0,0 +1,86 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.batch import BatchParser, content_hash
+from demodata_parser.tick_index import TickIndex
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+
+
+class TestBatchParser(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.demo_folder = Path(self.tmp_dir.name)
+        self.cache_folder = self.demo_folder / "parsed"
+        self.batch = BatchParser(self.cache_folder, workers=2)
+        self.demo = self.demo_folder / "mirage.dem"
+        self.demo.write_bytes(b"demo data")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def cache(self, demo_filename: Path) -> None:
+        """Writes parsed outputs of a demo to the cache."""
+        self.cache_folder.mkdir(exist_ok=True)
+        ticks_filename = write_ticks_file(
+            self.batch.ticks_filename(content_hash(demo_filename)),
+            [sample_tick(1), sample_tick(2)],
+        )
+        TickIndex.build(ticks_filename).write(
+            TickIndex.index_filename(ticks_filename)
+        )
+        config = {"tickrate": 64, "total_ticks": 2, "map_name": "de_mirage"}
+        with open(
+            ticks_filename.with_name(f"{ticks_filename.stem}_config.json"),
+            "w",
+        ) as f:
+            json.dump(config, f)
+
+    def test_content_hash_renamed(self):
+        # Arrange
+        renamed = shutil.copy(self.demo, self.demo_folder / "renamed.dem")
+        # Act
+        output = content_hash(renamed)
+        # Assert
+        assert output == content_hash(self.demo)
+
+    def test_plan_duplicates(self):
+        # Arrange
+        shutil.copy(self.demo, self.demo_folder / "copy.dem")
+        (self.demo_folder / "other.dem").write_bytes(b"other demo data")
+        demo_files = {
+            path.stem: path for path in self.demo_folder.glob("*.dem")
+        }
+        # Act
+        jobs, hashes = self.batch.plan(demo_files)
+        # Assert
+        assert len(jobs) == 2
+        assert hashes["copy"] == hashes["mirage"]
+
+    def test_plan_cached(self):
+        # Arrange
+        self.cache(self.demo)
+        # Act
+        cached_jobs, _ = self.batch.plan({"mirage": self.demo})
+        self.demo.write_bytes(b"changed demo data")
+        changed_jobs, _ = self.batch.plan({"mirage": self.demo})
+        # Assert
+        assert cached_jobs == {}
+        assert len(changed_jobs) == 1
+
+    def test_run_cached(self):
+        # Arrange
+        self.cache(self.demo)
+        shutil.copy(self.demo, self.demo_folder / "renamed.dem")
+        expected_output = ["cached", "cached"]
+        # Act
+        results = self.batch.run(self.demo_folder)
+        output = [result["status"] for result in results]
+        # Assert
+        assert output == expected_output
+        assert results[0]["ticks"] == 2
+        with open(self.cache_folder / BatchParser.MANIFEST) as f:
+            manifest = json.load(f)["demos"]
+        assert manifest["mirage"] == manifest["renamed"]
@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.lod import (
+    downsample,
+    lod_filename,
+    track_levels,
+    write_tracks,
+)
+from demodata_parser.postprocess import Pipeline, read_ticks
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_parser.tick_index import TickIndex
+
+
+class TestLod(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [
+            sample_tick(tick, kills=tick == 105) for tick in range(100, 110)
+        ]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_downsample_keeps_events(self):
+        # Arrange
+        self.ticks[3]["bomb"]["carrier"] = "tN1R"
+        # Act
+        output = [tick["tick"] for tick in downsample(iter(self.ticks), 4)]
+        # Assert
+        assert output == [100, 103, 104, 105, 108, 109]
+
+    def test_downsample_merges_shooting(self):
+        # Arrange
+        self.ticks[1]["shooting"] = [1]
+        self.ticks[2]["shooting"] = [2, 1]
+        # Act
+        output = list(downsample(iter(self.ticks), 4))
+        # Assert
+        assert output[1]["tick"] == 104
+        assert output[1]["shooting"] == [1, 2]
+
+    def test_downsample_hints(self):
+        # Act
+        output = list(downsample(iter(self.ticks), 4))
+        # Assert
+        player = output[0]["players"][0]
+        assert player["dx"] == 1.0  # x grows by 1 per tick
+        assert "dy" not in player and "dz" not in player
+        assert "dx" not in output[-1]["players"][0]
+
+    def test_write_tracks(self):
+        # Act
+        write_tracks(self.ticks_filename, [4, 2])
+        # Assert
+        assert track_levels(self.ticks_filename, []) == [2, 4]
+        assert track_levels(self.ticks_filename, ["flip_yz"]) == []
+        index = TickIndex.read(
+            TickIndex.index_filename(lod_filename(self.ticks_filename, 4))
+        )
+        assert list(index.ticks) == [100, 104, 105, 108, 109]
+        assert index.flags[2] == TickIndex.KILLS
+
+    def test_write_tracks_processed(self):
+        # Arrange
+        names = ["flip_yz", "intern_players"]
+        self.ticks[0]["players"] = []
+        self.ticks[1]["players"][0]["sid"] = 1  # Left out of the track
+        write_ticks_file(self.ticks_filename, self.ticks)
+        Pipeline.from_names(names).write(self.ticks_filename)
+        # Act
+        write_tracks(self.ticks_filename, [2], names)
+        output = list(read_ticks(lod_filename(self.ticks_filename, 2)))
+        # Assert
+        assert output[1]["players"][0]["sid"] == 1
+        assert output[1]["players"][0]["y"] == -171.125
+
+    def test_write_tracks_invalid(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            write_tracks(self.ticks_filename, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.packed import PackedWriter, packed_filename
+from demodata_parser.tick_index import TickIndex
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+
+
+class TestPackedWriter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.writer = PackedWriter()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_packed_filename(self):
+        # Arrange
+        expected_output = Path(self.tmp_dir.name) / "demo_packed.bin"
+        # Act
+        output = packed_filename(self.ticks_filename)
+        # Assert
+        assert output == expected_output
+
+    def test_write_smaller(self):
+        # Act
+        output = self.writer.write(self.ticks_filename)
+        # Assert
+        assert output.stat().st_size < self.ticks_filename.stat().st_size
+
+    def test_write_index(self):
+        # Arrange
+        expected_output = [tick["tick"] for tick in self.ticks]
+        # Act
+        output = self.writer.write(self.ticks_filename)
+        index = TickIndex.read(TickIndex.index_filename(output))
+        # Assert
+        assert list(index.ticks) == expected_output
+
+    def test_strings_interned(self):
+        # Arrange
+        expected_output = self.writer._string("AK-47")
+        # Act
+        output = self.writer._string("AK-47")
+        # Assert
+        assert output == expected_output
+        assert len(self.writer.strings) == 1
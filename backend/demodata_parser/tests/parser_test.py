@@ -1,6 +1,8 @@
+import tempfile
 import unittest
 from pathlib import Path
 from demodata_parser import DemodataParser, messages
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
 
 
 class TestDemodataParser(unittest.TestCase):
@@ -36,3 +38,72 @@ class TestDemodataParser(unittest.TestCase):
         output = self.parser.parse_filename()
         # Assert
         assert output == expected_output
+
+    def test_parse_skip_builds_index(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_ticks_file(Path(tmp_dir) / "test.json", [sample_tick(1)])
+            self.parser.demofile(Path(tmp_dir) / "test.dem", self.overwrite)
+            expected_output = Path(tmp_dir) / "test_index.bin"
+            # Act
+            self.parser.parse()
+            # Assert
+            assert expected_output.exists()
+
+    def test_parse_skip_records_timings(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_ticks_file(Path(tmp_dir) / "test.json", [sample_tick(1)])
+            self.parser.demofile(Path(tmp_dir) / "test.dem", self.overwrite)
+            expected_output = ["index", "timeline"]
+            # Act
+            self.parser.parse()
+            output = self.parser.timings
+            # Assert
+            assert sorted(output) == expected_output
+            assert all(seconds >= 0 for seconds in output.values())
+
+    def test_parse_skip_post_processes(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_ticks_file(Path(tmp_dir) / "test.json", [sample_tick(1)])
+            self.parser.demofile(
+                Path(tmp_dir) / "test.dem",
+                self.overwrite,
+                processors=["quantize"],
+            )
+            # Act
+            self.parser.parse()
+            output = self.parser.timings
+            # Assert
+            assert "process" in output
+            assert (Path(tmp_dir) / "test_processed.json").exists()
+
+    def test_parse_skip_builds_lod(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_ticks_file(Path(tmp_dir) / "test.json", [sample_tick(1)])
+            self.parser.demofile(
+                Path(tmp_dir) / "test.dem", self.overwrite, lod_levels=[4, 2]
+            )
+            # Act
+            self.parser.parse()
+            self.parser.parse()  # Tracks are built once
+            output = self.parser.timings
+            # Assert
+            assert "lod" not in output
+            assert (Path(tmp_dir) / "test_lod4.json").exists()
+
+    def test_start_marker_removes_old_output(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_ticks_file(Path(tmp_dir) / "test.json", [sample_tick(1)])
+            (Path(tmp_dir) / "test_packed.bin").write_bytes(b"EEPK")
+            self.parser.demofile(Path(tmp_dir) / "test.dem", True)
+            self.parser.parse_filename()
+            # Act
+            self.parser._start_marker()
+            # Assert
+            assert self.parser.parsing_filename().exists()
+            assert not self.parser.json_filename.exists()
+            assert not (Path(tmp_dir) / "test_packed.bin").exists()
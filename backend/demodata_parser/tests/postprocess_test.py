@@ -0,0 +1,126 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.postprocess import (
+    DropStationary,
+    FlipYZ,
+    InternPlayers,
+    Pipeline,
+    Quantize,
+    is_processed,
+    processed_filename,
+    processed_info_filename,
+    read_ticks,
+)
+from demodata_parser.tick_index import TickIndex
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+
+
+class TestPostProcessors(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ticks = [sample_tick(tick) for tick in range(100, 104)]
+
+    def test_flip_yz(self):
+        # Arrange
+        expected_output = (-171.125, -2178.5)
+        # Act
+        output = list(FlipYZ()(iter(self.ticks)))
+        player = output[0]["players"][0]
+        # Assert
+        assert (player["y"], player["z"]) == expected_output
+        assert output[0]["bomb"]["y"] == -251.96875
+
+    def test_quantize(self):
+        # Arrange
+        expected_output = (-163.2, 58.3)
+        # Act
+        output = list(Quantize(decimals=1)(iter(self.ticks)))
+        player = output[0]["players"][0]
+        # Assert
+        assert (player["x"], player["view_x"]) == expected_output
+
+    def test_intern_players(self):
+        # Arrange
+        self.ticks[1]["shooting"] = [76561198837117408]
+        processor = InternPlayers()
+        # Act
+        output = list(processor(iter(self.ticks)))
+        # Assert
+        assert output[0]["players"][0]["sid"] == 0
+        assert output[1]["shooting"] == [0]
+        assert processor.info() == {"players": [76561198837117408]}
+
+    def test_drop_stationary(self):
+        # Act
+        output = list(DropStationary(keyframe_interval=3)(iter(self.ticks)))
+        players = [tick["players"][0] for tick in output]
+        bombs = [tick["bomb"] for tick in output]
+        # Assert
+        assert "x" in players[1]  # Moving
+        assert "view_x" in players[0] and "view_x" not in players[1]
+        assert "x" in bombs[0] and "x" not in bombs[1]
+        assert "x" in bombs[3]  # Whole tick every keyframe_interval
+
+    def test_unknown_processor(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            Pipeline.from_names(["flip_yz", "sharpen"])
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.ticks[5] = sample_tick(105, round_start=True)
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.names = ["flip_yz", "intern_players"]
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_write(self):
+        # Act
+        output = Pipeline.from_names(self.names).write(self.ticks_filename)
+        ticks = list(read_ticks(output))
+        # Assert
+        assert output == processed_filename(self.ticks_filename)
+        assert [tick["tick"] for tick in ticks] == list(range(100, 110))
+        assert ticks[0]["players"][0]["sid"] == 0
+
+    def test_write_index(self):
+        # Act
+        output = Pipeline.from_names(self.names).write(self.ticks_filename)
+        index = TickIndex.read(TickIndex.index_filename(output))
+        # Assert
+        assert list(index.ticks) == list(range(100, 110))
+        assert index.round_starts() == [5]
+        with open(output, "rb") as f:
+            f.seek(index.offsets[3])
+            tick = json.loads(f.read(index.lengths[3]))
+        assert tick["tick"] == 103
+
+    def test_write_info(self):
+        # Act
+        Pipeline.from_names(self.names).write(self.ticks_filename)
+        with open(processed_info_filename(self.ticks_filename)) as f:
+            output = json.load(f)
+        # Assert
+        assert output["processors"] == self.names
+        assert output["players"] == [76561198837117408]
+
+    def test_is_processed(self):
+        # Arrange
+        missing = is_processed(self.ticks_filename, self.names)
+        Pipeline.from_names(self.names).write(self.ticks_filename)
+        # Act
+        output = is_processed(self.ticks_filename, self.names)
+        changed = is_processed(self.ticks_filename, ["flip_yz"])
+        # Assert
+        assert not missing
+        assert output
+        assert not changed
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+
+def sample_tick(
+    tick: int, round_start: bool = False, kills: bool = False
+) -> dict:
+    """Creates a tick following docs/backend/json_specification.md."""
+    return {
+        "tick": tick,
+        "round_time": tick / 64,
+        "round_start": round_start,
+        "switch": False,
+        "is_freeze": False,
+        "is_halftime": False,
+        "t": "HEROIC",
+        "ct": "Nemiga Gaming",
+        "t_wins": 0,
+        "ct_wins": 0,
+        "players": [
+            {
+                "sid": 76561198837117408,
+                "name": "1eeR",
+                "clan": "Nemiga Gaming",
+                "team": "CT",
+                "hp": 100,
+                "money": 2200,
+                "x": -263.25 + tick,
+                "y": -2178.5,
+                "z": -171.125,
+                "view_x": 58.327454,
+                "view_y": 0.087890625,
+                "actv_itm": "Five-SeveN",
+                "items": ["Knife", "Five-SeveN"],
+                "helmet": False,
+                "armor": 100,
+                "kit": False,
+                "is_ducking": False,
+                "is_walking": True,
+                "is_standing": True,
+                "is_air": False,
+                "is_rld": False,
+                "kills": 0,
+                "deaths": 6,
+                "assists": 1,
+                "dmg": 101,
+                "adr": 16.833333333333332,
+                "is_planting": False,
+                "is_defusing": False,
+            }
+        ],
+        "shooting": None,
+        "kills": (
+            [
+                {
+                    "killer": "tN1R",
+                    "victim": "khaN",
+                    "weapon": "AK-47",
+                    "is_hs": False,
+                    "penetrations": 0,
+                }
+            ]
+            if kills
+            else None
+        ),
+        "nades": None,
+        "infernos": None,
+        "nade_event": None,
+        "bomb": {
+            "carrier": "",
+            "x": 392.75,
+            "y": 336.5,
+            "z": -251.96875,
+            "planted": False,
+            "defused": False,
+            "exploded": False,
+            "planted_by": "",
+            "defused_by": "",
+        },
+    }
+
+
+def write_ticks_file(filename: Path, ticks: list[dict]) -> Path:
+    """Writes ticks using the same line per tick layout as the Go parser."""
+    lines = [json.dumps(tick, separators=(",", ":")) for tick in ticks]
+    with open(filename, "w") as f:
+        f.write('{"ticks": [\n')
+        f.write(",\n".join(lines))
+        f.write("\n]}")
+    return filename
@@ -0,0 +1,82 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.tick_index import TickIndex
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+
+
+class TestTickIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [
+            sample_tick(100),
+            sample_tick(101, round_start=True),
+            sample_tick(101, kills=True),
+            sample_tick(105),
+        ]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_index_filename(self):
+        # Arrange
+        expected_output = Path(self.tmp_dir.name) / "demo_index.bin"
+        # Act
+        output = TickIndex.index_filename(self.ticks_filename)
+        # Assert
+        assert output == expected_output
+
+    def test_build_spans(self):
+        # Arrange
+        index = TickIndex.build(self.ticks_filename)
+        expected_output = self.ticks
+        # Act
+        output = []
+        with open(self.ticks_filename, "rb") as file:
+            for entry in range(len(index)):
+                offset, length = index.span(entry)
+                file.seek(offset)
+                output.append(json.loads(file.read(length)))
+        # Assert
+        assert output == expected_output
+
+    def test_write_read(self):
+        # Arrange
+        index = TickIndex.build(self.ticks_filename)
+        index_filename = TickIndex.index_filename(self.ticks_filename)
+        # Act
+        output = TickIndex.read(index.write(index_filename))
+        # Assert
+        assert output.ticks == index.ticks
+        assert output.offsets == index.offsets
+        assert output.lengths == index.lengths
+        assert output.flags == index.flags
+
+    def test_entry(self):
+        # Arrange
+        index = TickIndex.build(self.ticks_filename)
+        # Act & Assert
+        assert index.entry(0) == 0
+        assert index.entry(101) == 1
+        assert index.entry(102) == 3
+        assert index.entry(200) == len(index)
+
+    def test_markers(self):
+        # Arrange
+        index = TickIndex.build(self.ticks_filename)
+        # Act & Assert
+        assert index.round_starts() == [1]
+        assert index.kills() == [2]
+
+    def test_build_invalid_file(self):
+        # Arrange
+        invalid_filename = Path(self.tmp_dir.name) / "invalid.json"
+        invalid_filename.write_text("{}")
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            TickIndex.build(invalid_filename)
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.tick_store import TickStore, store_filename
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+
+
+def two_player_tick(tick: int, round_start: bool = False) -> dict:
+    """Sample tick with a second, standing T player from tick 102 on."""
+    data = sample_tick(tick, round_start)
+    if tick >= 102:
+        player = dict(data["players"][0])
+        player.update(
+            sid=76561198000000001,
+            name="tN1R",
+            team="T",
+            x=100.0,
+            y=200.0,
+            hp=0 if tick >= 108 else 50,
+            dmg=tick - 100,
+        )
+        data["players"].append(player)
+    return data
+
+
+@unittest.skipUnless(TickStore.available(), "needs numpy")
+class TestTickStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [
+            two_player_tick(tick, round_start=tick == 105)
+            for tick in range(100, 110)
+        ]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.store = TickStore.build(self.ticks_filename)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_build_columns(self):
+        # Arrange
+        expected_output = (10, 2)
+        # Act
+        output = self.store.present.shape
+        # Assert
+        assert output == expected_output
+        assert list(self.store.names) == ["1eeR", "tN1R"]
+        assert self.store.present[:, 1].sum() == 8
+        assert list(self.store.rounds) == [0] * 5 + [1] * 5
+
+    def test_load_saves_store(self):
+        # Act
+        TickStore.load(self.ticks_filename)
+        output = TickStore.load(self.ticks_filename)
+        # Assert
+        assert store_filename(self.ticks_filename).exists()
+        assert list(output.ticks) == list(range(100, 110))
+        assert list(output.sids) == list(self.store.sids)
+
+    def test_load_rebuilds_outdated(self):
+        # Arrange
+        TickStore.load(self.ticks_filename)
+        os.utime(store_filename(self.ticks_filename), (0, 0))
+        write_ticks_file(self.ticks_filename, self.ticks[:5])
+        # Act
+        output = TickStore.load(self.ticks_filename)
+        # Assert
+        assert len(output) == 5
+
+    def test_player(self):
+        # Act & Assert
+        assert self.store.player("tN1R") == 1
+        assert self.store.player(76561198837117408) == 0
+        with self.assertRaises(KeyError):
+            self.store.player("nobody")
+
+    def test_heatmap_team(self):
+        # Arrange
+        extent = ((0, 200), (0, 400))
+        # Act
+        counts, _, _ = self.store.heatmap(team="T", bins=2, extent=extent)
+        # Assert
+        assert counts.sum() == 8
+        assert counts[1, 1] == 8
+
+    def test_heatmap_empty(self):
+        # Arrange
+        for tick in self.ticks:
+            tick["players"] = None
+        write_ticks_file(self.ticks_filename, self.ticks)
+        store = TickStore.build(self.ticks_filename)
+        # Act
+        counts, x_edges, _ = store.heatmap(bins=2)
+        filtered, _, _ = self.store.heatmap(team="T", round_number=5)
+        # Assert
+        assert counts.shape == (2, 2) and counts.sum() == 0
+        assert list(x_edges) == [0.0, 0.5, 1.0]
+        assert filtered.sum() == 0
+
+    def test_time_in_zone(self):
+        # Arrange
+        expected_output = {"tN1R": 6 / 64}  # Alive ticks 102-107
+        # Act
+        output = self.store.time_in_zone((50, 150), (150, 250))
+        # Assert
+        assert output == expected_output
+
+    def test_series(self):
+        # Act
+        ticks, values = self.store.series("dmg", "tN1R")
+        # Assert
+        assert list(ticks) == list(range(102, 110))
+        assert list(values) == list(range(2, 10))
+
+    def test_distance_travelled(self):
+        # Act
+        output = self.store.distance_travelled(round_number=1)
+        # Assert
+        assert output == {"1eeR": 4.0}
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.timeline import (
+    build_timeline,
+    filter_timeline,
+    read_timeline,
+    timeline_filename,
+)
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+
+
+class TestTimeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        ticks = [
+            sample_tick(100, round_start=True),
+            sample_tick(101, kills=True),
+            sample_tick(102),
+            sample_tick(103),
+            sample_tick(104, round_start=True),
+        ]
+        ticks[2]["bomb"]["planted"] = True
+        ticks[2]["bomb"]["planted_by"] = "tN1R"
+        ticks[3]["bomb"] = ticks[2]["bomb"]
+        ticks[3]["t_wins"] = 1
+        ticks[4]["t_wins"] = 1
+        ticks[4]["nade_event"] = {
+            "type": "Smoke Grenade",
+            "x": 1.0,
+            "y": 2.0,
+            "z": 3.0,
+        }
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", ticks
+        )
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_rounds(self):
+        # Arrange
+        expected_output = [(1, 100, 0), (2, 104, 4)]
+        # Act
+        timeline = build_timeline(self.ticks_filename)
+        output = [
+            (current["round"], current["tick"], current["entry"])
+            for current in timeline["rounds"]
+        ]
+        # Assert
+        assert output == expected_output
+
+    def test_events(self):
+        # Arrange
+        expected_output = [
+            ("kill", 101, 1),
+            ("bomb_planted", 102, 1),
+            ("round_won", 103, 1),
+            ("nade", 104, 2),
+        ]
+        # Act
+        timeline = build_timeline(self.ticks_filename)
+        output = [
+            (event["type"], event["tick"], event["round"])
+            for event in timeline["events"]
+        ]
+        # Assert
+        assert output == expected_output
+        assert timeline["events"][2]["side"] == "t"
+
+    def test_filter_player(self):
+        # Arrange
+        timeline = build_timeline(self.ticks_filename)
+        expected_output = ["kill", "bomb_planted"]
+        # Act
+        filtered = filter_timeline(timeline, player="tN1R")
+        output = [event["type"] for event in filtered["events"]]
+        # Assert
+        assert output == expected_output
+
+    def test_filter_round(self):
+        # Arrange
+        timeline = build_timeline(self.ticks_filename)
+        # Act
+        output = filter_timeline(timeline, types=["nade"], round_number=2)
+        # Assert
+        assert len(output["rounds"]) == 1
+        assert output["events"][0]["nade"] == "Smoke Grenade"
+
+    def test_read_writes_cache(self):
+        # Act
+        output = read_timeline(self.ticks_filename)
+        # Assert
+        assert timeline_filename(self.ticks_filename).exists()
+        assert output == build_timeline(self.ticks_filename)
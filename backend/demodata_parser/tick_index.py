@@ -0,0 +1,149 @@
+import sys
+import struct
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+# Layout of the $.json (ticks) file written by the Go parser
+TICKS_HEADER = b'{"ticks": ['
+TICK_LINE_PREFIX = b'{"tick":'
+ROUND_START_MARKER = b'"round_start":true'
+KILLS_MARKER = b'"kills":[{'
+
+
+def parsing_filename(ticks_filename: Path) -> Path:
+    """Creates $_parsing marker path from $.json path.
+
+    The marker exists while the parser is still writing the ticks file.
+    """
+    return ticks_filename.with_name(f"{ticks_filename.stem}_parsing")
+
+
+class TickIndex:
+    """Byte offsets of ticks in a parsed $.json (ticks) file.
+
+    The Go parser writes every tick on its own line, so each tick can be
+    located with a single seek. Ticks starting a round or containing kills
+    are flagged, which allows finding them without reading the ticks file.
+    """
+
+    MAGIC = b"EEIX"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHI")  # magic, version, number of entries
+    # Flags
+    ROUND_START = 1
+    KILLS = 2
+
+    def __init__(self):
+        self.ticks = array("i")  # Tick number of each entry
+        self.offsets = array("Q")  # Byte offset of each entry
+        self.lengths = array("I")  # Byte length of each entry
+        self.flags = array("B")
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    @staticmethod
+    def index_filename(ticks_filename: Path) -> Path:
+        """Creates $_index.bin path from $.json path."""
+        return ticks_filename.with_name(f"{ticks_filename.stem}_index.bin")
+
+    @staticmethod
+    def tick_flags(line: bytes) -> int:
+        """Finds the markers of a tick from its raw JSON."""
+        flags = 0
+        if ROUND_START_MARKER in line:
+            flags |= TickIndex.ROUND_START
+        if KILLS_MARKER in line:
+            flags |= TickIndex.KILLS
+        return flags
+
+    def append(self, tick: int, offset: int, length: int, flags: int) -> None:
+        """Adds an entry to the end of the index."""
+        self.ticks.append(tick)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.flags.append(flags)
+
+    def scan(self, file: BinaryIO) -> int:
+        """Indexes complete tick lines from the current file position.
+
+        Returns the offset after the last complete line, where scanning
+        can later continue from.
+        """
+        offset = file.tell()
+        for line in file:
+            if not line.endswith(b"\n"):
+                break  # Closing brackets or a line still being written
+            if line.startswith(TICK_LINE_PREFIX):
+                tick_json = line.rstrip(b",\r\n")
+                tick = int(
+                    tick_json[len(TICK_LINE_PREFIX) : tick_json.index(b",")]
+                )
+                self.append(
+                    tick, offset, len(tick_json), self.tick_flags(tick_json)
+                )
+            offset += len(line)
+        return offset
+
+    @classmethod
+    def build(cls, ticks_filename: Path) -> "TickIndex":
+        """Builds the index by reading the ticks file once."""
+        index = cls()
+        with open(ticks_filename, "rb") as file:
+            if file.readline().strip() != TICKS_HEADER:
+                raise ValueError(f"Not a ticks file: {ticks_filename}")
+            index.scan(file)
+        return index
+
+    def write(self, index_filename: Path) -> Path:
+        """Writes the index as a header followed by one column at a time."""
+        with open(index_filename, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self)))
+            for column in self._columns():
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                column.tofile(file)
+        return index_filename
+
+    @classmethod
+    def read(cls, index_filename: Path) -> "TickIndex":
+        """Reads an index written by TickIndex.write."""
+        index = cls()
+        with open(index_filename, "rb") as file:
+            magic, version, count = cls.HEADER.unpack(
+                file.read(cls.HEADER.size)
+            )
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f"Unsupported tick index: {index_filename}")
+            for column in index._columns():
+                column.fromfile(file, count)
+                if sys.byteorder == "big":
+                    column.byteswap()
+        return index
+
+    def _columns(self) -> tuple[array, ...]:
+        return (self.ticks, self.offsets, self.lengths, self.flags)
+
+    def entry(self, tick: int) -> int:
+        """Returns the first entry at or after the given tick."""
+        return bisect_left(self.ticks, tick)
+
+    def span(self, entry: int) -> tuple[int, int]:
+        """Returns the byte offset and length of an entry."""
+        return self.offsets[entry], self.lengths[entry]
+
+    def _flagged(self, flag: int) -> Iterator[int]:
+        return (
+            entry for entry, flags in enumerate(self.flags) if flags & flag
+        )
+
+    def round_starts(self) -> list[int]:
+        """Returns the entries where a round starts."""
+        return list(self._flagged(self.ROUND_START))
+
+    def kills(self) -> list[int]:
+        """Returns the entries containing kills."""
+        return list(self._flagged(self.KILLS))
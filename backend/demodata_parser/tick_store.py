@@ -0,0 +1,303 @@
+"""Columnar tick store of a parsed demo for analytics ($_store.npz).
+
+Player fields of every tick are held in NumPy arrays indexed by
+(entry, player), where entry is the number of the tick in $.json (as in
+the tick index) and player is the number of the player in order of
+appearance. Steam ids, names and teams are interned into tables. The
+store is built with one pass over the ticks file and saved next to it,
+so later queries only load the arrays:
+
+    store = TickStore.load(ticks_filename)
+    store.heatmap(team="CT", bins=64)
+    store.time_in_zone((-500, -200), (-2300, -2000))
+    store.series("dmg", "1eeR")
+
+NumPy is optional for the rest of the backend, so it is only needed
+when a store is used.
+"""
+
+import json
+import math
+from array import array
+from pathlib import Path
+from .postprocess import read_ticks
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VERSION = 1
+TEAMS = ("", "T", "CT")  # Team codes, 0 when not on a team
+# Heatmap extent of a demo without player positions
+EMPTY_EXTENT = ((0.0, 1.0), (0.0, 1.0))
+# Player columns: name, dtype, value when the player is missing
+COLUMNS = (
+    ("x", "float32", math.nan),
+    ("y", "float32", math.nan),
+    ("z", "float32", math.nan),
+    ("hp", "int16", 0),
+    ("dmg", "int32", 0),
+    ("adr", "float32", math.nan),
+    ("team", "int8", 0),
+)
+# Typecodes of the columns while they are read, see array
+_TYPECODES = {"float32": "f", "int16": "h", "int32": "i", "int8": "b"}
+
+
+def store_filename(ticks_filename: Path) -> Path:
+    """Creates $_store.npz path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_store.npz")
+
+
+class TickStore:
+    """Player columns of a demo and aggregate queries over them."""
+
+    def __init__(self, arrays: dict, tickrate: int = 64):
+        self.tickrate: int = tickrate
+        self.ticks = arrays["ticks"]  # Tick number of each entry
+        self.rounds = arrays["rounds"]  # Round of each entry, 0 before
+        self.sids = arrays["sids"]  # Steam id of each player
+        self.names = arrays["names"]  # Name of each player
+        self.present = arrays["present"]  # (entry, player) in the tick
+        self.columns: dict = {name: arrays[name] for name, _, _ in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    @staticmethod
+    def _check_available() -> None:
+        if np is None:
+            raise RuntimeError("The tick store needs numpy")
+
+    @classmethod
+    def build(cls, ticks_filename: Path, tickrate: int = 64) -> "TickStore":
+        """Reads the ticks file once into columns."""
+        cls._check_available()
+        ticks = array("i")
+        rounds = array("h")
+        players: dict[int, int] = {}  # Steam id -> player
+        names: list[str] = []
+        # One row per player of every tick: entry, player, columns...
+        entries = array("i")
+        numbers = array("h")
+        rows = {name: array(_TYPECODES[dtype]) for name, dtype, _ in COLUMNS}
+        round_number = 0
+        for entry, tick in enumerate(read_ticks(ticks_filename)):
+            if tick.get("round_start"):
+                round_number += 1
+            ticks.append(tick["tick"])
+            rounds.append(round_number)
+            for player in tick.get("players") or ():
+                number = players.get(player["sid"])
+                if number is None:
+                    number = players[player["sid"]] = len(players)
+                    names.append(player["name"])
+                entries.append(entry)
+                numbers.append(number)
+                for name, _, _ in COLUMNS:
+                    if name == "team":
+                        value = player["team"]
+                        rows[name].append(
+                            TEAMS.index(value) if value in TEAMS else 0
+                        )
+                    else:
+                        rows[name].append(player[name])
+        shape = (len(ticks), len(players))
+        index = (
+            np.frombuffer(entries, dtype=np.int32),
+            np.frombuffer(numbers, dtype=np.int16),
+        )
+        arrays = {
+            "ticks": np.array(ticks, dtype=np.int32),
+            "rounds": np.array(rounds, dtype=np.int16),
+            "sids": np.array(list(players), dtype=np.uint64),
+            "names": np.array(names, dtype=str),
+            "present": np.zeros(shape, dtype=bool),
+        }
+        arrays["present"][index] = True
+        for name, dtype, missing in COLUMNS:
+            column = np.full(shape, missing, dtype=dtype)
+            column[index] = np.frombuffer(rows[name], dtype=dtype)
+            arrays[name] = column
+        return cls(arrays, tickrate)
+
+    def save(self, filename: Path) -> Path:
+        """Writes the columns as an uncompressed .npz file."""
+        np.savez(
+            filename,
+            version=VERSION,
+            tickrate=self.tickrate,
+            ticks=self.ticks,
+            rounds=self.rounds,
+            sids=self.sids,
+            names=self.names,
+            present=self.present,
+            **self.columns,
+        )
+        return filename
+
+    @classmethod
+    def read(cls, filename: Path) -> "TickStore":
+        """Reads a store written by TickStore.save."""
+        cls._check_available()
+        with np.load(filename) as data:
+            if int(data["version"]) != VERSION:
+                raise ValueError(f"Unsupported tick store: {filename}")
+            arrays = {name: data[name] for name in data.files}
+        return cls(arrays, int(arrays["tickrate"]))
+
+    @classmethod
+    def load(cls, ticks_filename: Path) -> "TickStore":
+        """Reads the $_store.npz of a demo, building it first if needed.
+
+        The store is built again if the ticks file is newer.
+        """
+        filename = store_filename(ticks_filename)
+        try:
+            if filename.stat().st_mtime >= ticks_filename.stat().st_mtime:
+                return cls.read(filename)
+        except (OSError, ValueError, KeyError):
+            pass
+        tickrate = 64
+        config_filename = ticks_filename.with_name(
+            f"{ticks_filename.stem}_config.json"
+        )
+        try:
+            with open(config_filename) as f:
+                tickrate = json.load(f)["tickrate"] or tickrate
+        except (OSError, ValueError, KeyError):
+            pass
+        store = cls.build(ticks_filename, tickrate)
+        store.save(filename)
+        return store
+
+    def player(self, name_or_sid: str | int) -> int:
+        """Returns the number of a player. Raises KeyError if unknown."""
+        if isinstance(name_or_sid, str):
+            found = np.flatnonzero(self.names == name_or_sid)
+        else:
+            found = np.flatnonzero(self.sids == np.uint64(name_or_sid))
+        if not len(found):
+            raise KeyError(f"Unknown player: {name_or_sid}")
+        return int(found[0])
+
+    def mask(self, team: str | None = None, round_number: int | None = None):
+        """Selects the (entry, player) cells of a team and/or round."""
+        selected = self.present.copy()
+        if team is not None:
+            selected &= self.columns["team"] == TEAMS.index(team)
+        if round_number is not None:
+            selected &= (self.rounds == round_number)[:, None]
+        return selected
+
+    def durations(self):
+        """Returns the seconds each entry lasts, until the next entry."""
+        if not len(self.ticks):
+            return np.zeros(0)
+        steps = np.diff(self.ticks, append=self.ticks[-1] + 1)
+        return steps / self.tickrate
+
+    def heatmap(
+        self,
+        team: str | None = None,
+        round_number: int | None = None,
+        bins: int = 64,
+        extent: tuple | None = None,
+    ) -> tuple:
+        """Counts player positions on an x/y grid.
+
+        Returns the counts (bins x bins, x first) and the x and y bin
+        edges. The extent ((x_min, x_max), (y_min, y_max)) defaults to
+        the positions of the whole demo, so heatmaps of one demo match,
+        and to EMPTY_EXTENT if it has no positions.
+        """
+        if extent is None:
+            alive = self.present & ~np.isnan(self.columns["x"])
+            if not alive.any():
+                extent = EMPTY_EXTENT
+            else:
+                extent = (
+                    (
+                        self.columns["x"][alive].min(),
+                        self.columns["x"][alive].max(),
+                    ),
+                    (
+                        self.columns["y"][alive].min(),
+                        self.columns["y"][alive].max(),
+                    ),
+                )
+        selected = self.mask(team, round_number)
+        counts, x_edges, y_edges = np.histogram2d(
+            self.columns["x"][selected],
+            self.columns["y"][selected],
+            bins=bins,
+            range=extent,
+        )
+        return counts, x_edges, y_edges
+
+    def time_in_zone(
+        self,
+        x_range: tuple[float, float],
+        y_range: tuple[float, float],
+        team: str | None = None,
+        round_number: int | None = None,
+        alive_only: bool = True,
+    ) -> dict[str, float]:
+        """Returns the seconds each player spent in an x/y rectangle."""
+        x = self.columns["x"]
+        y = self.columns["y"]
+        inside = (
+            self.mask(team, round_number)
+            & (x >= x_range[0])
+            & (x <= x_range[1])
+            & (y >= y_range[0])
+            & (y <= y_range[1])
+        )
+        if alive_only:
+            inside &= self.columns["hp"] > 0
+        seconds = (inside * self.durations()[:, None]).sum(axis=0)
+        return {
+            str(name): float(value)
+            for name, value in zip(self.names, seconds)
+            if value
+        }
+
+    def series(self, field: str, name_or_sid: str | int) -> tuple:
+        """Returns the ticks and values of a player field, e.g. dmg."""
+        number = self.player(name_or_sid)
+        present = self.present[:, number]
+        return self.ticks[present], self.columns[field][present, number]
+
+    def distance_travelled(
+        self,
+        team: str | None = None,
+        round_number: int | None = None,
+        max_step: float = 100.0,
+    ) -> dict[str, float]:
+        """Returns the distance each player moved (x, y, z).
+
+        Steps between entries of different rounds or longer than
+        max_step (e.g. respawns) are not counted.
+        """
+        positions = np.stack(
+            [self.columns[axis] for axis in ("x", "y", "z")], axis=-1
+        )
+        steps = np.linalg.norm(np.diff(positions, axis=0), axis=-1)
+        selected = self.mask(team, round_number)
+        counted = (
+            selected[1:]
+            & selected[:-1]
+            & (self.rounds[1:] == self.rounds[:-1])[:, None]
+            & (steps <= max_step)
+        )
+        distances = np.where(counted, steps, 0.0).sum(axis=0)
+        return {
+            str(name): float(value)
+            for name, value in zip(self.names, distances)
+            if value
+        }
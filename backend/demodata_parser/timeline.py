@@ -0,0 +1,180 @@
+"""Round and event timeline of a parsed demo ($_timeline.json).
+
+Built once after parsing by reading the ticks file, so that rounds and
+events can be found without streaming the whole demo:
+
+    {"version": 1,
+     "rounds": [{"round": 1, "tick": 1234, "entry": 0, "t": ..., "ct": ...,
+                 "t_wins": 0, "ct_wins": 0}, ...],
+     "events": [{"type": "kill", "tick": 2345, "entry": 1111, "round": 1,
+                 "killer": ..., "victim": ..., "weapon": ..., "is_hs": ...},
+                ...]}
+
+Event types are "kill", "nade", "bomb_planted", "bomb_defused",
+"bomb_exploded", "round_won" and "switch". The entry is the number of
+the tick in the ticks file, i.e. its entry in the tick index.
+"""
+
+import json
+from pathlib import Path
+from .tick_index import TICKS_HEADER, TICK_LINE_PREFIX
+
+VERSION = 1
+EVENT_TYPES = (
+    "kill",
+    "nade",
+    "bomb_planted",
+    "bomb_defused",
+    "bomb_exploded",
+    "round_won",
+    "switch",
+)
+# Fields naming a player in events
+PLAYER_FIELDS = ("killer", "victim", "by")
+
+
+def timeline_filename(ticks_filename: Path) -> Path:
+    """Creates $_timeline.json path from $.json path."""
+    return ticks_filename.with_name(f"{ticks_filename.stem}_timeline.json")
+
+
+class TimelineBuilder:
+    """Collects rounds and events from ticks in file order."""
+
+    def __init__(self):
+        self.rounds: list[dict] = []
+        self.events: list[dict] = []
+        self.previous: dict | None = None
+
+    def _event(self, event_type: str, tick: dict, entry: int, **data) -> None:
+        self.events.append(
+            {
+                "type": event_type,
+                "tick": tick["tick"],
+                "entry": entry,
+                "round": len(self.rounds),
+                **data,
+            }
+        )
+
+    def _bomb_events(self, tick: dict, entry: int) -> None:
+        bomb = tick["bomb"]
+        previous = self.previous["bomb"] if self.previous else {}
+        if bomb["planted"] and not previous.get("planted"):
+            self._event("bomb_planted", tick, entry, by=bomb["planted_by"])
+        if bomb["defused"] and not previous.get("defused"):
+            self._event("bomb_defused", tick, entry, by=bomb["defused_by"])
+        if bomb["exploded"] and not previous.get("exploded"):
+            self._event("bomb_exploded", tick, entry)
+
+    def _round_won(self, tick: dict, entry: int) -> None:
+        if self.previous is None or tick["switch"]:
+            return  # Wins are swapped with the sides
+        for side in ("t", "ct"):
+            if tick[f"{side}_wins"] > self.previous[f"{side}_wins"]:
+                self._event(
+                    "round_won", tick, entry, side=side, team=tick[side]
+                )
+
+    def add(self, tick: dict, entry: int) -> None:
+        """Adds the rounds and events of the next tick."""
+        if tick["round_start"]:
+            self.rounds.append(
+                {
+                    "round": len(self.rounds) + 1,
+                    "tick": tick["tick"],
+                    "entry": entry,
+                    "t": tick["t"],
+                    "ct": tick["ct"],
+                    "t_wins": tick["t_wins"],
+                    "ct_wins": tick["ct_wins"],
+                }
+            )
+        if tick["switch"]:
+            self._event("switch", tick, entry)
+        for kill in tick["kills"] or ():
+            self._event("kill", tick, entry, **kill)
+        if tick["nade_event"] is not None:
+            nade_event = tick["nade_event"]
+            self._event(
+                "nade",
+                tick,
+                entry,
+                nade=nade_event["type"],
+                x=nade_event["x"],
+                y=nade_event["y"],
+                z=nade_event["z"],
+            )
+        self._bomb_events(tick, entry)
+        self._round_won(tick, entry)
+        self.previous = tick
+
+    def timeline(self) -> dict:
+        return {
+            "version": VERSION,
+            "rounds": self.rounds,
+            "events": self.events,
+        }
+
+
+def build_timeline(ticks_filename: Path) -> dict:
+    """Builds the timeline by reading the ticks file once."""
+    builder = TimelineBuilder()
+    with open(ticks_filename, "rb") as file:
+        if file.readline().strip() != TICKS_HEADER:
+            raise ValueError(f"Not a ticks file: {ticks_filename}")
+        entry = 0
+        for line in file:
+            if line.startswith(TICK_LINE_PREFIX):
+                builder.add(json.loads(line.rstrip(b",\r\n")), entry)
+                entry += 1
+    return builder.timeline()
+
+
+def write_timeline(ticks_filename: Path, timeline: dict | None = None) -> Path:
+    """Writes $_timeline.json next to $_config.json."""
+    output_filename = timeline_filename(ticks_filename)
+    if timeline is None:
+        timeline = build_timeline(ticks_filename)
+    with open(output_filename, "w") as f:
+        json.dump(timeline, f, separators=(",", ":"))
+    return output_filename
+
+
+def read_timeline(ticks_filename: Path) -> dict:
+    """Reads $_timeline.json, building it first if missing or outdated."""
+    try:
+        with open(timeline_filename(ticks_filename)) as f:
+            timeline = json.load(f)
+        if timeline.get("version") == VERSION:
+            return timeline
+    except (OSError, ValueError):
+        pass
+    timeline = build_timeline(ticks_filename)
+    write_timeline(ticks_filename, timeline)
+    return timeline
+
+
+def filter_timeline(
+    timeline: dict,
+    types: list[str] | None = None,
+    player: str | None = None,
+    round_number: int | None = None,
+) -> dict:
+    """Selects the events of given types, player and/or round."""
+    events = [
+        event
+        for event in timeline["events"]
+        if (types is None or event["type"] in types)
+        and (
+            player is None
+            or any(event.get(field) == player for field in PLAYER_FIELDS)
+        )
+        and (round_number is None or event["round"] == round_number)
+    ]
+    rounds = [
+        current
+        for current in timeline["rounds"]
+        if round_number is None or current["round"] == round_number
+    ]
+    return {**timeline, "rounds": rounds, "events": events}
@@ -0,0 +1,182 @@
+from collections import deque
+from typing import Awaitable, Callable
+from tornado.locks import Event
+
+# What to do when a client's queue is full
+SLOW_CLIENT_POLICIES = ("keyframe", "skip", "disconnect")
+DELTA_PREFIX = b'{"delta":'
+BATCH_DELTA_PREFIX = b"[" + DELTA_PREFIX
+
+
+def is_keyframe(frame: bytes | str) -> bool:
+    """Checks if a frame can be played without the frames before it.
+
+    Full ticks and delta stream keyframes can, deltas cannot. A batch of
+    ticks can if its first tick can. Control messages (str) are never
+    dropped.
+    """
+    return not isinstance(frame, bytes) or not frame.startswith(
+        (DELTA_PREFIX, BATCH_DELTA_PREFIX)
+    )
+
+
+class ClientWriter:
+    """Bounded outgoing queue of a client, sent by a single coroutine.
+
+    Frames are written one at a time, and the next one is written only
+    when the previous write has been flushed to the socket. When a slow
+    client lets the queue fill up, the policy decides what happens:
+
+    - "keyframe": drop queued frames before the latest keyframe
+    - "skip": drop the incoming ticks until there is room again
+    - "disconnect": close the connection
+
+    After ticks have been dropped, on_drop is called, so that the session
+    sends a keyframe next, and deltas are dropped until it arrives.
+
+    Control messages count against the bound too. They are never
+    dropped, queued ticks are dropped to make room for them, and a client
+    whose queue is full of messages is disconnected.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[bytes | str], Awaitable],
+        max_frames: int = 256,
+        policy: str = "keyframe",
+        on_drop: Callable[[], None] | None = None,
+        on_overflow: Callable[[], None] | None = None,
+    ):
+        if policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Invalid slow client policy: {policy}")
+        self.write: Callable[[bytes | str], Awaitable] = write
+        self.max_frames: int = max(1, max_frames)
+        self.policy: str = policy
+        self.on_drop: Callable[[], None] | None = on_drop
+        self.on_overflow: Callable[[], None] | None = on_overflow
+        self.queue: deque[bytes | str] = deque()
+        self.closed: bool = False
+        self.resync: bool = False  # Dropping deltas until a keyframe
+        self._ready: Event = Event()
+        # Stats
+        self.max_depth: int = 0
+        self.sent: int = 0
+        self.dropped: int = 0
+        self.overflows: int = 0
+
+    def put(self, frame: bytes | str) -> bool:
+        """Queues a frame, returns False if the frame was dropped."""
+        if self.closed:
+            return False
+        if self.resync and isinstance(frame, bytes):
+            if not is_keyframe(frame):
+                self.dropped += 1
+                return False
+            self.resync = False
+        if len(self.queue) >= self.max_frames and not self._make_room(frame):
+            return False
+        self.queue.append(frame)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self._ready.set()
+        return True
+
+    def backlog(self) -> float:
+        """Returns how full the queue is, from 0 to 1."""
+        return len(self.queue) / self.max_frames
+
+    def put_many(self, frames: list[bytes | str]) -> None:
+        for frame in frames:
+            self.put(frame)
+
+    def _make_room(self, frame: bytes | str) -> bool:
+        """Applies the policy to a full queue, True if the frame fits."""
+        self.overflows += 1
+        if self.policy == "disconnect":
+            return self._disconnect()
+        if isinstance(frame, str):
+            # A message is not dropped, the queued ticks are
+            if self._drop_ticks():
+                self._resync()
+            return self._has_room() or self._disconnect()
+        if self.policy == "keyframe" and is_keyframe(frame):
+            # The new frame is the latest keyframe
+            self._drop_ticks()
+            return self._has_room() or self._disconnect()
+        if self.policy == "keyframe":
+            latest = None
+            for position, queued in enumerate(self.queue):
+                if isinstance(queued, bytes) and is_keyframe(queued):
+                    latest = position
+            if latest:  # Nothing to drop if it is the oldest frame
+                self._drop_ticks(latest)
+                if self._has_room():
+                    return True
+        # Skip: drop the new frame, and deltas after it
+        self.dropped += 1
+        self._resync()
+        return False
+
+    def _has_room(self) -> bool:
+        return len(self.queue) < self.max_frames
+
+    def _resync(self) -> None:
+        """Drops deltas until the keyframe asked with on_drop arrives."""
+        self.resync = True
+        if self.on_drop:
+            self.on_drop()
+
+    def _disconnect(self) -> bool:
+        """Closes the connection of a client that is not reading."""
+        self.close()
+        if self.on_overflow:
+            self.on_overflow()
+        return False
+
+    def drop_ticks(self) -> None:
+        """Drops every queued tick, e.g. after a seek."""
+        self._drop_ticks()
+        self.resync = False
+
+    def _drop_ticks(self, count: int | None = None) -> int:
+        """Drops queued ticks (the first count frames), keeps messages.
+
+        Returns the number of ticks dropped.
+        """
+        count = len(self.queue) if count is None else count
+        kept = []
+        for _ in range(count):
+            frame = self.queue.popleft()
+            if isinstance(frame, bytes):
+                self.dropped += 1
+            else:
+                kept.append(frame)
+        self.queue.extendleft(reversed(kept))
+        return count - len(kept)
+
+    async def run(self) -> None:
+        """Writes queued frames until the writer is closed."""
+        while not self.closed:
+            if not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            frame = self.queue.popleft()
+            await self.write(frame)
+            self.sent += 1
+
+    def close(self) -> None:
+        """Stops the writer and drops the queued frames."""
+        self.closed = True
+        self.queue.clear()
+        self._ready.set()
+
+    def stats(self) -> dict:
+        """Returns the queue depth and drop counts."""
+        return {
+            "queue_depth": len(self.queue),
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "overflows": self.overflows,
+            "policy": self.policy,
+        }
@@ -0,0 +1,66 @@
+import time
+from multiprocessing import Value
+
+
+class LiveCoordinator:
+    """Shared playhead of the live broadcast, for server worker processes.
+
+    Worker processes share one listen socket (SO_REUSEPORT), so the
+    clients of one broadcast are spread over processes. The coordinator
+    is created before the workers are started and holds, in shared
+    memory, the time the broadcast started and the number of clients of
+    every worker. New clients of any worker join the broadcast at the
+    same live tick, computed from that start time on the monotonic
+    clock, which is the same for every process of the machine. When the
+    last client leaves, the next one starts a new broadcast.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._started = Value("d", 0.0)  # 0.0 until the first client
+        self._clients = Value("i", 0)
+
+    def _start(self, now: float) -> float:
+        """Returns the start time, starting the broadcast if needed."""
+        with self._started.get_lock():
+            if not self._started.value:
+                self._started.value = now
+            return self._started.value
+
+    def live_tick(
+        self,
+        first_tick: int,
+        last_tick: int,
+        tickrate: int,
+        speed: float = 1.0,
+        loop_mode: bool = False,
+        now: float | None = None,
+    ) -> int:
+        """Returns the demo tick the broadcast is at now.
+
+        The broadcast starts from the first tick when the first client of
+        any worker joins, or joins after all clients have left. In loop mode it wraps around to the first tick
+        after the last one, otherwise it stays at the last tick.
+        """
+        now = self.clock() if now is None else now
+        elapsed = now - self._start(now)
+        ticks = int(elapsed * tickrate * speed)
+        length = last_tick - first_tick + 1
+        if loop_mode and length > 0:
+            ticks %= length
+        return min(first_tick + ticks, last_tick)
+
+    def add_client(self, count: int = 1) -> int:
+        """Adds (or removes) clients, returns the clients of all workers."""
+        with self._clients.get_lock():
+            self._clients.value += count
+            if self._clients.value <= 0:
+                with self._started.get_lock():
+                    self._started.value = 0.0
+            return self._clients.value
+
+    def stats(self) -> dict:
+        return {
+            "clients": self._clients.value,
+            "started": bool(self._started.value),
+        }
@@ -0,0 +1,168 @@
+"""Delta-encoded tick stream.
+
+A keyframe message {"key": tick} carries a whole tick. In between, a
+delta message {"delta": {...}} carries only what changed since the
+previous tick:
+
+- top-level fields whose value changed (always "tick")
+- "bomb": the changed bomb fields
+- "players", "nades", "infernos": the changed fields of entities keyed
+  by ENTITIES (whole entities when new), "<list>_removed": ids of removed
+  entities and "<list>_order": ids in order, if the order changed. A list
+  changing to or from null is sent whole.
+- "shooting", "kills", "nade_event": sent whenever not null, as they are
+  events of the tick and not state
+"""
+
+import copy
+
+# Entity lists and the field identifying an entity
+ENTITIES = {"players": "sid", "nades": "id", "infernos": "id"}
+# Fields describing events of a single tick
+EVENTS = ("shooting", "kills", "nade_event")
+# Delta fields of entity lists
+ENTITY_FIELDS = {
+    f"{key}{suffix}"
+    for key in ENTITIES
+    for suffix in ("", "_removed", "_order")
+}
+
+
+def _entity_ids(entities: list[dict] | None, id_key: str) -> list:
+    return [entity[id_key] for entity in entities or ()]
+
+
+def _diff_entities(
+    delta: dict, key: str, previous: list[dict], current: list[dict]
+) -> None:
+    """Adds the changes between two lists of entities to a delta."""
+    id_key = ENTITIES[key]
+    previous_by_id = {entity[id_key]: entity for entity in previous}
+    changed = []
+    for entity in current:
+        old = previous_by_id.pop(entity[id_key], None)
+        if old is None:
+            changed.append(entity)
+            continue
+        fields = {
+            field: value
+            for field, value in entity.items()
+            if old.get(field) != value
+        }
+        if fields:
+            changed.append({id_key: entity[id_key], **fields})
+    if changed:
+        delta[key] = changed
+    if previous_by_id:
+        delta[f"{key}_removed"] = list(previous_by_id)
+    current_order = _entity_ids(current, id_key)
+    kept_order = [
+        entity_id
+        for entity_id in _entity_ids(previous, id_key)
+        if entity_id not in previous_by_id
+    ]
+    added = [
+        entity_id for entity_id in current_order if entity_id not in kept_order
+    ]
+    if kept_order + added != current_order:
+        delta[f"{key}_order"] = current_order
+
+
+def diff_ticks(previous: dict, current: dict) -> dict:
+    """Returns the delta from the previous tick to the current tick."""
+    delta = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if key in EVENTS:
+            if value is not None:
+                delta[key] = value
+        elif key in ENTITIES and old is not None and value is not None:
+            _diff_entities(delta, key, old, value)
+        elif key == "bomb" and old is not None:
+            fields = {
+                field: bomb_value
+                for field, bomb_value in value.items()
+                if old.get(field) != bomb_value
+            }
+            if fields:
+                delta[key] = fields
+        elif key == "tick" or old != value:
+            delta[key] = value
+    return delta
+
+
+class DeltaEncoder:
+    """Encodes the ticks of one stream as keyframes and deltas."""
+
+    def __init__(self, keyframe_interval: int = 64):
+        self.keyframe_interval: int = max(1, keyframe_interval)
+        self.previous: dict | None = None
+        self.since_keyframe: int = 0
+
+    def reset(self) -> None:
+        """Sends the next tick as a keyframe, e.g. after a seek."""
+        self.previous = None
+
+    def encode(self, tick: dict) -> dict:
+        """Encodes a tick as a keyframe or a delta message."""
+        if (
+            self.previous is None
+            or self.since_keyframe >= self.keyframe_interval
+        ):
+            message = {"key": tick}
+            self.since_keyframe = 1
+        else:
+            message = {"delta": diff_ticks(self.previous, tick)}
+            self.since_keyframe += 1
+        self.previous = tick
+        return message
+
+
+class DeltaDecoder:
+    """Reference decoder rebuilding whole ticks from a delta stream."""
+
+    def __init__(self):
+        self.state: dict | None = None
+
+    def _apply_entities(self, key: str, delta: dict) -> None:
+        id_key = ENTITIES[key]
+        entities = {entity[id_key]: entity for entity in self.state[key] or ()}
+        for entity_id in delta.get(f"{key}_removed", ()):
+            entities.pop(entity_id, None)
+        for changes in delta.get(key, ()):
+            entity = entities.get(changes[id_key])
+            if entity is None:
+                entities[changes[id_key]] = copy.deepcopy(changes)
+            else:
+                entity.update(copy.deepcopy(changes))
+        order = delta.get(f"{key}_order", list(entities))
+        self.state[key] = [entities[entity_id] for entity_id in order]
+
+    def apply(self, message: dict) -> dict:
+        """Applies a keyframe or delta message and returns the whole tick."""
+        if "key" in message:
+            self.state = copy.deepcopy(message["key"])
+            return copy.deepcopy(self.state)
+        if self.state is None:
+            raise ValueError("Delta received before a keyframe")
+        delta = message["delta"]
+        for key in EVENTS:
+            self.state[key] = copy.deepcopy(delta.get(key))
+        for key in ENTITIES:
+            if key in delta and (
+                delta[key] is None or self.state[key] is None
+            ):
+                self.state[key] = copy.deepcopy(delta[key])
+            elif any(
+                f"{key}{suffix}" in delta
+                for suffix in ("", "_removed", "_order")
+            ):
+                self._apply_entities(key, delta)
+        for key, value in delta.items():
+            if key in EVENTS or key in ENTITY_FIELDS:
+                continue
+            if key == "bomb":
+                self.state["bomb"].update(value)
+            else:
+                self.state[key] = copy.deepcopy(value)
+        return copy.deepcopy(self.state)
@@ -0,0 +1,44 @@
+from collections import deque
+
+
+class FrameRing:
+    """The most recent encoded frames of a session, with their ticks.
+
+    Frames are kept as encoded for the client (full ticks, keyframes or
+    deltas), so a client that reconnects can be sent the frames it
+    missed as they were, without reading or encoding the ticks again.
+    Full ticks are the same bytes as in the tick cache, so they are not
+    copied. Only the last size frames are kept, and the ring is cleared
+    when the stream jumps (seek, loop, new stream mode).
+    """
+
+    def __init__(self, size: int = 256):
+        self.frames: deque[tuple[int, bytes]] = deque(maxlen=max(1, size))
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def append(self, tick: int, frame: bytes) -> None:
+        self.frames.append((tick, frame))
+
+    def clear(self) -> None:
+        self.frames.clear()
+
+    def latest(self) -> bytes | None:
+        """Returns the newest frame, None if there are no frames."""
+        return self.frames[-1][1] if self.frames else None
+
+    def since(self, tick: int) -> list[bytes] | None:
+        """Returns the frames after the frame of a tick.
+
+        Returns None if the frame of the tick is no longer (or was never)
+        in the ring, as the frames after it would leave a gap.
+        """
+        if self.frames and tick >= self.frames[-1][0]:
+            return [] if tick == self.frames[-1][0] else None
+        for position, (frame_tick, _) in enumerate(self.frames):
+            if frame_tick == tick:
+                return [
+                    frame for _, frame in list(self.frames)[position + 1 :]
+                ]
+        return None
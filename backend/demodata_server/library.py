@@ -0,0 +1,164 @@
+import logging
+from asyncio import Future
+from collections import OrderedDict
+from pathlib import Path
+from tornado.ioloop import IOLoop
+from demodata_parser.packed import packed_filename
+from demodata_parser.tick_index import TickIndex
+from . import messages as msg
+from .source import TickSource
+from .tick_cache import TickCache
+
+
+class DemoLibrary:
+    """Parsed demos of a folder, served from a single server process.
+
+    A demo is identified by its $.json path relative to the folder,
+    without the suffix (e.g. "test_demos/random_1"). Demos are loaded on
+    first request, and the least recently used idle demos are dropped
+    when more than max_demos are loaded. With packed=True, demos are read
+    from their $_packed.bin containers when they have one, and with
+    mapped=True the files are memory-mapped. With processed=True, demos
+    are read from their $_processed.json when they have one. The ticks of
+    every demo are cached in the given TickCache.
+    """
+
+    def __init__(
+        self,
+        demo_folder: Path,
+        max_demos: int = 16,
+        packed: bool = False,
+        cache: TickCache | None = None,
+        mapped: bool = False,
+        processed: bool = False,
+    ):
+        self.demo_folder: Path = demo_folder
+        self.max_demos: int = max_demos
+        self.packed: bool = packed
+        self.cache: TickCache = cache if cache is not None else TickCache()
+        self.mapped: bool = mapped
+        self.processed: bool = processed
+        self._demos: OrderedDict[str, TickSource] = OrderedDict()
+        self._indexing: dict[str, Future] = {}  # Demo id -> index build
+        self._indexes: dict[str, TickIndex] = {}  # Built, not loaded yet
+
+    def _log(self, message: str, level: str = "info") -> None:
+        """Helper method for logging messages with class name."""
+        class_name = "LIBRARY"
+        log_func = getattr(logging, level, logging.info)
+        log_func(f"{class_name} - {message}")
+
+    def loaded(self) -> list[str]:
+        """Returns the ids of loaded demos, least recently used first."""
+        return list(self._demos)
+
+    def demo_ids(self) -> list[str]:
+        """Lists every parsed demo, i.e. $.json with a $_config.json."""
+        demo_ids = []
+        for config_filename in self.demo_folder.rglob("*_config.json"):
+            ticks_filename = config_filename.with_name(
+                config_filename.name.removesuffix("_config.json") + ".json"
+            )
+            if ticks_filename.exists():
+                demo_ids.append(self._demo_id(ticks_filename))
+        return sorted(demo_ids)
+
+    def _demo_id(self, ticks_filename: Path) -> str:
+        return (
+            ticks_filename.relative_to(self.demo_folder)
+            .with_suffix("")
+            .as_posix()
+        )
+
+    def ticks_filename(self, demo_id: str) -> Path:
+        """Returns the $.json path of a demo inside the demo folder."""
+        ticks_filename = (self.demo_folder / f"{demo_id}.json").resolve()
+        if not ticks_filename.is_relative_to(self.demo_folder.resolve()):
+            raise KeyError(f"{msg.DEMO_NOT_FOUND}: {demo_id}")
+        return ticks_filename
+
+    def _source(self, demo_id: str) -> TickSource:
+        """Creates the source of a demo, not loaded yet."""
+        ticks_filename = self.ticks_filename(demo_id)
+        if not ticks_filename.exists():
+            raise KeyError(f"{msg.DEMO_NOT_FOUND}: {demo_id}")
+        packed = self.packed and packed_filename(ticks_filename).exists()
+        return TickSource(
+            ticks_filename,
+            cache=self.cache,
+            packed=packed,
+            mapped=self.mapped,
+            processed=self.processed,
+        )
+
+    async def prepare(self, demo_id: str) -> None:
+        """Indexes a demo that has no $_index.bin, off the event loop.
+
+        Indexing scans the whole ticks file, so it is done in an executor
+        before acquire, and the other streams are not stalled meanwhile.
+        Raises KeyError for unknown demos.
+        """
+        if demo_id in self._demos:
+            return
+        building = self._indexing.get(demo_id)
+        if building is not None:
+            await building
+            return
+        source = self._source(demo_id)
+        if not source.needs_index():
+            return
+        building = self._indexing[demo_id] = IOLoop.current().run_in_executor(
+            None, source.build_index
+        )
+        try:
+            self._indexes[demo_id] = await building
+        finally:
+            del self._indexing[demo_id]
+
+    def acquire(self, demo_id: str) -> TickSource:
+        """Returns the source of a demo for a new session.
+
+        Loads the demo on first request, see prepare for demos without a
+        tick index. Raises KeyError for unknown demos.
+        """
+        source = self._demos.get(demo_id)
+        if source is None:
+            source = self._source(demo_id).load(
+                self._indexes.pop(demo_id, None)
+            )
+            self._demos[demo_id] = source
+            self._log(f"{msg.DEMO_LOADED}: {demo_id}")
+        self._demos.move_to_end(demo_id)
+        source.clients += 1
+        self._evict()
+        return source
+
+    def reload(self, ticks_filename: Path) -> None:
+        """Reloads a demo whose files were written again by the parser.
+
+        An idle demo is dropped, to be loaded on its next request, and
+        sessions of a demo in use continue from the new files.
+        """
+        for demo_id, source in list(self._demos.items()):
+            if source.ticks_filename != ticks_filename.resolve():
+                continue
+            if source.clients == 0:
+                source.close()
+                del self._demos[demo_id]
+            else:
+                source.reload()
+            self._log(f"{msg.DEMO_RELOADED}: {demo_id}")
+
+    def release(self, source: TickSource) -> None:
+        """Marks a session of a demo closed."""
+        source.clients = max(0, source.clients - 1)
+
+    def _evict(self) -> None:
+        """Drops least recently used idle demos beyond max_demos."""
+        for demo_id, source in list(self._demos.items()):
+            if len(self._demos) <= self.max_demos:
+                break
+            if source.clients == 0:
+                source.close()
+                del self._demos[demo_id]
+                self._log(f"{msg.DEMO_UNLOADED}: {demo_id}")
@@ -0,0 +1,61 @@
+import mmap
+from pathlib import Path
+
+
+class MappedReader:
+    """Ticks file mapped into memory, read without file buffers.
+
+    Ticks are handed out as memoryview slices of the mapping, which are
+    already valid JSON frames (or packed records). Nothing is copied
+    until a frame is taken as bytes, and the pages are shared through
+    the OS page cache by every process that maps the same file, instead
+    of each process reading into its own buffers.
+
+    A file that is still being written is mapped again when a tick
+    beyond the current mapping is read.
+    """
+
+    def __init__(self, data_filename: Path):
+        self.data_filename: Path = data_filename
+        self._file = open(data_filename, "rb")
+        self._map: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        self._remap()
+
+    def __len__(self) -> int:
+        return len(self._view) if self._view is not None else 0
+
+    def _remap(self) -> None:
+        """Maps the whole file as it is now."""
+        self._unmap()
+        size = self._file.seek(0, 2)
+        if size:  # An empty file cannot be mapped
+            self._map = mmap.mmap(
+                self._file.fileno(), size, access=mmap.ACCESS_READ
+            )
+            self._view = memoryview(self._map)
+
+    def _unmap(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # Closed once the slices still in use are released
+            self._map = None
+
+    def slices(self, offsets, lengths) -> list[memoryview]:
+        """Returns the ticks at the given byte offsets as memoryviews."""
+        if offsets and offsets[-1] + lengths[-1] > len(self):
+            self._remap()
+        view = self._view
+        return [
+            view[offset : offset + length]
+            for offset, length in zip(offsets, lengths)
+        ]
+
+    def close(self) -> None:
+        self._unmap()
+        self._file.close()
@@ -2,6 +2,7 @@
 # fmt: off
 
 SERVER_START = "EEICT Demodata -server started!"
+SERVER_WORKER = "Server worker process"
 
 CLIENT_CAN_CONNECT = "EEICT client(s) can now connect!"
 CLIENT_NEW_CONNECTION = "New client connection"
@@ -10,6 +11,11 @@ CLIENT_CLOSED_CONNECTION = "Client connection closed"
 CLIENT_WELCOME = "Welcome to EEICT Demodata -server!"
 CLIENT_START_STREAM = "Starting stream..."
 CLIENT_REQUEST_MORE_TICKS = "Client requests more ticks"
+CLIENT_STREAM_MODE = "Client selected stream mode"
+CLIENT_TOO_SLOW = "Client too slow, disconnected"
+CLIENT_SUBSCRIBED = "Client subscribed"
+CLIENT_LOD = "Client LOD level"
+CLIENT_RECONNECTED = "Client reconnected, session resumed"
 
 STREAM_INPUT_FILE = "Received a file"
 STREAM_ENDED = "Stream ended!"
@@ -18,5 +24,24 @@ STREAM_LOOP_MODE = "Stream restarting (loop mode active)!"
 STREAM_PAUSED = "Streaming paused..."
 STREAM_SENT_TICKS = "Sent ticks to clients"
 STREAM_THRESHOLD = "Treshold met"
+STREAM_NO_INDEX = "Tick index missing, building it"
+STREAM_NO_PROCESSED = "No processed ticks file, streaming parsed ticks"
+STREAM_NOT_LINES = "Ticks file not in line layout, rewriting it"
+STREAM_SEEK = "Stream moved to tick"
+STREAM_WAITING = "Streaming while the demo is being parsed"
+STREAM_PARSE_COMPLETE = "Demo parsed, ticks available"
 
 FILE_CONFIG_ERROR = "Error reading config file"
+FILE_INDEX_ERROR = "Error reading index file"
+
+DEMO_NOT_FOUND = "Demo not found"
+DEMO_LOADED = "Demo loaded"
+DEMO_UNLOADED = "Idle demo unloaded"
+DEMO_RELOADED = "Demo parsed again, reloaded"
+
+PARSE_JOB_QUEUED = "Demo queued for parsing"
+PARSE_JOB_DONE = "Parse job done"
+PARSE_JOB_FAILED = "Parse job failed"
+PARSE_NOT_DEMO = "Not a CS2 demofile (.dem)"
+PARSE_LIBRARY_MISSING = "Parser library could not be loaded"
+PARSE_SERVICE_OFF = "Parse service is not running"
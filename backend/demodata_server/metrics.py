@@ -0,0 +1,182 @@
+"""Counters, gauges and histograms in the Prometheus text format.
+
+Kept dependency-free, as the server only needs to expose a few metrics
+of its own process on /metrics:
+
+    registry = MetricsRegistry()
+    sent = registry.counter("eeict_frames_sent_total", "Frames sent")
+    sent.inc()
+    registry.render()  # Text exposition format 0.0.4
+"""
+
+import math
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+
+# Seconds, from 0.1 ms to 10 s
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(names: tuple[str, ...], values: tuple, **extra) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """A value that only goes up, e.g. frames sent."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_format(self.value)}"]
+
+
+class Gauge:
+    """A value read from a function when the metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, function: Callable):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.function: Callable = function
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_format(self.function())}"]
+
+
+class Histogram:
+    """Observed values counted in cumulative buckets, by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        label_names: tuple[str, ...] = (),
+    ):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.buckets: tuple[float, ...] = tuple(buckets) + (math.inf,)
+        self.label_names: tuple[str, ...] = label_names
+        # Label values -> [bucket counts, sum]
+        self._series: dict[tuple, list] = {}
+        if not label_names:
+            self._series[()] = [[0] * len(self.buckets), 0]
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *label_values) -> "_Timer":
+        """Observes the duration of a with block."""
+        return _Timer(self, label_values)
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for label_values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _labels(
+                    self.label_names, label_values, le=_format(bound)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, label_values: tuple):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(
+            time.perf_counter() - self.start, *self.label_values
+        )
+
+
+class MetricsRegistry:
+    """The metrics of a server, rendered in registration order."""
+
+    def __init__(self):
+        self.metrics: list[Counter | Gauge | Histogram] = []
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str, function: Callable) -> Gauge:
+        return self._register(Gauge(name, help_text, function))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        label_names: tuple[str, ...] = (),
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets, label_names))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,285 @@
+import json
+import struct
+from pathlib import Path
+from demodata_parser.packed import (
+    MAGIC,
+    VERSION,
+    BOMB,
+    COUNTS,
+    FIRE,
+    FOOTER,
+    HEADER,
+    INFERNO,
+    ITEM,
+    KILL,
+    NADE,
+    NADE_EVENT,
+    NULL,
+    PLAYER,
+    SHOOTING,
+    STRING_LENGTH,
+    TICK,
+    BOMB_FLAGS,
+    PLAYER_FLAGS,
+    TICK_FLAGS,
+    PLAYER_FLOATS,
+    POSITION_FLOATS,
+    unpack_flags,
+    unpack_ints,
+)
+
+# Player flags decoded once for every possible value
+PLAYER_FLAG_VALUES = [
+    tuple(unpack_flags(flags, PLAYER_FLAGS).values())
+    for flags in range(1 << len(PLAYER_FLAGS))
+]
+PLAYER_FLAGS_MASK = (1 << len(PLAYER_FLAGS)) - 1
+
+
+class PackedReader:
+    """Decodes tick records of a $_packed.bin container.
+
+    Decoded ticks are equal to the ticks of the $.json file they were
+    packed from, so the stream output does not change.
+    """
+
+    def __init__(self, packed_filename: Path):
+        self.packed_filename: Path = packed_filename
+        self.strings: list[str] = []
+        self._read_strings()
+
+    def _read_strings(self) -> None:
+        """Reads the string table using the footer of the file."""
+        with open(self.packed_filename, "rb") as file:
+            magic, version = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a packed file: {self.packed_filename}")
+            file.seek(-FOOTER.size, 2)
+            strings_offset, count, magic = FOOTER.unpack(
+                file.read(FOOTER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f"Truncated file: {self.packed_filename}")
+            file.seek(strings_offset)
+            data = file.read()
+        position = 0
+        self.strings = []
+        for _ in range(count):
+            (length,) = STRING_LENGTH.unpack_from(data, position)
+            position += STRING_LENGTH.size
+            self.strings.append(
+                data[position : position + length].decode("utf-8")
+            )
+            position += length
+
+    def _players(self, record, position: int, count: int):
+        strings = self.strings
+        players = []
+        for _ in range(count):
+            (
+                sid,
+                name,
+                clan,
+                team,
+                hp,
+                money,
+                x,
+                y,
+                z,
+                view_x,
+                view_y,
+                actv_itm,
+                armor,
+                kills,
+                deaths,
+                assists,
+                dmg,
+                adr,
+                flags,
+                item_count,
+            ) = PLAYER.unpack_from(record, position)
+            position += PLAYER.size
+            items = None
+            if item_count != NULL:
+                items = [
+                    strings[item]
+                    for item in struct.unpack_from(
+                        f"<{item_count}I", record, position
+                    )
+                ]
+                position += item_count * ITEM.size
+            (
+                helmet,
+                kit,
+                is_ducking,
+                is_walking,
+                is_standing,
+                is_air,
+                is_rld,
+                is_planting,
+                is_defusing,
+            ) = PLAYER_FLAG_VALUES[flags & PLAYER_FLAGS_MASK]
+            player = {
+                "sid": sid,
+                "name": strings[name],
+                "clan": strings[clan],
+                "team": strings[team],
+                "hp": hp,
+                "money": money,
+                "x": x,
+                "y": y,
+                "z": z,
+                "view_x": view_x,
+                "view_y": view_y,
+                "actv_itm": strings[actv_itm],
+                "items": items,
+                "helmet": helmet,
+                "armor": armor,
+                "kit": kit,
+                "is_ducking": is_ducking,
+                "is_walking": is_walking,
+                "is_standing": is_standing,
+                "is_air": is_air,
+                "is_rld": is_rld,
+                "kills": kills,
+                "deaths": deaths,
+                "assists": assists,
+                "dmg": dmg,
+                "adr": adr,
+                "is_planting": is_planting,
+                "is_defusing": is_defusing,
+            }
+            if flags > PLAYER_FLAGS_MASK:
+                unpack_ints(player, flags, PLAYER_FLOATS, len(PLAYER_FLAGS))
+            players.append(player)
+        return players, position
+
+    def _infernos(self, record, position: int, count: int):
+        infernos = []
+        for _ in range(count):
+            inferno_id, fire_count = INFERNO.unpack_from(record, position)
+            position += INFERNO.size
+            fires = None
+            if fire_count != NULL:
+                fires = [
+                    unpack_ints(
+                        {"x": x, "y": y, "z": z}, ints, POSITION_FLOATS
+                    )
+                    for x, y, z, ints in FIRE.iter_unpack(
+                        record[position : position + fire_count * FIRE.size]
+                    )
+                ]
+                position += fire_count * FIRE.size
+            infernos.append({"id": inferno_id, "fires": fires})
+        return infernos, position
+
+    def decode(self, record: bytes) -> dict:
+        """Decodes a tick record into a tick dict."""
+        strings = self.strings
+        tick, round_time, flags, t, ct, t_wins, ct_wins = TICK.unpack_from(
+            record
+        )
+        position = TICK.size
+        (
+            player_count,
+            shooting_count,
+            kill_count,
+            nade_count,
+            inferno_count,
+            has_nade_event,
+        ) = COUNTS.unpack_from(record, position)
+        position += COUNTS.size
+        players = shooting = kills = nades = infernos = nade_event = None
+        if player_count != NULL:
+            players, position = self._players(record, position, player_count)
+        if shooting_count != NULL:
+            end = position + shooting_count * SHOOTING.size
+            shooting = [
+                sid for (sid,) in SHOOTING.iter_unpack(record[position:end])
+            ]
+            position = end
+        if kill_count != NULL:
+            end = position + kill_count * KILL.size
+            kills = [
+                {
+                    "killer": strings[killer],
+                    "victim": strings[victim],
+                    "weapon": strings[weapon],
+                    "is_hs": bool(is_hs),
+                    "penetrations": penetrations,
+                }
+                for killer, victim, weapon, is_hs, penetrations in (
+                    KILL.iter_unpack(record[position:end])
+                )
+            ]
+            position = end
+        if nade_count != NULL:
+            end = position + nade_count * NADE.size
+            nades = [
+                unpack_ints(
+                    {
+                        "id": nade_id,
+                        "type": strings[nade_type],
+                        "x": x,
+                        "y": y,
+                        "z": z,
+                        "team": strings[team],
+                    },
+                    ints,
+                    POSITION_FLOATS,
+                )
+                for nade_id, nade_type, x, y, z, team, ints in (
+                    NADE.iter_unpack(record[position:end])
+                )
+            ]
+            position = end
+        if inferno_count != NULL:
+            infernos, position = self._infernos(
+                record, position, inferno_count
+            )
+        if has_nade_event:
+            nade_type, x, y, z, ints = NADE_EVENT.unpack_from(record, position)
+            position += NADE_EVENT.size
+            nade_event = unpack_ints(
+                {"type": strings[nade_type], "x": x, "y": y, "z": z},
+                ints,
+                POSITION_FLOATS,
+            )
+        carrier, bomb_x, bomb_y, bomb_z, bomb_flags, planted_by, defused_by = (
+            BOMB.unpack_from(record, position)
+        )
+        bomb = {
+            "carrier": strings[carrier],
+            "x": bomb_x,
+            "y": bomb_y,
+            "z": bomb_z,
+            **unpack_flags(bomb_flags, BOMB_FLAGS),
+            "planted_by": strings[planted_by],
+            "defused_by": strings[defused_by],
+        }
+        if bomb_flags >> len(BOMB_FLAGS):
+            unpack_ints(bomb, bomb_flags, POSITION_FLOATS, len(BOMB_FLAGS))
+        if flags >> len(TICK_FLAGS):
+            round_time = int(round_time)
+        return {
+            "tick": tick,
+            "round_time": round_time,
+            **unpack_flags(flags, TICK_FLAGS),
+            "t": strings[t],
+            "ct": strings[ct],
+            "t_wins": t_wins,
+            "ct_wins": ct_wins,
+            "players": players,
+            "shooting": shooting,
+            "kills": kills,
+            "nades": nades,
+            "infernos": infernos,
+            "nade_event": nade_event,
+            "bomb": bomb,
+        }
+
+    def frame(self, record: bytes) -> bytes:
+        """Decodes a tick record into an encoded JSON frame."""
+        return json.dumps(self.decode(record), separators=(",", ":")).encode(
+            "utf-8"
+        )
@@ -0,0 +1,245 @@
+import time
+import logging
+from functools import partial
+from itertools import count
+from pathlib import Path
+from typing import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from tornado.ioloop import IOLoop
+from demodata_parser import DemodataParser
+from demodata_parser.parser import load_library
+from . import messages as msg
+
+# Job states, in order
+JOB_STATES = ("queued", "parsing", "parsed", "failed")
+
+
+def warm_up() -> None:
+    """Loads the parser library when a worker process starts."""
+    try:
+        load_library()
+    except OSError as e:
+        logging.warning(f"PARSE JOBS - {msg.PARSE_LIBRARY_MISSING}: {e}")
+
+
+def parse_job(
+    demo_filename: Path,
+    overwrite: bool = False,
+    packed: bool = False,
+    processors: list[str] | None = None,
+    lod_levels: list[int] | None = None,
+) -> dict:
+    """Parses a demo next to it (worker)."""
+    start = time.perf_counter()
+    parser = DemodataParser()
+    parser.demofile(demo_filename, overwrite, packed, processors, lod_levels)
+    try:
+        status = parser.parse()
+    except OSError as e:  # No parser library
+        logging.warning(f"PARSE JOBS - {msg.PARSE_LIBRARY_MISSING}: {e}")
+        status = False
+    return {
+        "status": "parsed" if status else "failed",
+        "seconds": time.perf_counter() - start,
+        "timings": parser.timings,
+    }
+
+
+class ParseJobs:
+    """Demos to parse, queued from the server and parsed by warm workers.
+
+    Jobs are run by a pool of at most `workers` processes, which load the
+    parser library once when they start and then parse demo after demo.
+    The server's event loop only submits jobs and is called back when a
+    job is done, so it never waits for a parse. A demo that is queued or
+    being parsed is not queued again, the request gets the same job. A
+    request to overwrite turns a queued job of the demo into an overwrite,
+    or is parsed after the job being parsed. Finished jobs are kept for
+    polling, up to max_finished of them, and on_written is called with
+    the .dem path of every demo parsed.
+    """
+
+    def __init__(
+        self,
+        demo_folder: Path,
+        workers: int | None = None,
+        packed: bool = False,
+        processors: list[str] | None = None,
+        lod_levels: list[int] | None = None,
+        on_parsed: Callable[[dict], None] | None = None,
+        max_finished: int = 100,
+        on_written: Callable[[Path], None] | None = None,
+    ):
+        self.demo_folder: Path = demo_folder
+        self.workers: int | None = workers  # None: one per CPU
+        self.packed: bool = packed
+        self.processors: list[str] = list(processors or [])
+        self.lod_levels: list[int] = list(lod_levels or [])
+        self.on_parsed: Callable[[dict], None] | None = on_parsed
+        self.on_written: Callable[[Path], None] | None = on_written
+        self.max_finished: int = max_finished
+        self.jobs: dict[str, dict] = {}  # Job id -> job, oldest first
+        self._futures: dict[str, Future] = {}  # Job id -> unfinished parse
+        self._active: dict[Path, str] = {}  # Demo -> unfinished job id
+        # Demo -> overwrite job id, waiting for the job being parsed
+        self._waiting: dict[Path, str] = {}
+        self._filenames: dict[str, Path] = {}  # Job id -> demo
+        self._ids = count(1)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _log(self, message: str, level: str = "info") -> None:
+        """Helper method for logging messages with class name."""
+        class_name = "PARSE JOBS"
+        log_func = getattr(logging, level, logging.info)
+        log_func(f"{class_name} - {message}")
+
+    def demo_filename(self, demo: str) -> Path:
+        """Returns the .dem path of a demo inside the demo folder.
+
+        Raises KeyError for missing demos and ValueError for others.
+        """
+        demo_filename = (self.demo_folder / demo).resolve()
+        if demo_filename.suffix != ".dem":
+            raise ValueError(f"{msg.PARSE_NOT_DEMO}: {demo}")
+        if not demo_filename.is_relative_to(self.demo_folder.resolve()):
+            raise KeyError(f"{msg.DEMO_NOT_FOUND}: {demo}")
+        if not demo_filename.exists():
+            raise KeyError(f"{msg.DEMO_NOT_FOUND}: {demo}")
+        return demo_filename
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=warm_up
+            )
+        return self._executor
+
+    def submit(self, demo: str, overwrite: bool = False) -> dict:
+        """Queues a demo to parse, returns its job."""
+        demo_filename = self.demo_filename(demo)
+        job_id = self._waiting.get(demo_filename) or self._active.get(
+            demo_filename
+        )
+        if job_id is not None:
+            job = self.jobs[job_id]
+            if overwrite and not job["overwrite"]:
+                if self._futures[job_id].cancel():  # Not started yet
+                    job["overwrite"] = True
+                    self._start(job_id)
+                else:
+                    return self.status(self._wait(demo, demo_filename))
+            return self.status(job_id)
+        job_id = self._new_job(demo, demo_filename, overwrite)
+        self._start(job_id)
+        return self.status(job_id)
+
+    def _new_job(self, demo: str, demo_filename: Path, overwrite: bool) -> str:
+        job_id = str(next(self._ids))
+        self.jobs[job_id] = {
+            "id": job_id,
+            "demo": demo,
+            "overwrite": overwrite,
+            "status": "queued",
+            "submitted": time.time(),
+            "seconds": None,
+        }
+        self._filenames[job_id] = demo_filename
+        return job_id
+
+    def _wait(self, demo: str, demo_filename: Path) -> str:
+        """Queues an overwrite for after the job being parsed."""
+        job_id = self._waiting[demo_filename] = self._new_job(
+            demo, demo_filename, True
+        )
+        return job_id
+
+    def _start(self, job_id: str) -> None:
+        """Submits a job to the workers."""
+        job = self.jobs[job_id]
+        demo_filename = self._filenames[job_id]
+        future = self._pool().submit(
+            parse_job,
+            demo_filename,
+            job["overwrite"],
+            self.packed,
+            self.processors,
+            self.lod_levels,
+        )
+        self._futures[job_id] = future
+        self._active[demo_filename] = job_id
+        IOLoop.current().add_future(future, partial(self._finished, job_id))
+        self._log(f"{msg.PARSE_JOB_QUEUED}: {job['demo']} ({job_id})")
+
+    def _finished(self, job_id: str, future: Future) -> None:
+        """Records the result of a job, on the event loop."""
+        if self._futures.get(job_id) is not future:
+            return  # Cancelled and submitted again to overwrite
+        job = self.jobs[job_id]
+        demo_filename = self._filenames[job_id]
+        self._futures.pop(job_id)
+        self._active.pop(demo_filename, None)
+        try:
+            result = future.result()
+        except Exception as e:
+            self._log(f"{msg.PARSE_JOB_FAILED}: {e}", level="error")
+            result = {"status": "failed", "seconds": None, "timings": {}}
+        job["status"] = result["status"]
+        job["seconds"] = result["seconds"]
+        self._log(f"{msg.PARSE_JOB_DONE}: {job['demo']}, {job['status']}")
+        if result["status"] == "parsed":
+            if self.on_parsed is not None:
+                self.on_parsed(result["timings"])
+            if self.on_written is not None:
+                self.on_written(demo_filename)
+        waiting = self._waiting.pop(demo_filename, None)
+        if waiting is not None:
+            self._start(waiting)
+        self._forget_finished()
+
+    def _forget_finished(self) -> None:
+        waiting = set(self._waiting.values())
+        finished = [
+            job_id
+            for job_id in self.jobs
+            if job_id not in self._futures and job_id not in waiting
+        ]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+            del self._filenames[job_id]
+
+    def status(self, job_id: str) -> dict:
+        """Returns a job. Raises KeyError for unknown jobs.
+
+        While a demo is parsed, output_bytes is the size of its ticks
+        file so far.
+        """
+        job = dict(self.jobs[job_id])
+        future = self._futures.get(job_id)
+        if future is not None and future.running():
+            job["status"] = "parsing"
+            ticks_filename = self._filenames[job_id].with_suffix(".json")
+            try:
+                job["output_bytes"] = ticks_filename.stat().st_size
+            except OSError:
+                job["output_bytes"] = 0
+        return job
+
+    def unfinished(self) -> int:
+        """Returns the number of jobs queued or being parsed."""
+        return len(self._futures) + len(self._waiting)
+
+    def list_jobs(self) -> list[dict]:
+        return [self.status(job_id) for job_id in self.jobs]
+
+    def stats(self) -> dict:
+        """Returns the number of jobs in each state."""
+        stats = dict.fromkeys(JOB_STATES, 0)
+        for job in self.list_jobs():
+            stats[job["status"]] += 1
+        return stats
+
+    def close(self) -> None:
+        """Stops the workers, cancelling queued jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,61 @@
+import os
+import signal
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Samples the stack of the server's main thread on a CPU timer.
+
+    Started on request from a running server, e.g. for a few seconds, so
+    there is no cost while it is not sampling. Every interval of CPU time
+    SIGPROF interrupts the event loop, and the stack is counted. Samples
+    are returned as collapsed stacks ("outer;inner count" per line), the
+    input format of flame graph tools. Only available where
+    signal.setitimer is (not on Windows).
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval: float = interval
+        self.samples: Counter[str] = Counter()
+        self.running: bool = False
+        self._previous_handler = None
+
+    @staticmethod
+    def available() -> bool:
+        return hasattr(signal, "setitimer")
+
+    def _frame_name(self, frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _sample(self, signum, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_name(frame))
+            frame = frame.f_back
+        self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        """Starts sampling; must be called from the main thread."""
+        if not self.available():
+            raise RuntimeError("Sampling needs signal.setitimer")
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self.samples.clear()
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self.running = True
+
+    def stop(self) -> Counter[str]:
+        """Stops sampling and returns the samples per stack."""
+        if self.running:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            self.running = False
+        return self.samples
+
+    def collapsed(self) -> str:
+        """Formats the samples as collapsed stacks, most sampled first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
@@ -0,0 +1,117 @@
+import time
+from typing import Callable
+
+MIN_SPEED = 0.25
+MAX_SPEED = 8.0
+
+
+class PlaybackClock:
+    """Paces playback by the demo's own tick numbers on a monotonic clock.
+
+    The clock is anchored to a tick at a point in time, and the tick due
+    at any later moment is computed from the elapsed time, the tickrate
+    and the speed. Timer callbacks only wake the clock up, so late or
+    missed callbacks do not add up to drift, and gaps in tick numbers
+    play at their real length.
+
+    After a stall the clock lets playback catch up on at most
+    max_catch_up seconds of ticks. If playback is further behind than
+    that, the clock is anchored again, i.e. the stall is skipped instead
+    of flooding clients.
+    """
+
+    def __init__(
+        self,
+        tickrate: int = 64,
+        speed: float = 1.0,
+        max_catch_up: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.tickrate: int = tickrate
+        self.speed: float = self._validate_speed(speed)
+        self.max_catch_up: float = max_catch_up  # Seconds
+        self.clock: Callable[[], float] = clock
+        self.anchor_tick: int = 0
+        self.anchor_time: float | None = None  # None until anchored
+        # Pacing error, i.e. how late ticks are sent
+        self.pacing_error: float = 0.0  # Smoothed (seconds)
+        self.max_pacing_error: float = 0.0
+        self.resyncs: int = 0  # Stalls skipped by anchoring again
+
+    def _validate_speed(self, speed: float) -> float:
+        """Ensures the speed is between MIN_SPEED and MAX_SPEED."""
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(
+                f"Invalid playback speed: {speed} "
+                f"({MIN_SPEED}-{MAX_SPEED})"
+            )
+        return speed
+
+    def now(self) -> float:
+        return self.clock()
+
+    def is_anchored(self) -> bool:
+        return self.anchor_time is not None
+
+    def anchor(self, tick: int, at: float | None = None) -> None:
+        """Makes the given tick due at the given time (default: now)."""
+        self.anchor_tick = tick
+        self.anchor_time = self.now() if at is None else at
+
+    def reset(self) -> None:
+        """Forgets the anchor, e.g. after a seek or a pause."""
+        self.anchor_time = None
+
+    def ticks_per_second(self) -> float:
+        return self.tickrate * self.speed
+
+    def time_of(self, tick: int) -> float:
+        """Returns the time when the given tick is due."""
+        return (
+            self.anchor_time
+            + (tick - self.anchor_tick) / self.ticks_per_second()
+        )
+
+    def due_tick(self, now: float | None = None) -> float:
+        """Returns the tick that is due now."""
+        now = self.now() if now is None else now
+        return (
+            self.anchor_tick
+            + (now - self.anchor_time) * self.ticks_per_second()
+        )
+
+    def set_speed(self, speed: float, tick: int) -> float:
+        """Changes the speed, keeping the given tick due now."""
+        self.speed = self._validate_speed(speed)
+        if self.is_anchored():
+            self.anchor(tick)
+        return self.speed
+
+    def is_due(self, tick: int, now: float | None = None) -> bool:
+        """Checks if the given tick is due, catching up after stalls."""
+        now = self.now() if now is None else now
+        if self.anchor_time is None:
+            self.anchor(tick, now)
+        lateness = now - self.time_of(tick)
+        if lateness > self.max_catch_up:
+            self.max_pacing_error = max(self.max_pacing_error, lateness)
+            self.anchor(tick, now)
+            self.resyncs += 1
+        return lateness >= 0
+
+    def record(self, tick: int, now: float | None = None) -> float:
+        """Records the pacing error of a tick sent now and returns it."""
+        now = self.now() if now is None else now
+        error = max(0.0, now - self.time_of(tick))
+        self.pacing_error = 0.9 * self.pacing_error + 0.1 * error
+        self.max_pacing_error = max(self.max_pacing_error, error)
+        return error
+
+    def stats(self) -> dict:
+        """Returns the pacing metrics in milliseconds."""
+        return {
+            "speed": self.speed,
+            "pacing_error_ms": round(self.pacing_error * 1000, 3),
+            "max_pacing_error_ms": round(self.max_pacing_error * 1000, 3),
+            "resyncs": self.resyncs,
+        }
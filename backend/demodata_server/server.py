@@ -1,11 +1,28 @@
+import os
 import json
-import ijson
+import time
 import logging
+from functools import partial
 from pathlib import Path
-from tornado.web import Application
+from tornado import gen
+from tornado.web import Application, HTTPError, RequestHandler
 from tornado.ioloop import PeriodicCallback, IOLoop
 from tornado.websocket import WebSocketHandler
+from demodata_parser.timeline import filter_timeline
 from . import messages as msg
+from .client_queue import ClientWriter
+from .coordinator import LiveCoordinator
+from .library import DemoLibrary
+from .metrics import MetricsRegistry
+from .parse_jobs import ParseJobs
+from .profiler import SamplingProfiler
+from .session import PlaybackSession
+from .source import TickSource
+from .tick_cache import TickCache
+from .subscription import Subscription
+
+# Client requests controlling playback
+PLAYBACK_COMMANDS = ("seek", "pause", "resume", "rate", "lod")
 
 # Configure logging
 logging.basicConfig(
@@ -18,8 +35,11 @@ class DemoDataWSH(WebSocketHandler):
     def initialize(self, server):
         self.server = server
 
-    def open(self):
-        self.server.open(self)
+    def get_compression_options(self):
+        return self.server.compression_options()
+
+    async def open(self, demo_id=None):
+        await self.server.open(self, demo_id)
 
     def on_close(self):
         self.server.on_close(self)
@@ -28,6 +48,139 @@ class DemoDataWSH(WebSocketHandler):
         await self.server.on_message(self, message)
 
 
+class DemoListHandler(RequestHandler):
+    def initialize(self, server):
+        self.server = server
+
+    def get(self):
+        self.write({"demos": self.server.demo_ids()})
+
+
+class TimelineHandler(RequestHandler):
+    """Round and event timeline of a demo.
+
+    i.e. GET /timeline/test_demos/random_1?types=kill&player=tN1R&round=3
+    """
+
+    def initialize(self, server):
+        self.server = server
+
+    async def get(self, demo_id=None):
+        types = self.get_argument("types", None)
+        round_number = self.get_argument("round", None)
+        try:
+            timeline = await self.server.timeline(
+                demo_id,
+                types.split(",") if types else None,
+                self.get_argument("player", None),
+                int(round_number) if round_number else None,
+            )
+        except KeyError:
+            raise HTTPError(404, msg.DEMO_NOT_FOUND)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        self.write(timeline)
+
+
+class MetricsHandler(RequestHandler):
+    """Server metrics in the Prometheus text format."""
+
+    def initialize(self, server):
+        self.server = server
+
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
+        self.write(self.server.metrics.render())
+
+
+class ProfileHandler(RequestHandler):
+    """Samples the running server, i.e. GET /profile?seconds=10.
+
+    Returns the samples as collapsed stacks for flame graph tools.
+    """
+
+    def initialize(self, server):
+        self.server = server
+
+    async def get(self):
+        profiler = self.server.profiler
+        if not profiler.available():
+            raise HTTPError(501, "Profiling is not available")
+        if profiler.running:
+            raise HTTPError(409, "Profiler is already running")
+        try:
+            seconds = min(60.0, float(self.get_argument("seconds", "10")))
+            interval_ms = float(self.get_argument("interval_ms", "5"))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        profiler.interval = max(1.0, interval_ms) / 1000
+        profiler.start()
+        try:
+            await gen.sleep(max(0.1, seconds))
+        finally:
+            profiler.stop()
+        self.set_header("Content-Type", "text/plain")
+        self.write(profiler.collapsed())
+
+
+class ParseHandler(RequestHandler):
+    """Parse jobs of the demos in the demo folder.
+
+    i.e. POST /parse {"demo": "test_demos/random_1.dem", "overwrite": false}
+    queues a demo, GET /parse/1 returns the job and GET /parse all jobs.
+    """
+
+    def initialize(self, server):
+        self.server = server
+
+    def prepare(self):
+        if self.server.parse_jobs is None:
+            raise HTTPError(404, msg.PARSE_SERVICE_OFF)
+
+    def get(self, job_id=None):
+        if job_id is None:
+            self.write({"jobs": self.server.parse_jobs.list_jobs()})
+            return
+        try:
+            self.write(self.server.parse_jobs.status(job_id))
+        except KeyError:
+            raise HTTPError(404, f"Unknown job: {job_id}")
+
+    def post(self, job_id=None):
+        try:
+            data = json.loads(self.request.body or b"{}")
+            demo = str(data["demo"])
+            overwrite = bool(data.get("overwrite", False))
+        except (KeyError, ValueError, TypeError) as e:
+            raise HTTPError(400, f"Invalid request: {e}")
+        try:
+            job = self.server.parse_jobs.submit(demo, overwrite)
+        except KeyError as e:
+            raise HTTPError(404, str(e))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        self.set_status(202)
+        self.write(job)
+
+
+class StatsHandler(RequestHandler):
+    def initialize(self, server):
+        self.server = server
+
+    def get(self):
+        stats = {
+            "sessions": self.server.session_stats(),
+            "cache": self.server.cache.stats(),
+        }
+        if self.server.coordinator is not None:
+            stats["workers"] = self.server.coordinator.stats()
+        if self.server.parse_jobs is not None:
+            stats["parse_jobs"] = self.server.parse_jobs.stats()
+        if self.server.resume_seconds > 0:
+            stats["detached_sessions"] = len(self.server.detached)
+        self.write(stats)
+
+
 class DemodataServer:
     """Handles WebSocket connections to EEICT client(s)."""
 
@@ -37,22 +190,51 @@ class DemodataServer:
         self.srv_port: int = -1
         self.srv_endpoint: str = ""
         self.loop_mode: bool = False
+        self.play_nth: int = 1  # Play every Nth tick
+        self.speed: float = 1.0  # Default playback speed
         self.connected_clients: set[DemoDataWSH] = set()
+        self.sessions: dict[DemoDataWSH, PlaybackSession] = {}
+        self.writers: dict[DemoDataWSH, ClientWriter] = {}
+        self.queue_size: int = 256  # Max queued frames/client
+        self.slow_client_policy: str = "keyframe"
+        # Permessage-deflate, off if no compression level
+        self.compression_level: int | None = None
+        self.compression_mem_level: int = 8
+        self.batch_ticks: bool = False  # Default of sessions, see batch
+        # Reconnecting clients, off if no resume seconds
+        self.resume_seconds: float = 0
+        self.ring_size: int = 256  # Recent frames kept per session
+        self.detached: dict[str, PlaybackSession] = {}  # Token -> session
+        self._expiry: dict[str, object] = {}  # Token -> timeout handle
         # Demodata info
         self.tickrate: int = 64
         self.total_ticks: int = -1
         self.map_name: str = ""
         # Ticks
         self.ticks_filename: Path = Path()
-        self.ticks: ijson.items = ijson.items
+        self.source: TickSource | None = None  # Shared by all sessions
+        self.cache: TickCache = TickCache()  # Shared by all sources
+        # Live playhead shared by worker processes
+        self.coordinator: LiveCoordinator | None = None
+        self.library: DemoLibrary | None = None  # Multi-demo mode
+        self.parse_jobs: ParseJobs | None = None  # Parse service
         self.interval_ms: float = 15.625  # Server master clock
-        self.current_tick: int = 0  # Server playhead
         # Burst mode
         self.burst_size: int = -1  # Number of ticks/burst
-        self.ticks_buffer: list = []
         self.timer_callback = PeriodicCallback(
             self._update_buffer, self.interval_ms
         )
+        # Growing ticks file (stream while parsing)
+        self.refresh_interval_ms: float = 100
+        self.refresh_callback: PeriodicCallback | None = None
+        # Instrumentation
+        self.metrics: MetricsRegistry = MetricsRegistry()
+        self.profiler: SamplingProfiler = SamplingProfiler()
+        # Routes of /metrics and /profile, off unless started with them
+        self.metrics_route: bool = False
+        self.profiler_route: bool = False
+        self.loop_lag_interval: float = 0.1  # Seconds between lag checks
+        self._init_metrics()
 
     def _log(self, message: str, level: str = "info") -> None:
         """Helper method for logging messages with class name."""
@@ -60,20 +242,152 @@ class DemodataServer:
         log_func = getattr(logging, level, logging.info)
         log_func(f"{class_name} - {message}")
 
-    def _validate_config(self, config: dict) -> None:
-        """Validates the configuration file for required keys."""
-        required_keys = ["tickrate", "total_ticks", "map_name"]
-        for key in required_keys:
-            if key not in config:
-                raise KeyError(f"Missing required config key: {key}")
-
     def _sanitize_tickrate(self, tickrate: int) -> int:
         """Ensures the tickrate is at least 64."""
         return max(64, tickrate)
 
-    def open(self, client: DemoDataWSH) -> int:
+    def _init_metrics(self) -> None:
+        """Registers the metrics exposed on /metrics."""
+        metrics = self.metrics
+        self.ticks_gathered = metrics.counter(
+            "eeict_ticks_gathered_total", "Ticks gathered for clients"
+        )
+        self.frames_sent = metrics.counter(
+            "eeict_frames_sent_total", "Frames written to clients"
+        )
+        self.bytes_sent = metrics.counter(
+            "eeict_bytes_sent_total", "Bytes of frames written to clients"
+        )
+        metrics.gauge(
+            "eeict_clients", "Connected clients", lambda: len(self.sessions)
+        )
+        metrics.gauge(
+            "eeict_detached_sessions",
+            "Sessions of disconnected clients kept for resuming",
+            lambda: len(self.detached),
+        )
+        metrics.gauge(
+            "eeict_client_queue_depth_max",
+            "Frames queued for the most behind client",
+            lambda: max(
+                (len(writer.queue) for writer in self.writers.values()),
+                default=0,
+            ),
+        )
+        metrics.gauge(
+            "eeict_client_queue_depth_total",
+            "Frames queued for all clients",
+            lambda: sum(len(writer.queue) for writer in self.writers.values()),
+        )
+        metrics.gauge(
+            "eeict_client_dropped_ticks",
+            "Ticks dropped for the connected slow clients",
+            lambda: sum(writer.dropped for writer in self.writers.values()),
+        )
+        metrics.gauge(
+            "eeict_cache_bytes",
+            "Bytes of cached ticks",
+            lambda: self.cache.bytes,
+        )
+        metrics.gauge(
+            "eeict_cache_hit_ratio",
+            "Hit ratio of the tick cache",
+            lambda: self.cache.stats()["hit_rate"],
+        )
+        self.update_seconds = metrics.histogram(
+            "eeict_update_seconds", "Duration of a pass over all sessions"
+        )
+        self.gather_seconds = metrics.histogram(
+            "eeict_gather_seconds", "Duration of gathering a client's ticks"
+        )
+        self.transmit_seconds = metrics.histogram(
+            "eeict_transmit_seconds", "Duration of writing a frame"
+        )
+        self.loop_lag_seconds = metrics.histogram(
+            "eeict_loop_lag_seconds", "Delay of the event loop"
+        )
+        self.source_load_seconds = metrics.histogram(
+            "eeict_source_load_seconds",
+            "Duration of reading a demo's config and tick index",
+        )
+        metrics.gauge(
+            "eeict_parse_jobs_unfinished",
+            "Parse jobs queued or being parsed",
+            lambda: self.parse_jobs.unfinished() if self.parse_jobs else 0,
+        )
+        self.parse_seconds = metrics.histogram(
+            "eeict_parse_seconds",
+            "Duration of the parser stages",
+            buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+            label_names=("stage",),
+        )
+
+    def compression_options(self) -> dict | None:
+        """Returns tornado's websocket compression options."""
+        if self.compression_level is None:
+            return None
+        return {
+            "compression_level": self.compression_level,
+            "mem_level": self.compression_mem_level,
+        }
+
+    def _demo_written(self, demo_filename: Path) -> None:
+        """Reloads a library demo parsed by the parse service."""
+        if self.library is not None:
+            self.library.reload(demo_filename.with_suffix(".json"))
+
+    def record_parse_timings(self, timings: dict[str, float]) -> None:
+        """Adds the stage durations of DemodataParser.parse to metrics."""
+        for stage, seconds in timings.items():
+            self.parse_seconds.observe(seconds, stage)
+
+    def _check_loop_lag(self, expected: float) -> None:
+        """Measures how late the event loop runs a scheduled callback."""
+        now = IOLoop.current().time()
+        self.loop_lag_seconds.observe(max(0.0, now - expected))
+        IOLoop.current().call_at(
+            now + self.loop_lag_interval,
+            self._check_loop_lag,
+            now + self.loop_lag_interval,
+        )
+
+    async def _acquire_source(self, demo_id: str | None) -> TickSource:
+        """Returns the source of the requested or the default demo."""
+        if demo_id is None:
+            if self.source is None:
+                raise KeyError(msg.DEMO_NOT_FOUND)
+            return self.source
+        if self.library is None:
+            raise KeyError(f"{msg.DEMO_NOT_FOUND}: {demo_id}")
+        await self.library.prepare(demo_id)
+        return self.library.acquire(demo_id)
+
+    async def open(
+        self, client: DemoDataWSH, demo_id: str | None = None
+    ) -> int:
         """Handles new connections, sends messages to client and starts the stream."""
-        self.connected_clients.add(client)
+        try:
+            source = await self._acquire_source(demo_id)
+        except Exception as e:
+            self._log(f"{e}", level="warning")
+            client.close(4004, msg.DEMO_NOT_FOUND)
+            return len(self.connected_clients)
+        if client.ws_connection is None:  # Closed while the demo loaded
+            if demo_id is not None:
+                self.library.release(source)
+            return len(self.connected_clients)
+        session = self._add_session(client, source)
+        if self.resume_seconds > 0:
+            self.writers[client].put(
+                json.dumps(
+                    {
+                        "session": {
+                            "token": session.token,
+                            "resume_seconds": self.resume_seconds,
+                        }
+                    }
+                )
+            )
         self._log(f"{msg.CLIENT_NEW_CONNECTION}: {client.request.remote_ip}")
         self._log(f"{self.total_clients()}")
         # client.write_message(f"{msg.CLIENT_WELCOME}")
@@ -81,9 +395,52 @@ class DemodataServer:
         # client.write_message(f"{msg.CLIENT_START_STREAM}")
         return len(self.connected_clients)
 
+    def _add_session(
+        self, client: DemoDataWSH, source: TickSource
+    ) -> PlaybackSession:
+        """Creates the playback session and the writer of a new client."""
+        self.connected_clients.add(client)
+        session = PlaybackSession(
+            source,
+            self.burst_size,
+            self.loop_mode,
+            self.play_nth,
+            self.speed,
+            self.batch_ticks,
+            self.ring_size,
+        )
+        self.sessions[client] = session
+        writer = ClientWriter(
+            partial(self._transmit_ticks, client),
+            self.queue_size,
+            self.slow_client_policy,
+            on_drop=session.request_keyframe,
+            on_overflow=partial(self._disconnect_slow_client, client),
+        )
+        self.writers[client] = writer
+        IOLoop.current().spawn_callback(writer.run)
+        if self.coordinator is not None and source is self.source:
+            self._join_live(session)
+        return session
+
+    def _join_live(self, session: PlaybackSession) -> None:
+        """Moves a new session to the live tick shared by the workers."""
+        self.coordinator.add_client()
+        source = session.source
+        if source.complete and len(source):
+            session.seek(
+                self.coordinator.live_tick(
+                    source.index.ticks[0],
+                    source.index.ticks[-1],
+                    source.tickrate,
+                    self.speed,
+                    self.loop_mode,
+                )
+            )
+
     def on_close(self, client: DemoDataWSH) -> int:
         """Handles closed connections."""
-        self.connected_clients.discard(client)
+        self._close_session(client)
         self._log(
             f"{msg.CLIENT_CLOSED_CONNECTION}: {client.request.remote_ip}"
         )
@@ -97,13 +454,217 @@ class DemodataServer:
             data = json.loads(message)
             if data.get("request") == "more ticks":
                 self._log(f"{msg.CLIENT_REQUEST_MORE_TICKS}: {data}")
-                ticks = self._gather_ticks(self.burst_size)
-                self._send_burst_data(ticks)
+                session = self.sessions[client]
+                self._send_burst_data(client, session.next_burst())
+                self._check_end_of_file(client, session)
+            elif data.get("request") == "stream mode":
+                self._set_stream_mode(client, data)
+            elif data.get("request") == "subscribe":
+                self._subscribe(client, data)
+            elif data.get("request") == "timeline":
+                await self._send_timeline(client, data)
+            elif data.get("request") in PLAYBACK_COMMANDS:
+                self._playback_command(client, data)
+            elif data.get("request") == "reconnect":
+                self._reconnect(client, data)
         except json.JSONDecodeError:
             self._log("Invalid message format received.", level="error")
         except Exception as e:
             self._log(f"Error handling client message: {e}", level="error")
 
+    def _set_stream_mode(self, client: DemoDataWSH, data: dict) -> None:
+        """Selects the stream mode requested by a client and confirms it.
+
+        i.e. {"request": "stream mode", "mode": "delta",
+        "keyframe_interval": 64, "batch": true}
+        """
+        session = self.sessions[client]
+        mode = session.set_mode(
+            data.get("mode", "full"), int(data.get("keyframe_interval", 64))
+        )
+        if "batch" in data:
+            session.batch = bool(data["batch"])
+        self._log(f"{msg.CLIENT_STREAM_MODE}: {mode}")
+        reply = {"mode": mode, "batch": session.batch}
+        if session.delta is not None:
+            reply["keyframe_interval"] = session.delta.keyframe_interval
+        self.writers[client].put(json.dumps(reply))
+
+    def _subscribe(self, client: DemoDataWSH, data: dict) -> None:
+        """Sets the fields, players and events a client receives.
+
+        i.e. {"request": "subscribe", "fields": ["players"],
+        "player_fields": ["x", "y", "z"]}
+        """
+        subscription = self.sessions[client].subscribe(
+            Subscription.from_message(data)
+        )
+        self._log(f"{msg.CLIENT_SUBSCRIBED}: {subscription.describe()}")
+        self.writers[client].put(
+            json.dumps({"subscription": subscription.describe()})
+        )
+
+    def _playback_command(self, client: DemoDataWSH, data: dict) -> None:
+        """Seeks, pauses, resumes or changes the rate or LOD of a stream.
+
+        i.e. {"request": "seek", "tick": 12345}, {"request": "seek",
+        "round": 14}, {"request": "pause"}, {"request": "resume"},
+        {"request": "rate", "rate": 2} or {"request": "lod", "level": 4}
+        ("auto" by default). Replies with the playback state.
+        """
+        session = self.sessions[client]
+        request = data["request"]
+        if request == "seek":
+            ended = session.ended
+            if "round" in data:
+                tick = session.seek_round(int(data["round"]))
+            else:
+                tick = session.seek(int(data["tick"]))
+            if tick != -1:
+                # Queued ticks are from before the seek
+                self.writers[client].drop_ticks()
+                if ended:
+                    session.resume()
+            self._log(f"{msg.STREAM_SEEK}: {tick}")
+        elif request == "pause":
+            session.pause()
+        elif request == "resume":
+            session.resume()
+        elif request == "rate":
+            session.set_rate(float(data["rate"]))
+        elif request == "lod":
+            level = data.get("level", "auto")
+            level = session.set_lod(None if level == "auto" else int(level))
+            self._log(f"{msg.CLIENT_LOD}: {level}")
+        self.writers[client].put(json.dumps({"state": session.state()}))
+
+    def _reconnect(self, client: DemoDataWSH, data: dict) -> None:
+        """Continues the session of a client that was disconnected.
+
+        i.e. {"request": "reconnect", "token": "...", "tick": 12345}, where
+        tick is the last tick the client received. The client's session
+        is replaced with the one of the token, and the frames the client
+        missed, or a snapshot of the last state, are sent from the
+        session's FrameRing. Without a session (no token, or resume
+        seconds passed) the client's stream continues from the tick
+        instead. Replies with "resumed", the token of the session and the
+        playback state.
+        """
+        tick = int(data.get("tick", -1))
+        current = self.sessions[client]
+        session = self.detached.get(data.get("token"))
+        resumed = session is not None and session.source is current.source
+        writer = self.writers[client]
+        if resumed:
+            del self.detached[session.token]
+            IOLoop.current().remove_timeout(self._expiry.pop(session.token))
+            self._release_session(current)
+            self.sessions[client] = session
+            writer.on_drop = session.request_keyframe
+            writer.drop_ticks()  # Sent by the new session
+            writer.put_many(session.resume_frames(tick))
+        elif tick >= 0:
+            session = current
+            if session.seek(tick + 1) != -1:
+                writer.drop_ticks()
+        else:
+            session = current
+        self._log(f"{msg.CLIENT_RECONNECTED}: {resumed}")
+        writer.put(
+            json.dumps(
+                {
+                    "resumed": resumed,
+                    "token": session.token,
+                    "state": session.state(),
+                }
+            )
+        )
+
+    async def _send_timeline(self, client: DemoDataWSH, data: dict) -> None:
+        """Sends the timeline of the client's demo.
+
+        i.e. {"request": "timeline", "types": ["kill"], "player": "tN1R"}
+        """
+        timeline = filter_timeline(
+            await self.sessions[client].source.timeline(),
+            data.get("types"),
+            data.get("player"),
+            data.get("round"),
+        )
+        if client in self.writers:  # Not disconnected meanwhile
+            self.writers[client].put(json.dumps({"timeline": timeline}))
+
+    async def timeline(
+        self,
+        demo_id: str | None = None,
+        types: list[str] | None = None,
+        player: str | None = None,
+        round_number: int | None = None,
+    ) -> dict:
+        """Returns the (filtered) timeline of a demo.
+
+        Raises KeyError for unknown demos.
+        """
+        source = await self._acquire_source(demo_id)
+        try:
+            timeline = await source.timeline()
+        finally:
+            if demo_id is not None:
+                self.library.release(source)
+        return filter_timeline(timeline, types, player, round_number)
+
+    def _close_session(self, client: DemoDataWSH) -> None:
+        """Removes a client and releases its demo.
+
+        With resume seconds, the session is kept for that long, so the
+        client can reconnect to it with the session's token.
+        """
+        self.connected_clients.discard(client)
+        writer = self.writers.pop(client, None)
+        if writer:
+            writer.close()
+        session = self.sessions.pop(client, None)
+        if session and self.resume_seconds > 0:
+            self.detached[session.token] = session
+            self._expiry[session.token] = IOLoop.current().call_later(
+                self.resume_seconds, self._expire_session, session.token
+            )
+        elif session:
+            self._release_session(session)
+
+    def _expire_session(self, token: str) -> None:
+        """Releases a detached session that was not resumed in time."""
+        self._expiry.pop(token, None)
+        session = self.detached.pop(token, None)
+        if session is not None:
+            self._release_session(session)
+
+    def _release_session(self, session: PlaybackSession) -> None:
+        if self.library and session.source is not self.source:
+            self.library.release(session.source)
+        elif self.coordinator is not None:
+            self.coordinator.add_client(-1)
+
+    def _disconnect_slow_client(self, client: DemoDataWSH) -> None:
+        """Closes a client that cannot keep up with the stream."""
+        self._log(
+            f"{msg.CLIENT_TOO_SLOW}: {client.request.remote_ip}",
+            level="warning",
+        )
+        self._close_session(client)
+        client.close(4008, msg.CLIENT_TOO_SLOW)
+
+    def demo_ids(self) -> list[str]:
+        """Lists the demos available in multi-demo mode."""
+        return self.library.demo_ids() if self.library else []
+
+    def session_stats(self) -> list[dict]:
+        """Returns the playback, pacing and queue stats of each session."""
+        return [
+            {**session.stats(), **self.writers[client].stats()}
+            for client, session in self.sessions.items()
+        ]
+
     def total_clients(self) -> str:
         """Formats info on clients to a single string."""
         connected_clients = len(self.connected_clients)
@@ -127,32 +688,58 @@ class DemodataServer:
                 self._log(f"{msg.STREAM_PAUSED}")
         return self.timer_callback.is_running()
 
-    def _parse_config_filename(self) -> Path:
-        """Creates $_config.json path from $.json path."""
-        config_filename = self.ticks_filename.with_name(
-            f"{self.ticks_filename.stem}_config.json"
-        )
-        return config_filename
-
-    def _read_config(self) -> None:
-        """Reads values from $_config.json and assigns them to variables."""
-        config_filename = self._parse_config_filename()
+    def _read_source(
+        self,
+        packed: bool = False,
+        growing: bool = False,
+        mapped: bool = False,
+        processed: bool = False,
+    ) -> None:
+        """Opens the ticks, config and index files for sessions to share."""
         try:
-            with open(Path(config_filename)) as f:
-                config = json.load(f)
-                self._validate_config(config)
-                self.tickrate = self._sanitize_tickrate(config["tickrate"])
-                self.total_ticks = config["total_ticks"]
-                self.map_name = config["map_name"]
-        except KeyError as e:
-            self._log(f"Config validation error: {e}", level="error")
+            start = time.perf_counter()
+            self.source = TickSource(
+                self.ticks_filename,
+                cache=self.cache,
+                packed=packed,
+                growing=growing,
+                mapped=mapped,
+                processed=processed,
+            ).load()
+            self.source_load_seconds.observe(time.perf_counter() - start)
+            self._copy_source_info()
         except Exception as e:
-            self._log(f"{msg.FILE_CONFIG_ERROR}: {e}", level="error")
+            self._log(f"{msg.FILE_INDEX_ERROR}: {e}", level="error")
+            return
+        if not self.source.complete:
+            self._log(f"{msg.STREAM_WAITING}: {self.ticks_filename}")
+            self.refresh_callback = PeriodicCallback(
+                self._refresh_source, self.refresh_interval_ms
+            )
+            self.refresh_callback.start()
+
+    def _copy_source_info(self) -> None:
+        self.tickrate = self.source.tickrate
+        self.total_ticks = self.source.total_ticks
+        self.map_name = self.source.map_name
+
+    def _refresh_source(self) -> None:
+        """Indexes new ticks of a ticks file that is still being parsed."""
+        try:
+            self.source.refresh()
+        except Exception as e:
+            self._log(f"{msg.FILE_INDEX_ERROR}: {e}", level="error")
+            self.source.complete = True
+        if self.source.complete:
+            self._copy_source_info()
+            self.refresh_callback.stop()
 
     def _init_values(self) -> None:
         """Init required variables before streaming can be started."""
-        self.ticks = self._ticks_chopper()
         self.interval_ms = self._calc_interval_ms(self.tickrate)
+        self.timer_callback = PeriodicCallback(
+            self._update_buffer, self.interval_ms
+        )
 
     def _calc_interval_ms(self, tickrate: int) -> float:
         """Takes tickrate and converts it to interval (ms), used as a internal clock."""
@@ -160,82 +747,65 @@ class DemodataServer:
         interval_ms: float = 1000 / tickrate
         return interval_ms
 
-    def _end_of_file(self) -> None:
-        """Handles the end of the tick data file."""
-        for client in list(self.connected_clients):
-            IOLoop.current().add_callback(self._transmit_ticks, client, "EOF")
+    def _end_of_file(self, client: DemoDataWSH) -> None:
+        """Handles the end of the tick data file for a client."""
+        if client in self.writers:
+            self.writers[client].put("EOF")
         self._log(f"{msg.STREAM_ENDED}", level="warning")
 
-    def _update_buffer(self) -> None:
-        """Update buffers and send data to clients based on the threshold counter."""
-        try:
-            # Send the first burst of ticks
-            if not self.ticks_buffer:
-                self.ticks_buffer = self._gather_ticks(self.burst_size)
-                self._send_burst_data(self.ticks_buffer)
-            # Send concurrent bursts of ticks
-            if self.current_tick >= self.burst_size:
-                self.ticks_buffer = self._gather_ticks(self.burst_size)
-                self._send_burst_data(self.ticks_buffer)
-                self.current_tick = 0
-            self.current_tick += 1
-        except Exception as e:
-            self._log(f"Error in buffer update: {e}", level="error")
+    def _check_end_of_file(
+        self, client: DemoDataWSH, session: PlaybackSession
+    ) -> None:
+        """Sends EOF once when a session has played the whole file."""
+        if session.ended and not session.paused:
+            self._end_of_file(client)
+            session.pause()
 
-    def _gather_ticks(self, burst_size: int) -> list:
-        """Gather a specified number of ticks."""
-        ticks = []
-        try:
-            for _ in range(burst_size):
-                tick = next(self.ticks)
-                ticks.append(json.loads(tick))
-        except StopIteration:
-            self._end_of_file()
-            # Stop the streaming loop
-            self.timer_callback.stop()
-        except Exception as e:
-            self._log(f"Error gathering ticks: {e}", level="error")
-        return ticks
+    def _update_buffer(self) -> None:
+        """Send the bursts that are due by each session's playback clock."""
+        with self.update_seconds.time():
+            for client, session in list(self.sessions.items()):
+                try:
+                    start = time.perf_counter()
+                    if client in self.writers:
+                        session.adapt_lod(self.writers[client].backlog())
+                    ticks_buffer = session.advance()
+                    self.gather_seconds.observe(time.perf_counter() - start)
+                    self.ticks_gathered.inc(len(ticks_buffer))
+                    self._send_burst_data(client, ticks_buffer)
+                    self._check_end_of_file(client, session)
+                except Exception as e:
+                    self._log(f"Error in buffer update: {e}", level="error")
+
+    def _send_burst_data(
+        self, client: DemoDataWSH, ticks_buffer: list[bytes]
+    ) -> None:
+        """Queue a batch of ticks to a client."""
+        if client in self.writers:
+            self.writers[client].put_many(ticks_buffer)
 
-    def _send_burst_data(self, ticks_buffer: list) -> None:
-        """Send a batch of ticks to all connected clients."""
-        if not ticks_buffer:
-            return
-        for client in list(self.connected_clients):
-            for tick in ticks_buffer:
-                IOLoop.current().add_callback(
-                    self._transmit_ticks, client, tick
-                )
+    async def _transmit_ticks(self, client, tick: bytes | str) -> None:
+        """Transmit ticks to client, called by the client's writer.
 
-    async def _transmit_ticks(self, client, tick: dict) -> None:
-        """Transmit ticks to client."""
-        if self.connected_clients:
+        Ticks are already encoded JSON frames, so the same buffer is
+        written to every client as a text message without re-encoding.
+        Waiting for the write keeps unsent frames in the bounded queue
+        instead of the connection's buffer.
+        """
+        if client in self.connected_clients:
             try:
-                await client.write_message(
-                    json.dumps(tick) if isinstance(tick, dict) else tick
+                start = time.perf_counter()
+                await client.write_message(tick)
+                self.transmit_seconds.observe(time.perf_counter() - start)
+                self.frames_sent.inc()
+                self.bytes_sent.inc(
+                    len(tick.encode("utf-8"))
+                    if isinstance(tick, str)
+                    else len(tick)
                 )
             except Exception as e:
                 self._log(f"Error transmitting tick: {e}", level="error")
-                self.connected_clients.discard(client)
-
-    def _ticks_chopper(self) -> ijson.items:
-        """Chops ticks from JSON data.
-
-        This function uses Iterative JSON library for reading
-        a large JSON files directly from hard-drive, without first loading
-        it to main memory. Handles loop mode if enabled.
-        """
-        while True:
-            with open(self.ticks_filename, "r") as file:
-                for tick in ijson.items(
-                    file,
-                    "ticks.item",
-                    use_float=True,
-                ):
-                    yield json.dumps(tick)
-            if not self.loop_mode:
-                break
-            self._log(f"{msg.STREAM_LOOP_MODE}")
+                self._close_session(client)
 
     def ticks_file(self, ticks_filename: Path) -> Path:
         """Handles the input file for $.json (ticks)."""
@@ -243,6 +813,36 @@ class DemodataServer:
         self._log(f"{msg.STREAM_INPUT_FILE}: {self.ticks_filename}")
         return ticks_filename
 
+    def _routes(self) -> list[tuple]:
+        """Returns the routes of the server application.
+
+        /metrics and /profile are only served when turned on, as they
+        share the public port of the clients.
+        """
+        routes = [
+            (self.srv_endpoint, DemoDataWSH, dict(server=self)),
+            (
+                rf"{self.srv_endpoint}/(?P<demo_id>[\w\-/]+)",
+                DemoDataWSH,
+                dict(server=self),
+            ),
+            (r"/demos", DemoListHandler, dict(server=self)),
+            (r"/stats", StatsHandler, dict(server=self)),
+            (r"/parse", ParseHandler, dict(server=self)),
+            (r"/parse/(?P<job_id>\d+)", ParseHandler, dict(server=self)),
+            (r"/timeline", TimelineHandler, dict(server=self)),
+            (
+                r"/timeline/(?P<demo_id>[\w\-/]+)",
+                TimelineHandler,
+                dict(server=self),
+            ),
+        ]
+        if self.metrics_route:
+            routes.append((r"/metrics", MetricsHandler, dict(server=self)))
+        if self.profiler_route:
+            routes.append((r"/profile", ProfileHandler, dict(server=self)))
+        return routes
+
     def start_server(
         self,
         srv_address: str,
@@ -250,24 +850,123 @@ class DemodataServer:
         srv_endpoint: str,
         loop_mode: bool = False,
         burst_size: int = 16,
+        demo_folder: Path | None = None,
+        library_size: int = 16,
+        packed: bool = False,
+        play_nth: int = 1,
+        speed: float = 1.0,
+        queue_size: int = 256,
+        slow_client_policy: str = "keyframe",
+        growing: bool = False,
+        cache_mb: int = 256,
+        mapped: bool = False,
+        coordinator: LiveCoordinator | None = None,
+        compression_level: int | None = None,
+        compression_mem_level: int = 8,
+        batch_ticks: bool = False,
+        processed: bool = False,
+        parse_service: bool = False,
+        parse_workers: int | None = None,
+        processors: list[str] | None = None,
+        lod_levels: list[int] | None = None,
+        resume_seconds: float = 0,
+        ring_size: int = 256,
+        metrics: bool = False,
+        profiler: bool = False,
     ) -> None:
-        """Starts the demo data server."""
+        """Starts the demo data server.
+
+        With a demo folder, every parsed demo in it can be streamed from
+        {srv_endpoint}/{demo_id}, in addition to the default demo. With
+        packed, ticks are read from the compact binary containers, and with
+        processed, from the post-processed ticks files. Play_nth and speed
+        set the default playback of every session. Each client has a queue
+        of at most queue_size frames, and slow_client_policy decides what
+        happens when it is full (see ClientWriter). With
+        growing, the default demo is streamed while it is still being
+        parsed. Encoded ticks of every demo are cached in memory up to
+        cache_mb megabytes. With mapped, ticks files are memory-mapped,
+        so server processes share them through the page cache.
+
+        With a coordinator, the server is one of several worker processes
+        sharing the listen port (SO_REUSEPORT), and clients of the default
+        demo join the live broadcast at the tick shared by the workers.
+
+        With a compression level (1-9), clients that offer permessage-deflate
+        get compressed frames, using compression_mem_level (1-9).
+        With batch_ticks, sessions send each burst as a single frame.
+
+        With parse_service and a demo folder, demos of the folder can be
+        queued for parsing on /parse, and are parsed by parse_workers
+        processes (one per CPU if None) with the given post-processors,
+        and LOD tracks of lod_levels. Sessions read the LOD tracks a demo
+        has as their speed and queue call for (see PlaybackSession).
+
+        With resume_seconds, the session of a disconnected client is kept
+        for that long, and the client can reconnect to it and get the last
+        of ring_size frames it missed.
+
+        With metrics, /metrics serves the Prometheus metrics of the server,
+        and with profiler, /profile samples it on request.
+        """
         # Init values from arguments
         self.srv_address = srv_address
         self.srv_port = srv_port
         self.srv_endpoint = srv_endpoint
         self.loop_mode = loop_mode
         self.burst_size = burst_size
-        # Read demo data config file
-        self._read_config()
+        self.play_nth = max(1, play_nth)
+        self.speed = speed
+        self.queue_size = queue_size
+        self.slow_client_policy = slow_client_policy
+        self.cache = TickCache(cache_mb << 20)
+        self.coordinator = coordinator
+        self.compression_level = compression_level
+        self.compression_mem_level = compression_mem_level
+        self.batch_ticks = batch_ticks
+        self.resume_seconds = resume_seconds
+        self.ring_size = ring_size
+        self.metrics_route = metrics
+        self.profiler_route = profiler
+        # Read demo data config, ticks and index files
+        if self.ticks_filename != Path():
+            self._read_source(packed, growing, mapped, processed)
+        if demo_folder is not None:
+            self.library = DemoLibrary(
+                demo_folder,
+                library_size,
+                packed,
+                self.cache,
+                mapped,
+                processed,
+            )
+            if parse_service:
+                self.parse_jobs = ParseJobs(
+                    demo_folder,
+                    parse_workers,
+                    packed,
+                    processors,
+                    lod_levels,
+                    on_parsed=self.record_parse_timings,
+                    on_written=self._demo_written,
+                )
         # Init rest of variables
         self._init_values()
         # Init the demo data server
-        app = Application(
-            [(self.srv_endpoint, DemoDataWSH, dict(server=self))]
+        app = Application(self._routes())
+        app.listen(
+            self.srv_port,
+            self.srv_address,
+            reuse_port=self.coordinator is not None,
         )
-        app.listen(self.srv_port, self.srv_address)
         self._log(f"{msg.SERVER_START} @ {self._server_info()}")
+        if self.coordinator is not None:
+            self._log(f"{msg.SERVER_WORKER}: {os.getpid()}")
         self._log(f"{msg.CLIENT_CAN_CONNECT}")
+        self._check_loop_lag(IOLoop.current().time())
         # Start main loop
-        IOLoop.current().start()
+        try:
+            IOLoop.current().start()
+        finally:
+            if self.parse_jobs is not None:
+                self.parse_jobs.close()
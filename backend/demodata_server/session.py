@@ -0,0 +1,326 @@
+import json
+import time
+import secrets
+from typing import Callable
+from .delta import DeltaEncoder
+from .frame_ring import FrameRing
+from .scheduler import PlaybackClock
+from .source import TickSource
+from .subscription import Subscription
+
+# Stream modes a client can select
+STREAM_MODES = ("full", "delta")
+# Automatic LOD: a client queue this full doubles the level, an empty
+# queue halves it again, at most once per LOD_HOLD seconds
+LOD_BACKLOG = 0.5
+LOD_HOLD = 1.0
+
+
+def batch_frame(frames: list[bytes]) -> bytes:
+    """Packs encoded ticks into one frame, a JSON array of the ticks."""
+    return b"[" + b",".join(frames) + b"]"
+
+
+class PlaybackSession:
+    """Playback state of a single client.
+
+    Each client has its own cursor, clock and pause state, while the
+    ticks are read through a TickSource shared by all sessions of the demo.
+    With play_nth, only every Nth tick is sent, except ticks with round
+    starts or kills, which are never skipped. With batch, every burst is
+    sent as a single frame instead of a frame per tick.
+
+    Ticks are read from a track of the demo: the source itself, or one of
+    its LOD tracks of every Nth tick (see TickSource.track). A client can
+    select the level, or leave it to the session, which follows the
+    playback speed (a track of level 4 at 4x) and the client's queue
+    (see adapt_lod), so playing fast or to a slow client reads and sends
+    fewer ticks rather than more.
+
+    The last ring_size frames are kept in a FrameRing, so a client that
+    reconnects with the token of its session gets the frames it missed
+    (see resume_frames).
+    """
+
+    def __init__(
+        self,
+        source: TickSource,
+        burst_size: int = 16,
+        loop_mode: bool = False,
+        play_nth: int = 1,
+        speed: float = 1.0,
+        batch: bool = False,
+        ring_size: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source: TickSource = source
+        self.track: TickSource = source  # Source or LOD track read from
+        self.lod: int | None = None  # Selected LOD level, None for auto
+        self._lod_boost: int = 1  # Level multiplier for a slow client
+        self._lod_changed: float = -LOD_HOLD
+        self.burst_size: int = burst_size  # Number of ticks/burst
+        self.loop_mode: bool = loop_mode
+        self.play_nth: int = max(1, play_nth)
+        self.cursor: int = 0  # Next tick index entry to send
+        self.clock: PlaybackClock = PlaybackClock(
+            source.tickrate, speed, clock=clock
+        )
+        self.paused: bool = False
+        self.ended: bool = False  # End of file reached (no loop mode)
+        self.delta: DeltaEncoder | None = None  # Set in delta stream mode
+        self.subscription: Subscription | None = None  # None: whole ticks
+        self.batch: bool = batch  # A frame per burst
+        self.recent: FrameRing = FrameRing(ring_size)  # Frames sent last
+        self.token: str = secrets.token_urlsafe(16)  # Resumes the session
+        self.set_lod(None)
+
+    def current_tick(self) -> int:
+        """Returns the tick number at the cursor, -1 at the end."""
+        if self.cursor >= len(self.track):
+            return -1
+        return self.track.index.ticks[self.cursor]
+
+    def next_burst(self, burst_size: int | None = None) -> list[bytes]:
+        """Reads the next burst of ticks and moves the cursor past them."""
+        burst_size = burst_size or self.burst_size
+        start = self.cursor
+        ticks = self.track.read(
+            start, burst_size * self.play_nth, self.subscription
+        )
+        self.cursor += len(ticks)
+        flags = self.track.index.flags
+        entries = [
+            entry
+            for entry, tick in enumerate(ticks, start)
+            if tick is not None
+            and (
+                self.play_nth == 1
+                or entry % self.play_nth == 0
+                or flags[entry]
+            )
+        ]
+        ticks = self._encode([ticks[entry - start] for entry in entries])
+        numbers = self.track.index.ticks
+        for entry, tick in zip(entries, ticks):
+            self.recent.append(numbers[entry], tick)
+        if self.batch and ticks:
+            ticks = [batch_frame(ticks)]
+        if self.cursor >= len(self.track) and self.track.complete:
+            if self.loop_mode:
+                self._loop()
+            else:
+                self.ended = True
+        return ticks
+
+    def _loop(self) -> None:
+        """Starts again from the first tick right after the last one."""
+        ticks = self.track.index.ticks
+        if self.clock.is_anchored():
+            self.clock.anchor(ticks[0], self.clock.time_of(ticks[-1] + 1))
+        self.cursor = 0
+        self._reset_stream()
+
+    def _encode(self, ticks: list[bytes]) -> list[bytes]:
+        """Encodes ticks for the stream mode of the session."""
+        if self.delta is None:
+            return ticks
+        return [
+            json.dumps(
+                self.delta.encode(json.loads(tick)), separators=(",", ":")
+            ).encode("utf-8")
+            for tick in ticks
+        ]
+
+    def _reset_stream(self) -> None:
+        """Starts the stream again from a keyframe after a jump."""
+        if self.delta is not None:
+            self.delta.reset()
+        self.recent.clear()
+
+    def snapshot(self) -> bytes | None:
+        """Returns the client's state after the last frame, as one frame.
+
+        In the delta stream mode a keyframe of the last tick, otherwise
+        the last frame. None before the first frame.
+        """
+        if self.delta is not None:
+            if self.delta.previous is None:
+                return None
+            return json.dumps(
+                {"key": self.delta.previous}, separators=(",", ":")
+            ).encode("utf-8")
+        return self.recent.latest()
+
+    def resume_frames(self, tick: int) -> list[bytes]:
+        """Returns what a reconnected client needs to continue.
+
+        These are the frames after the last tick the client received,
+        when the ring still has them, and otherwise a snapshot of the
+        last state sent. The stream then continues from where it was.
+        """
+        frames = self.recent.since(tick)
+        if frames is None:
+            snapshot = self.snapshot()
+            frames = [] if snapshot is None else [snapshot]
+        self.clock.reset()
+        if self.batch and frames:
+            frames = [batch_frame(frames)]
+        return frames
+
+    def request_keyframe(self) -> None:
+        """Sends the next tick as a keyframe, e.g. after dropped ticks."""
+        self._reset_stream()
+
+    def set_mode(self, mode: str, keyframe_interval: int = 64) -> str:
+        """Selects full ticks or keyframes and deltas for the stream."""
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Invalid stream mode: {mode}")
+        self.delta = (
+            DeltaEncoder(keyframe_interval) if mode == "delta" else None
+        )
+        return mode
+
+    def subscribe(self, subscription: Subscription) -> Subscription:
+        """Selects the parts of ticks sent, from a keyframe onwards."""
+        self.subscription = None if subscription.is_full() else subscription
+        self._reset_stream()
+        return subscription
+
+    def advance(self, now: float | None = None) -> list[bytes]:
+        """Sends the bursts that are due by the playback clock.
+
+        The first burst is sent right away, after which a new burst is
+        sent when the first tick of it is due. After a stall every burst
+        due is sent at once to catch up.
+        """
+        now = self.clock.now() if now is None else now
+        ticks = []
+        while not (self.paused or self.ended):
+            if self.cursor >= len(self.track):
+                if not self.track.complete:
+                    # Waiting for the parser, pace again from new ticks
+                    self.clock.reset()
+                    break
+                if not len(self.track):
+                    self.ended = True
+                    break
+                # Parsing completed right at the cursor, end or loop
+                ticks.extend(self.next_burst())
+                continue
+            tick = self.current_tick()
+            if not self.clock.is_due(tick, now):
+                break
+            self.clock.record(tick, now)
+            ticks.extend(self.next_burst())
+        return ticks
+
+    def seek(self, tick: int) -> int:
+        """Moves the cursor to the first tick at or after the given tick.
+
+        Returns the tick playback continues from, or -1 if not found.
+        """
+        entry = self.track.index.entry(tick)
+        if entry >= len(self.track):
+            return -1
+        self.cursor = entry
+        self._reset_stream()
+        self.clock.reset()
+        self.ended = False
+        return self.current_tick()
+
+    def seek_round(self, round_number: int) -> int:
+        """Moves the cursor to the start of a round (1 = first round).
+
+        Returns the tick playback continues from, or -1 if not found.
+        """
+        round_starts = self.source.round_starts()
+        if not 1 <= round_number <= len(round_starts):
+            return -1
+        return self.seek(
+            self.source.index.ticks[round_starts[round_number - 1]]
+        )
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def resume(self) -> None:
+        self.paused = False
+        self.clock.reset()
+
+    def set_rate(self, rate: float) -> float:
+        """Sets the playback speed, from MIN_SPEED to MAX_SPEED."""
+        speed = self.clock.set_speed(rate, self.current_tick())
+        if self.lod is None:
+            self._switch_track(self._auto_level())
+        return speed
+
+    def _auto_level(self) -> int:
+        return max(1, int(self.clock.speed)) * self._lod_boost
+
+    def _switch_track(self, level: int) -> int:
+        """Continues from the same tick in the track of a level.
+
+        Returns the level of the track read from.
+        """
+        track = self.source.track(level)
+        if track is not self.track:
+            tick = self.current_tick()
+            self.track = track
+            self.cursor = len(track) if tick == -1 else track.index.entry(tick)
+            self._reset_stream()
+        return self.track.level
+
+    def set_lod(self, level: int | None) -> int:
+        """Selects the LOD level of the ticks, None for automatic.
+
+        Returns the level of the track read from, the highest available
+        up to the selected level.
+        """
+        self.lod = None if level is None else max(1, level)
+        self._lod_boost = 1
+        return self._switch_track(
+            self._auto_level() if self.lod is None else self.lod
+        )
+
+    def adapt_lod(self, backlog: float, now: float | None = None) -> int:
+        """Follows the client's link in automatic LOD.
+
+        Backlog is how full the client's queue is (0-1). A queue at least
+        LOD_BACKLOG full doubles the level the speed calls for, and an
+        empty queue halves it again. Returns the level of the track.
+        """
+        if self.lod is not None:
+            return self.track.level
+        now = self.clock.now() if now is None else now
+        if now - self._lod_changed < LOD_HOLD:
+            return self.track.level
+        boost = self._lod_boost
+        if backlog >= LOD_BACKLOG and self.track.level < max(
+            self.source.lod_levels(), default=1
+        ):
+            boost *= 2
+        elif backlog == 0 and boost > 1:
+            boost //= 2
+        if boost != self._lod_boost:
+            self._lod_boost = boost
+            self._lod_changed = now
+        return self._switch_track(self._auto_level())
+
+    def state(self) -> dict:
+        """Returns the playback state sent to the client."""
+        return {
+            "tick": self.current_tick(),
+            "paused": self.paused,
+            "rate": self.clock.speed,
+            "lod": self.track.level,
+        }
+
+    def stats(self) -> dict:
+        """Returns the playback state and pacing metrics of the session."""
+        return {
+            "demo": self.source.ticks_filename.stem,
+            "tick": self.current_tick(),
+            "play_nth": self.play_nth,
+            "lod": self.track.level,
+            **self.clock.stats(),
+        }
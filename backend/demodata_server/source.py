@@ -0,0 +1,470 @@
+import json
+import logging
+from asyncio import Future
+from pathlib import Path
+from typing import BinaryIO
+from tornado.ioloop import IOLoop
+from demodata_parser.lod import lod_filename, track_levels
+from demodata_parser.packed import packed_filename
+from demodata_parser.postprocess import (
+    lines_filename,
+    processed_filename,
+    read_processed_info,
+    write_lines,
+)
+from demodata_parser.tick_index import (
+    TickIndex,
+    TICKS_HEADER,
+    parsing_filename,
+)
+from demodata_parser.timeline import read_timeline
+from . import messages as msg
+from .mapped_reader import MappedReader
+from .packed_reader import PackedReader
+from .subscription import Subscription
+from .tick_cache import TickCache
+
+
+class TickSource:
+    """Shared read path to a parsed demo.
+
+    Holds the ticks file, its config, its tick index and a cache of
+    encoded ticks. Every playback session of the demo reads through the
+    same source, so the number of viewers does not multiply disk reads
+    or memory use. Ticks are cached in chunks in a TickCache, which the
+    sources of a server share under one memory budget. Ticks projected
+    for a subscription are cached the same way, so a projection is
+    applied once per subscription, however many sessions share it.
+
+    With packed=True ticks are read from the $_packed.bin container
+    instead, and decoded to the same JSON frames. With processed=True
+    they are read from $_processed.json, written by the post-processors
+    of the parser, when it exists.
+
+    The LOD tracks of the demo, downsampled by the parser to every Nth
+    tick, are sources of their own (level N), loaded by track() when a
+    session first switches to them. They share the cache and are closed
+    with the source of the demo.
+
+    With mapped=True the file is memory-mapped (see MappedReader), and
+    frames are copied straight from the page cache, or packed records
+    decoded in place, instead of going through file reads.
+
+    With growing=True the ticks file may still be written by the parser.
+    Complete tick lines are indexed as they appear on refresh(), until
+    the parser's $_parsing marker is gone.
+    """
+
+    def __init__(
+        self,
+        ticks_filename: Path,
+        chunk_size: int = 256,
+        cache: TickCache | None = None,
+        packed: bool = False,
+        growing: bool = False,
+        mapped: bool = False,
+        processed: bool = False,
+        level: int = 1,
+    ):
+        self.ticks_filename: Path = ticks_filename
+        # Ticks, packed, processed or LOD track file
+        self.data_filename: Path = ticks_filename
+        self.packed: bool = packed
+        self.processed: bool = processed
+        self.growing: bool = growing
+        self.mapped: bool = mapped
+        self.level: int = level  # Every level-th tick, 1 for all ticks
+        self.complete: bool = True  # False while the parser is writing
+        self._scan_offset: int = 0  # Where to continue indexing from
+        self._reader: PackedReader | None = None
+        # Demodata info
+        self.tickrate: int = 64
+        self.total_ticks: int = -1
+        self.map_name: str = ""
+        self.clients: int = 0  # Sessions reading this source
+        self.index: TickIndex = TickIndex()
+        self.chunk_size: int = chunk_size  # Ticks per cached chunk
+        # (data file, chunk size, subscription key, chunk) -> ticks, None
+        # if filtered out
+        self.cache: TickCache = cache if cache is not None else TickCache()
+        self._file: BinaryIO | None = None
+        self._mapped_reader: MappedReader | None = None
+        self._timeline: dict | None = None
+        self._timeline_read: Future | None = None  # Off the event loop
+        self._round_starts: list[int] | None = None
+        self._tracks: dict[int, TickSource] = {}  # LOD level -> source
+        self._lod_levels: list[int] | None = None
+        # Steam id -> number, if the players of the data file are interned
+        self.player_numbers: dict[int, int] | None = None
+        self._interned: dict[Subscription, Subscription] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _log(self, message: str, level: str = "info") -> None:
+        """Helper method for logging messages with class name."""
+        class_name = "SOURCE"
+        log_func = getattr(logging, level, logging.info)
+        log_func(f"{class_name} - {message}")
+
+    def _validate_config(self, config: dict) -> None:
+        """Validates the configuration file for required keys."""
+        required_keys = ["tickrate", "total_ticks", "map_name"]
+        for key in required_keys:
+            if key not in config:
+                raise KeyError(f"Missing required config key: {key}")
+
+    def _sanitize_tickrate(self, tickrate: int) -> int:
+        """Ensures the tickrate is at least 64."""
+        return max(64, tickrate)
+
+    def config_filename(self) -> Path:
+        """Creates $_config.json path from $.json path."""
+        return self.ticks_filename.with_name(
+            f"{self.ticks_filename.stem}_config.json"
+        )
+
+    def _read_config(self) -> None:
+        """Reads values from $_config.json and assigns them to variables."""
+        try:
+            with open(self.config_filename()) as f:
+                config = json.load(f)
+                self._validate_config(config)
+                self.tickrate = self._sanitize_tickrate(config["tickrate"])
+                self.total_ticks = config["total_ticks"]
+                self.map_name = config["map_name"]
+        except KeyError as e:
+            self._log(f"Config validation error: {e}", level="error")
+        except Exception as e:
+            self._log(f"{msg.FILE_CONFIG_ERROR}: {e}", level="error")
+
+    def _data_file(self) -> Path:
+        """Returns the LOD track, packed, processed or ticks file to read."""
+        if self.level > 1:
+            return lod_filename(self.ticks_filename, self.level)
+        if self.packed:
+            return packed_filename(self.ticks_filename)
+        if self.processed and processed_filename(self.ticks_filename).exists():
+            return processed_filename(self.ticks_filename)
+        if lines_filename(self.ticks_filename).exists():
+            return lines_filename(self.ticks_filename)
+        return self.ticks_filename
+
+    def needs_index(self) -> bool:
+        """Checks if the file to read has no $_index.bin sidecar."""
+        return not TickIndex.index_filename(self._data_file()).exists()
+
+    def build_index(self) -> TickIndex:
+        """Indexes the file to read in memory, scanning all of it.
+
+        A ticks file without the tick per line layout of the Go parser
+        is rewritten to $_lines.json with the incremental JSON parser,
+        and read from there.
+        """
+        data_filename = self._data_file()
+        if self.packed or data_filename != self.ticks_filename:
+            return TickIndex.build(
+                self.ticks_filename if self.packed else data_filename
+            )
+        try:
+            index = TickIndex.build(data_filename)
+        except ValueError:
+            index = TickIndex()
+        if len(index):
+            return index
+        self._log(f"{msg.STREAM_NOT_LINES}: {data_filename}")
+        return TickIndex.read(
+            TickIndex.index_filename(write_lines(data_filename))
+        )
+
+    def load(self, index: TickIndex | None = None) -> "TickSource":
+        """Reads the config and the $_index.bin sidecar.
+
+        The file is indexed in memory if the sidecar is missing, unless
+        an index built beforehand with build_index is given.
+        """
+        if self.growing:
+            return self._load_growing()
+        self._read_config()
+        data_filename = self._data_file()
+        if self.level == 1 and self.packed:
+            self._reader = PackedReader(data_filename)
+        elif self.processed and data_filename == self.ticks_filename:
+            self._log(f"{msg.STREAM_NO_PROCESSED}: {self.ticks_filename}")
+        index_filename = TickIndex.index_filename(data_filename)
+        if index_filename.exists():
+            index = TickIndex.read(index_filename)
+        else:
+            self._log(f"{msg.STREAM_NO_INDEX}: {index_filename}")
+            if index is None:
+                index = self.build_index()
+                data_filename = self._data_file()  # $_lines.json if written
+        self._discard_cached()  # Of the previous data file
+        self.data_filename = data_filename
+        self.index = index
+        if self.level == 1:
+            self.player_numbers = self._read_player_numbers()
+        self._interned = {}
+        if self._mapped_reader is not None:
+            self._mapped_reader.close()  # Mapped again on the next read
+            self._mapped_reader = None
+        if self._file is not None:
+            self._file.close()  # Of the previous data file
+            self._file = None
+        if not self.mapped:
+            self._file = open(data_filename, "rb")
+        self._round_starts = None
+        self._timeline = None
+        self._close_tracks()
+        return self
+
+    def reload(self) -> "TickSource":
+        """Loads the files again, after the demo was parsed again.
+
+        The loaded LOD tracks are loaded again in place too, as sessions
+        can be reading them. Tracks that are gone are dropped.
+        """
+        tracks = self._tracks
+        self._tracks = {}  # Kept open by load
+        self.load()
+        for level, track in tracks.items():
+            try:
+                track.load()
+            except OSError:
+                track.close()
+                continue
+            track.player_numbers = self.player_numbers
+            self._tracks[level] = track
+        return self
+
+    def _read_player_numbers(self) -> dict[int, int] | None:
+        """Reads the numbers of interned players of processed ticks."""
+        if self.data_filename != processed_filename(self.ticks_filename):
+            return None
+        info = read_processed_info(self.ticks_filename)
+        if "intern_players" not in info.get("processors", []):
+            return None
+        return {
+            sid: number for number, sid in enumerate(info.get("players", []))
+        }
+
+    def _load_growing(self) -> "TickSource":
+        """Starts indexing a ticks file that is still being written."""
+        self.index = TickIndex()
+        self.complete = False
+        self._scan_offset = 0
+        self._discard_cached()
+        self._round_starts = None
+        self.refresh()
+        return self
+
+    def _open_growing(self) -> bool:
+        """Opens the ticks file once its header has been written."""
+        if self._file is None:
+            try:
+                self._file = open(self.ticks_filename, "rb")
+            except FileNotFoundError:
+                return False
+        if self._scan_offset == 0:
+            self._file.seek(0)
+            header = self._file.readline()
+            if not header.endswith(b"\n"):
+                return False
+            if header.strip() != TICKS_HEADER:
+                raise ValueError(f"Not a ticks file: {self.ticks_filename}")
+            self._scan_offset = len(header)
+        return True
+
+    def refresh(self) -> int:
+        """Indexes ticks written since the previous refresh.
+
+        Returns the number of new ticks. Once the parser has finished, the
+        rest of the file and the config are read and the source is
+        complete.
+        """
+        if self.complete:
+            return 0
+        # Checked before scanning, so the last ticks cannot be missed
+        parsing = parsing_filename(self.ticks_filename).exists()
+        count = len(self.index)
+        if self._open_growing():
+            self._file.seek(self._scan_offset)
+            self._scan_offset = self.index.scan(self._file)
+            if count and len(self.index) > count:
+                # The last chunk may have been cached before it was full
+                last_chunk = (count - 1) // self.chunk_size
+                self.cache.discard_where(
+                    lambda key: key[:2]
+                    == (self.data_filename, self.chunk_size)
+                    and key[3] == last_chunk
+                )
+        if not parsing:
+            self.complete = True
+            self._read_config()
+            self._log(f"{msg.STREAM_PARSE_COMPLETE}: {len(self.index)}")
+        return len(self.index) - count
+
+    def round_starts(self) -> list[int]:
+        """Returns the index entries where rounds start."""
+        if self._round_starts is None or not self.complete:
+            self._round_starts = self.index.round_starts()
+        return self._round_starts
+
+    async def timeline(self) -> dict:
+        """Returns the round and event timeline of the demo.
+
+        Read from $_timeline.json, which is built once if it is missing.
+        Both run in an executor, so streams are not stalled meanwhile, and
+        requests arriving before it is done wait for the same read.
+        """
+        if not self.complete:
+            raise ValueError(msg.STREAM_WAITING)
+        if self._timeline is None:
+            if self._timeline_read is None:
+                self._timeline_read = IOLoop.current().run_in_executor(
+                    None, read_timeline, self.ticks_filename
+                )
+            try:
+                self._timeline = await self._timeline_read
+            finally:
+                self._timeline_read = None  # Read again after an error
+        return self._timeline
+
+    def lod_levels(self) -> list[int]:
+        """Returns the levels of the LOD tracks sessions can switch to.
+
+        Tracks are used only if they were post-processed the same way as
+        the ticks of this source.
+        """
+        if self.packed or self.level > 1 or not self.complete:
+            return []
+        if self._lod_levels is None:
+            processors = []
+            if self.data_filename == processed_filename(self.ticks_filename):
+                processors = read_processed_info(self.ticks_filename).get(
+                    "processors", []
+                )
+            self._lod_levels = track_levels(self.ticks_filename, processors)
+        return self._lod_levels
+
+    def track(self, level: int) -> "TickSource":
+        """Returns the LOD track with the highest level up to the given.
+
+        Returns this source when there is no such track.
+        """
+        levels = [other for other in self.lod_levels() if other <= level]
+        if not levels:
+            return self
+        level = levels[-1]
+        if level not in self._tracks:
+            self._tracks[level] = TickSource(
+                self.ticks_filename,
+                self.chunk_size,
+                self.cache,
+                mapped=self.mapped,
+                level=level,
+            ).load()
+            # Processed like this source, with the same player numbers
+            self._tracks[level].player_numbers = self.player_numbers
+        return self._tracks[level]
+
+    def _close_tracks(self) -> None:
+        for track in self._tracks.values():
+            track.close()
+        self._tracks = {}
+        self._lod_levels = None
+
+    def close(self) -> None:
+        """Closes the ticks file and drops its ticks from the cache."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._mapped_reader is not None:
+            self._mapped_reader.close()
+            self._mapped_reader = None
+        self._discard_cached()
+        self._close_tracks()
+
+    def _discard_cached(self) -> None:
+        self.cache.discard_where(lambda key: key[0] == self.data_filename)
+
+    def _read_chunk(self, chunk: int) -> list[bytes]:
+        """Reads all ticks of a chunk with a single seek and read."""
+        first = chunk * self.chunk_size
+        last = min(first + self.chunk_size, len(self.index)) - 1
+        offsets = self.index.offsets[first : last + 1]
+        lengths = self.index.lengths[first : last + 1]
+        if self.mapped:
+            return self._read_mapped(offsets, lengths)
+        start = offsets[0]
+        end = offsets[-1] + lengths[-1]
+        self._file.seek(start)
+        data = self._file.read(end - start)
+        ticks = [
+            data[offset - start : offset - start + length]
+            for offset, length in zip(offsets, lengths)
+        ]
+        if self._reader is not None:
+            ticks = [self._reader.frame(record) for record in ticks]
+        return ticks
+
+    def _read_mapped(self, offsets, lengths) -> list[bytes]:
+        """Reads ticks from the mapped file, copying each frame once."""
+        if self._mapped_reader is None:
+            self._mapped_reader = MappedReader(self.data_filename)
+        records = self._mapped_reader.slices(offsets, lengths)
+        if self._reader is not None:
+            return [self._reader.frame(record) for record in records]
+        # Frames are written as bytes (by tornado), so each is taken once
+        # and shared by every session through the cache
+        return [bytes(record) for record in records]
+
+    def _chunk(
+        self, chunk: int, subscription: Subscription | None = None
+    ) -> list[bytes | None]:
+        """Returns a chunk from the cache, reading it on a miss."""
+        key = (
+            self.data_filename,
+            self.chunk_size,
+            subscription.key if subscription else None,
+            chunk,
+        )
+        ticks = self.cache.get(key)
+        if ticks is not None:
+            return ticks
+        if subscription:
+            ticks = [subscription.frame(tick) for tick in self._chunk(chunk)]
+        else:
+            ticks = self._read_chunk(chunk)
+        self.cache.put(key, ticks)
+        return ticks
+
+    def read(
+        self,
+        entry: int,
+        count: int,
+        subscription: Subscription | None = None,
+    ) -> list[bytes | None]:
+        """Returns up to count encoded ticks starting from an entry.
+
+        With a subscription, the ticks are projected, and ticks filtered
+        out by it are None.
+        """
+        if subscription is not None and subscription.is_full():
+            subscription = None
+        if subscription is not None and self.player_numbers is not None:
+            if subscription not in self._interned:
+                self._interned[subscription] = subscription.interned(
+                    self.player_numbers
+                )
+            subscription = self._interned[subscription]
+        ticks = []
+        end = min(entry + count, len(self.index))
+        while entry < end:
+            chunk, position = divmod(entry, self.chunk_size)
+            chunk_ticks = self._chunk(chunk, subscription)[
+                position : position + end - entry
+            ]
+            ticks.extend(chunk_ticks)
+            entry += len(chunk_ticks)
+        return ticks
@@ -0,0 +1,205 @@
+"""Subscriptions selecting the parts of ticks a client receives.
+
+A client subscribes with e.g.
+
+    {"request": "subscribe", "fields": ["players", "kills"],
+     "player_fields": ["x", "y", "z"], "players": [76561198837117408],
+     "events_only": true}
+
+- "fields": top-level fields to send ("tick" is always sent)
+- "player_fields": player fields to send ("sid" is always sent)
+- "players": steam ids of the players to send (or their numbers, when
+  the players of the ticks are interned)
+- "events_only": send only ticks with a round start, kills, shooting or
+  a nade event
+
+Every option is optional, and {"request": "subscribe"} alone returns to
+whole ticks. Ticks are projected once per distinct subscription, as
+sessions read projected ticks through the shared TickSource cache.
+"""
+
+import json
+
+# Fields of a tick, in the order written by the parser
+TICK_FIELDS = (
+    "tick",
+    "round_time",
+    "round_start",
+    "switch",
+    "is_freeze",
+    "is_halftime",
+    "t",
+    "ct",
+    "t_wins",
+    "ct_wins",
+    "players",
+    "shooting",
+    "kills",
+    "nades",
+    "infernos",
+    "nade_event",
+    "bomb",
+)
+PLAYER_FIELDS = (
+    "sid",
+    "name",
+    "clan",
+    "team",
+    "hp",
+    "money",
+    "x",
+    "y",
+    "z",
+    "view_x",
+    "view_y",
+    "actv_itm",
+    "items",
+    "helmet",
+    "armor",
+    "kit",
+    "is_ducking",
+    "is_walking",
+    "is_standing",
+    "is_air",
+    "is_rld",
+    "kills",
+    "deaths",
+    "assists",
+    "dmg",
+    "adr",
+    "is_planting",
+    "is_defusing",
+)
+# A tick has events if any of these are set
+EVENT_FIELDS = ("round_start", "shooting", "kills", "nade_event")
+
+
+def _validate(values: list, allowed: tuple[str, ...], name: str) -> None:
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {name}: {unknown}")
+
+
+class Subscription:
+    """Compiled projection and filter of ticks for a subscription.
+
+    Subscriptions with the same options are equal, so their projected
+    ticks can be shared.
+    """
+
+    def __init__(
+        self,
+        fields: list[str] | None = None,
+        player_fields: list[str] | None = None,
+        players: list[int] | None = None,
+        events_only: bool = False,
+    ):
+        if fields is not None:
+            _validate(fields, TICK_FIELDS, "fields")
+            fields = tuple(
+                field
+                for field in TICK_FIELDS
+                if field == "tick" or field in fields
+            )
+        if player_fields is not None:
+            _validate(player_fields, PLAYER_FIELDS, "player fields")
+            player_fields = tuple(
+                field
+                for field in PLAYER_FIELDS
+                if field == "sid" or field in player_fields
+            )
+        self.fields: tuple[str, ...] | None = fields
+        self.player_fields: tuple[str, ...] | None = player_fields
+        self.players: frozenset[int] | None = (
+            None if players is None else frozenset(players)
+        )
+        self.events_only: bool = events_only
+        self.key: tuple = (
+            self.fields,
+            self.player_fields,
+            None if self.players is None else tuple(sorted(self.players)),
+            self.events_only,
+        )
+
+    @classmethod
+    def from_message(cls, data: dict) -> "Subscription":
+        """Compiles a subscription from a client's message."""
+        return cls(
+            data.get("fields"),
+            data.get("player_fields"),
+            data.get("players"),
+            bool(data.get("events_only", False)),
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Subscription) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def interned(self, numbers: dict[int, int]) -> "Subscription":
+        """Returns the subscription for ticks with interned players.
+
+        Steam ids are replaced by their numbers (steam id -> number),
+        other values are kept, as they can be numbers already.
+        """
+        if self.players is None:
+            return self
+        return Subscription(
+            self.fields,
+            self.player_fields,
+            [numbers.get(sid, sid) for sid in self.players],
+            self.events_only,
+        )
+
+    def is_full(self) -> bool:
+        """Checks if the subscription is for whole ticks."""
+        return self.key == (None, None, None, False)
+
+    def describe(self) -> dict:
+        """Returns the subscription as sent in the reply to a client."""
+        return {
+            "fields": self.fields,
+            "player_fields": self.player_fields,
+            "players": self.key[2],
+            "events_only": self.events_only,
+        }
+
+    def _player(self, player: dict) -> dict:
+        if self.player_fields is None:
+            return player
+        # Fields can be left out of post-processed ticks
+        return {
+            field: player[field]
+            for field in self.player_fields
+            if field in player
+        }
+
+    def apply(self, tick: dict) -> dict | None:
+        """Projects a tick, or returns None if it is filtered out."""
+        if self.events_only and not any(
+            tick.get(field) for field in EVENT_FIELDS
+        ):
+            return None
+        if self.fields is not None:
+            tick = {field: tick[field] for field in self.fields}
+        players = tick.get("players")
+        if players is not None and (
+            self.players is not None or self.player_fields is not None
+        ):
+            tick = {
+                **tick,
+                "players": [
+                    self._player(player)
+                    for player in players
+                    if self.players is None or player["sid"] in self.players
+                ],
+            }
+        return tick
+
+    def frame(self, tick_json: bytes) -> bytes | None:
+        """Projects an encoded tick into an encoded frame."""
+        tick = self.apply(json.loads(tick_json))
+        if tick is None:
+            return None
+        return json.dumps(tick, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,158 @@
+import asyncio
+import unittest
+from demodata_server.client_queue import ClientWriter, is_keyframe
+
+
+class TestClientWriter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.written = []
+        self.drops = 0
+        self.overflows = 0
+
+    async def write(self, frame):
+        self.written.append(frame)
+
+    def on_drop(self):
+        self.drops += 1
+
+    def on_overflow(self):
+        self.overflows += 1
+
+    def writer(self, policy: str) -> ClientWriter:
+        return ClientWriter(
+            self.write,
+            max_frames=3,
+            policy=policy,
+            on_drop=self.on_drop,
+            on_overflow=self.on_overflow,
+        )
+
+    def test_bounded(self):
+        # Arrange
+        writer = self.writer("skip")
+        # Act
+        for tick in range(10):
+            writer.put(b'{"tick":%d}' % tick)
+        # Assert
+        assert writer.stats()["queue_depth"] == 3
+        assert writer.stats()["dropped"] == 7
+
+    def test_keyframe_policy(self):
+        # Arrange
+        writer = self.writer("keyframe")
+        frames = [b'{"key":1}', b'{"delta":2}', b'{"key":3}', b'{"delta":4}']
+        expected_output = [b'{"key":3}', b'{"delta":4}']
+        # Act
+        for frame in frames:
+            writer.put(frame)
+        # Assert
+        assert list(writer.queue) == expected_output
+
+    def test_keyframe_policy_keeps_messages(self):
+        # Arrange
+        writer = self.writer("keyframe")
+        frames = [b'{"tick":1}', "EOF", b'{"tick":2}', b'{"tick":3}']
+        expected_output = ["EOF", b'{"tick":3}']
+        # Act
+        for frame in frames:
+            writer.put(frame)
+        # Assert
+        assert list(writer.queue) == expected_output
+
+    def test_messages_bounded(self):
+        # Arrange
+        writer = self.writer("keyframe")
+        writer.put_many([b'{"tick":1}', b'{"tick":2}', b'{"tick":3}'])
+        # Act
+        for _ in range(10):
+            writer.put("keyframe")
+            assert len(writer.queue) <= 3
+        # Assert
+        assert self.drops == 1
+        assert self.overflows == 1
+        assert writer.closed
+
+    def test_skip_keeps_messages(self):
+        # Arrange
+        writer = self.writer("skip")
+        writer.put_many([b'{"key":1}', b'{"delta":2}', b'{"delta":3}'])
+        # Act
+        writer.put("EOF")
+        writer.put("EOF")
+        writer.put(b'{"delta":4}')
+        writer.put(b'{"key":5}')
+        # Assert
+        assert self.drops == 1
+        assert list(writer.queue) == ["EOF", "EOF", b'{"key":5}']
+
+    def test_skip_until_keyframe(self):
+        # Arrange
+        writer = self.writer("skip")
+        frames = [b'{"key":1}', b'{"delta":2}', b'{"delta":3}']
+        for frame in frames:
+            writer.put(frame)
+        # Act
+        writer.put(b'{"delta":4}')
+        writer.queue.clear()  # Client catches up
+        writer.put(b'{"delta":5}')
+        writer.put(b'{"key":6}')
+        # Assert
+        assert self.drops == 1
+        assert list(writer.queue) == [b'{"key":6}']
+
+    def test_disconnect_policy(self):
+        # Arrange
+        writer = self.writer("disconnect")
+        # Act
+        for tick in range(4):
+            writer.put(b'{"tick":%d}' % tick)
+        # Assert
+        assert self.overflows == 1
+        assert writer.closed
+
+    def test_run_writes_in_order(self):
+        # Arrange
+        writer = self.writer("keyframe")
+        frames = [b'{"tick":1}', b'{"tick":2}', "EOF"]
+
+        async def run():
+            task = asyncio.ensure_future(writer.run())
+            writer.put_many(frames)
+            while writer.queue:
+                await asyncio.sleep(0)
+            writer.close()
+            await task
+
+        # Act
+        asyncio.run(run())
+        # Assert
+        assert self.written == frames
+        assert writer.stats()["sent"] == 3
+
+    def test_invalid_policy(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            ClientWriter(self.write, policy="block")
+
+    def test_drop_ticks(self):
+        # Arrange
+        writer = self.writer("keyframe")
+        writer.put_many([b'{"tick":1}', "EOF", b'{"tick":2}'])
+        # Act
+        writer.drop_ticks()
+        # Assert
+        assert list(writer.queue) == ["EOF"]
+
+    def test_is_keyframe_batch(self):
+        # Arrange
+        frames = [
+            b'[{"key":{"tick":1}},{"delta":{"tick":2}}]',
+            b'[{"delta":{"tick":3}}]',
+            b'[{"tick":4},{"tick":5}]',
+        ]
+        expected_output = [True, False, True]
+        # Act
+        output = [is_keyframe(frame) for frame in frames]
+        # Assert
+        assert output == expected_output
@@ -0,0 +1,63 @@
+import unittest
+from multiprocessing import Process
+from demodata_server.coordinator import LiveCoordinator
+
+
+def join_broadcast(coordinator: LiveCoordinator) -> None:
+    coordinator.add_client()
+    coordinator.live_tick(100, 199, 64, now=5.0)
+
+
+class TestLiveCoordinator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.coordinator = LiveCoordinator(clock=lambda: 10.0)
+
+    def test_live_tick_starts_at_first_tick(self):
+        # Arrange
+        expected_output = 100
+        # Act
+        output = self.coordinator.live_tick(100, 1000, 64)
+        # Assert
+        assert output == expected_output
+
+    def test_live_tick_follows_clock(self):
+        # Arrange
+        self.coordinator.live_tick(100, 1000, 64, now=10.0)
+        expected_output = 100 + 64 * 2 * 2
+        # Act
+        output = self.coordinator.live_tick(100, 1000, 64, 2.0, now=12.0)
+        # Assert
+        assert output == expected_output
+
+    def test_live_tick_loop_and_end(self):
+        # Arrange
+        self.coordinator.live_tick(100, 199, 64, now=10.0)
+        # Act
+        looped = self.coordinator.live_tick(100, 199, 64, 1.0, True, 12.0)
+        ended = self.coordinator.live_tick(100, 199, 64, 1.0, False, 12.0)
+        # Assert
+        assert looped == 100 + 128 % 100
+        assert ended == 199
+
+    def test_restarts_when_idle(self):
+        # Arrange
+        self.coordinator.add_client()
+        self.coordinator.live_tick(100, 199, 64, now=10.0)
+        self.coordinator.add_client(-1)
+        # Act
+        output = self.coordinator.live_tick(100, 199, 64, now=12.0)
+        # Assert
+        assert output == 100
+        assert self.coordinator.stats() == {"clients": 0, "started": True}
+
+    def test_shared_between_processes(self):
+        # Arrange
+        process = Process(target=join_broadcast, args=(self.coordinator,))
+        # Act
+        process.start()
+        process.join()
+        output = self.coordinator.live_tick(100, 199, 64, now=5.5)
+        # Assert
+        assert output == 132  # Started by the other process at 5.0
+        assert self.coordinator.stats() == {"clients": 1, "started": True}
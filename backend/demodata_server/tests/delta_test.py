@@ -0,0 +1,92 @@
+import copy
+import json
+import unittest
+from demodata_parser.tests.sample_ticks import sample_tick
+from demodata_server.delta import DeltaDecoder, DeltaEncoder, diff_ticks
+
+
+class TestDelta(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ticks = [sample_tick(tick) for tick in range(100, 110)]
+        second_player = copy.deepcopy(self.ticks[0]["players"][0])
+        second_player["sid"] = 76561198000000001
+        second_player["name"] = "khaN"
+        # Player joins, players swap order, player leaves, no players
+        for tick in self.ticks[2:6]:
+            tick["players"].append(copy.deepcopy(second_player))
+        self.ticks[4]["players"].reverse()
+        self.ticks[7]["players"] = None
+        # Nades and events
+        self.ticks[3]["nades"] = [
+            {"id": 1, "type": "Flashbang", "x": 1, "y": 2, "z": 3, "team": "T"}
+        ]
+        self.ticks[4]["nades"] = [
+            {"id": 1, "type": "Flashbang", "x": 5, "y": 2, "z": 3, "team": "T"}
+        ]
+        self.ticks[5]["kills"] = sample_tick(0, kills=True)["kills"]
+        self.ticks[6]["bomb"]["planted"] = True
+
+    def test_round_trip(self):
+        # Arrange
+        encoder = DeltaEncoder(keyframe_interval=4)
+        decoder = DeltaDecoder()
+        expected_output = self.ticks
+        # Act
+        output = [
+            decoder.apply(json.loads(json.dumps(encoder.encode(tick))))
+            for tick in self.ticks
+        ]
+        # Assert
+        assert output == expected_output
+
+    def test_keyframe_interval(self):
+        # Arrange
+        encoder = DeltaEncoder(keyframe_interval=4)
+        expected_output = [0, 4, 8]
+        # Act
+        output = [
+            number
+            for number, tick in enumerate(self.ticks)
+            if "key" in encoder.encode(tick)
+        ]
+        # Assert
+        assert output == expected_output
+
+    def test_reset_keyframe(self):
+        # Arrange
+        encoder = DeltaEncoder(keyframe_interval=64)
+        encoder.encode(self.ticks[0])
+        # Act
+        encoder.reset()
+        output = encoder.encode(self.ticks[1])
+        # Assert
+        assert "key" in output
+
+    def test_diff_changed_only(self):
+        # Arrange
+        expected_output = {
+            "tick": 101,
+            "round_time": 101 / 64,
+            "players": [{"sid": 76561198837117408, "x": -162.25}],
+        }
+        # Act
+        output = diff_ticks(self.ticks[0], self.ticks[1])
+        # Assert
+        assert output == expected_output
+
+    def test_delta_smaller(self):
+        # Arrange
+        encoder = DeltaEncoder(keyframe_interval=64)
+        # Act
+        delta_bytes = sum(
+            len(json.dumps(encoder.encode(tick))) for tick in self.ticks
+        )
+        full_bytes = sum(len(json.dumps(tick)) for tick in self.ticks)
+        # Assert
+        assert delta_bytes * 2 < full_bytes
+
+    def test_delta_before_keyframe(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            DeltaDecoder().apply({"delta": {"tick": 1}})
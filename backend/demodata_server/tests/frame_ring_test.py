@@ -0,0 +1,29 @@
+import unittest
+from demodata_server.frame_ring import FrameRing
+
+
+class TestFrameRing(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ring = FrameRing(3)
+        for tick in range(100, 104):
+            self.ring.append(tick, str(tick).encode())
+
+    def test_bounded(self):
+        # Act
+        output = len(self.ring)
+        # Assert
+        assert output == 3
+        assert self.ring.latest() == b"103"
+
+    def test_since(self):
+        # Act & Assert
+        assert self.ring.since(101) == [b"102", b"103"]
+        assert self.ring.since(103) == []
+
+    def test_since_gap(self):
+        # Act & Assert
+        assert self.ring.since(100) is None  # No longer kept
+        assert self.ring.since(104) is None  # Never sent
+        self.ring.clear()
+        assert self.ring.since(103) is None
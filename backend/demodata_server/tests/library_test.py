@@ -0,0 +1,125 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_server.library import DemoLibrary
+
+
+class TestDemoLibrary(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.demo_folder = Path(self.tmp_dir.name)
+        (self.demo_folder / "test_demos").mkdir()
+        for demo_id in ("first", "second", "test_demos/third"):
+            ticks_filename = write_ticks_file(
+                self.demo_folder / f"{demo_id}.json", [sample_tick(1)]
+            )
+            config_filename = ticks_filename.with_name(
+                f"{ticks_filename.stem}_config.json"
+            )
+            config = {
+                "tickrate": 64,
+                "total_ticks": 1,
+                "map_name": "de_mirage",
+            }
+            config_filename.write_text(json.dumps(config))
+        self.library = DemoLibrary(self.demo_folder, max_demos=2)
+
+    def tearDown(self) -> None:
+        for demo_id in self.library.loaded():
+            self.library._demos[demo_id].close()
+        self.tmp_dir.cleanup()
+
+    def test_demo_ids(self):
+        # Arrange
+        expected_output = ["first", "second", "test_demos/third"]
+        # Act
+        output = self.library.demo_ids()
+        # Assert
+        assert output == expected_output
+
+    def test_acquire_lazy(self):
+        # Arrange
+        expected_output = ["second"]
+        # Act
+        source = self.library.acquire("second")
+        output = self.library.loaded()
+        # Assert
+        assert output == expected_output
+        assert source.map_name == "de_mirage"
+
+    def test_acquire_shared(self):
+        # Arrange
+        first = self.library.acquire("first")
+        # Act
+        output = self.library.acquire("first")
+        # Assert
+        assert output is first
+        assert output.clients == 2
+
+    def test_evict_idle(self):
+        # Arrange
+        self.library.release(self.library.acquire("first"))
+        self.library.acquire("second")
+        expected_output = ["second", "test_demos/third"]
+        # Act
+        self.library.acquire("test_demos/third")
+        output = self.library.loaded()
+        # Assert
+        assert output == expected_output
+
+    def test_keep_busy(self):
+        # Arrange
+        self.library.acquire("first")
+        self.library.acquire("second")
+        expected_output = 3
+        # Act
+        self.library.acquire("test_demos/third")
+        output = len(self.library.loaded())
+        # Assert
+        assert output == expected_output
+
+    def test_reload_idle(self):
+        # Arrange
+        self.library.release(self.library.acquire("first"))
+        # Act
+        self.library.reload(self.demo_folder / "first.json")
+        # Assert
+        assert self.library.loaded() == []
+
+    def test_reload_busy(self):
+        # Arrange
+        source = self.library.acquire("first")
+        write_ticks_file(
+            self.demo_folder / "first.json", [sample_tick(1), sample_tick(2)]
+        )
+        # Act
+        self.library.reload(self.demo_folder / "first.json")
+        # Assert
+        assert self.library.loaded() == ["first"]
+        assert len(source) == 2
+
+    def test_prepare_index(self):
+        # Arrange
+        prepare = self.library.prepare("first")
+        # Act
+        asyncio.run(prepare)
+        source = self.library.acquire("first")
+        # Assert
+        assert len(source) == 1
+        assert self.library._indexes == {}
+
+    def test_prepare_unknown_demo(self):
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            asyncio.run(self.library.prepare("missing"))
+
+    def test_unknown_demo(self):
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.library.acquire("missing")
+        with self.assertRaises(KeyError):
+            self.library.acquire("../first")
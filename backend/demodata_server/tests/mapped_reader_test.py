@@ -0,0 +1,62 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.tick_index import TickIndex
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_server.mapped_reader import MappedReader
+
+
+class TestMappedReader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.index = TickIndex.build(self.ticks_filename)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_slices_are_frames(self):
+        # Arrange
+        reader = MappedReader(self.ticks_filename)
+        expected_output = self.ticks[2:5]
+        # Act
+        output = reader.slices(
+            self.index.offsets[2:5], self.index.lengths[2:5]
+        )
+        # Assert
+        assert all(isinstance(view, memoryview) for view in output)
+        assert [json.loads(bytes(view)) for view in output] == expected_output
+        del output
+        reader.close()
+
+    def test_remap_when_file_grows(self):
+        # Arrange
+        data = self.ticks_filename.read_bytes()
+        half = self.index.offsets[5]
+        self.ticks_filename.write_bytes(data[:half])
+        reader = MappedReader(self.ticks_filename)
+        first_size = len(reader)
+        with open(self.ticks_filename, "ab") as file:
+            file.write(data[half:])
+        # Act
+        output = reader.slices(self.index.offsets[8:], self.index.lengths[8:])
+        # Assert
+        assert first_size == half
+        assert [json.loads(bytes(view)) for view in output] == self.ticks[8:]
+        del output
+        reader.close()
+
+    def test_empty_file(self):
+        # Arrange
+        self.ticks_filename.write_bytes(b"")
+        # Act
+        reader = MappedReader(self.ticks_filename)
+        output = len(reader)
+        reader.close()
+        # Assert
+        assert output == 0
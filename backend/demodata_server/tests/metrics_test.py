@@ -0,0 +1,54 @@
+import unittest
+from demodata_server.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        # Arrange
+        counter = self.registry.counter("frames_total", "Frames")
+        self.registry.gauge("clients", "Clients", lambda: 3)
+        expected_output = (
+            "# HELP frames_total Frames\n"
+            "# TYPE frames_total counter\n"
+            "frames_total 2\n"
+            "# HELP clients Clients\n"
+            "# TYPE clients gauge\n"
+            "clients 3\n"
+        )
+        # Act
+        counter.inc()
+        counter.inc()
+        output = self.registry.render()
+        # Assert
+        assert output == expected_output
+
+    def test_histogram_buckets(self):
+        # Arrange
+        histogram = self.registry.histogram(
+            "parse_seconds", "Parse", (1.0, 5.0), ("stage",)
+        )
+        # Act
+        histogram.observe(0.5, "index")
+        histogram.observe(2.0, "index")
+        histogram.observe(7.0, "index")
+        output = self.registry.render().splitlines()
+        # Assert
+        assert 'parse_seconds_bucket{stage="index",le="1"} 1' in output
+        assert 'parse_seconds_bucket{stage="index",le="5"} 2' in output
+        assert 'parse_seconds_bucket{stage="index",le="+Inf"} 3' in output
+        assert 'parse_seconds_sum{stage="index"} 9.5' in output
+        assert 'parse_seconds_count{stage="index"} 3' in output
+
+    def test_histogram_time(self):
+        # Arrange
+        histogram = self.registry.histogram("update_seconds", "Update")
+        # Act
+        with histogram.time():
+            pass
+        output = histogram.count()
+        # Assert
+        assert output == 1
@@ -0,0 +1,106 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.packed import PackedWriter
+from demodata_parser.tick_index import TickIndex
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_server.packed_reader import PackedReader
+from demodata_server.source import TickSource
+
+
+class TestPackedReader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [
+            sample_tick(100, round_start=True),
+            sample_tick(101, kills=True),
+            sample_tick(102),
+        ]
+        self.ticks[1]["shooting"] = [76561198837117408]
+        self.ticks[1]["nades"] = [
+            {
+                "id": 7556250935960765521,
+                "type": "Smoke Grenade",
+                "x": -1165.15625,
+                "y": -632.09375,
+                "z": -165.96875,
+                "team": "T",
+            }
+        ]
+        self.ticks[1]["infernos"] = [
+            {"id": 2093783464307243804, "fires": [{"x": 1.5, "y": 2, "z": 3}]},
+            {"id": 1, "fires": None},
+        ]
+        self.ticks[1]["nade_event"] = {
+            "type": "HE Grenade",
+            "x": 292.2667541503906,
+            "y": -388.44927978515625,
+            "z": -66.32966613769531,
+        }
+        self.ticks[0]["players"][0]["z"] = -160
+        self.ticks[0]["bomb"]["x"] = 392
+        self.ticks[2]["round_time"] = 2
+        self.ticks[2]["players"][0]["items"] = None
+        self.ticks[2]["players"][0]["name"] = "Ünïcode"
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.packed_filename = PackedWriter().write(self.ticks_filename)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_decode_equal(self):
+        # Arrange
+        reader = PackedReader(self.packed_filename)
+        index = TickIndex.read(TickIndex.index_filename(self.packed_filename))
+        expected_output = self.ticks
+        # Act
+        output = []
+        with open(self.packed_filename, "rb") as file:
+            for entry in range(len(index)):
+                offset, length = index.span(entry)
+                file.seek(offset)
+                output.append(reader.decode(file.read(length)))
+        # Assert
+        assert output == expected_output
+
+    def test_source_frames(self):
+        # Arrange
+        source = TickSource(self.ticks_filename, packed=True).load()
+        expected_output = self.ticks
+        # Act
+        output = [json.loads(frame) for frame in source.read(0, 3)]
+        source.close()
+        # Assert
+        assert output == expected_output
+
+    def test_source_frames_unchanged(self):
+        # Arrange
+        source = TickSource(self.ticks_filename, packed=True).load()
+        expected_output = [
+            json.dumps(tick, separators=(",", ":")).encode("utf-8")
+            for tick in self.ticks
+        ]
+        # Act
+        output = source.read(0, 3)
+        source.close()
+        # Assert
+        assert output == expected_output
+
+    def test_not_packed_file(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            PackedReader(self.ticks_filename)
+
+    def test_source_frames_mapped(self):
+        # Arrange
+        source = TickSource(self.ticks_filename, packed=True, mapped=True)
+        expected_output = self.ticks
+        # Act
+        output = [json.loads(frame) for frame in source.load().read(0, 3)]
+        source.close()
+        # Assert
+        assert output == expected_output
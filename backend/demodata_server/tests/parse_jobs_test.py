@@ -0,0 +1,104 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_server.parse_jobs import ParseJobs
+
+
+class TestParseJobs(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.demo_folder = Path(self.tmp_dir.name)
+        # Parsed before, so the parse only writes the sidecars
+        (self.demo_folder / "parsed.dem").touch()
+        write_ticks_file(self.demo_folder / "parsed.json", [sample_tick(1)])
+        self.timings = []
+        self.written = []
+        self.parse_jobs = ParseJobs(
+            self.demo_folder,
+            workers=1,
+            on_parsed=self.timings.append,
+            on_written=self.written.append,
+        )
+
+    def tearDown(self) -> None:
+        self.parse_jobs.close()
+        self.tmp_dir.cleanup()
+
+    def run_jobs(
+        self, *demos: str, overwrite: bool = False
+    ) -> tuple[list[dict], list[dict]]:
+        """Submits demos, returns the jobs when queued and when done.
+
+        With overwrite, the last demo is submitted to overwrite.
+        """
+
+        async def run():
+            queued = [self.parse_jobs.submit(demo) for demo in demos[:-1]]
+            queued.append(self.parse_jobs.submit(demos[-1], overwrite))
+            while self.parse_jobs.unfinished():
+                await asyncio.sleep(0.01)
+            return queued, self.parse_jobs.list_jobs()
+
+        return asyncio.run(asyncio.wait_for(run(), 30))
+
+    def test_submit_parsed(self):
+        # Act
+        queued, done = self.run_jobs("parsed.dem")
+        # Assert
+        assert queued[0]["status"] in ("queued", "parsing")
+        assert done[0]["status"] == "parsed"
+        assert done[0]["seconds"] > 0
+        assert "index" in self.timings[0]
+        assert self.written == [self.demo_folder / "parsed.dem"]
+
+    def test_submit_deduplicated(self):
+        # Act
+        queued, done = self.run_jobs("parsed.dem", "./parsed.dem")
+        # Assert
+        assert queued[0]["id"] == queued[1]["id"]
+        assert len(done) == 1
+
+    def test_submit_overwrite_deduplicated(self):
+        # Act
+        queued, done = self.run_jobs(
+            "parsed.dem", "parsed.dem", overwrite=True
+        )
+        # Assert
+        assert queued[1]["overwrite"]
+        assert done[-1]["id"] == queued[1]["id"]
+        assert done[-1]["status"] == "failed"  # Not a real demo
+        assert self.parse_jobs.unfinished() == 0
+        if queued[0]["id"] == queued[1]["id"]:  # Upgraded before started
+            assert len(done) == 1
+        else:  # Parsed after the first job
+            assert [job["status"] for job in done] == ["parsed", "failed"]
+
+    def test_submit_failed(self):
+        # Arrange
+        (self.demo_folder / "new.dem").touch()
+        # Act
+        _, done = self.run_jobs("new.dem")
+        # Assert
+        assert done[0]["status"] == "failed"
+        assert self.parse_jobs.stats()["failed"] == 1
+
+    def test_demo_filename_invalid(self):
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.parse_jobs.demo_filename("missing.dem")
+        with self.assertRaises(KeyError):
+            self.parse_jobs.demo_filename("../outside.dem")
+        with self.assertRaises(ValueError):
+            self.parse_jobs.demo_filename("parsed.json")
+
+    def test_forget_finished(self):
+        # Arrange
+        self.parse_jobs.max_finished = 1
+        # Act
+        self.run_jobs("parsed.dem")
+        _, done = self.run_jobs("parsed.dem")
+        # Assert
+        assert [job["id"] for job in done] == ["2"]
@@ -0,0 +1,37 @@
+import time
+import unittest
+from demodata_server.profiler import SamplingProfiler
+
+
+def busy(seconds: float) -> int:
+    total = 0
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        total += 1
+    return total
+
+
+@unittest.skipUnless(SamplingProfiler.available(), "needs signal.setitimer")
+class TestSamplingProfiler(unittest.TestCase):
+
+    def test_samples_running_code(self):
+        # Arrange
+        profiler = SamplingProfiler(interval=0.001)
+        # Act
+        profiler.start()
+        busy(0.2)
+        samples = profiler.stop()
+        output = profiler.collapsed()
+        # Assert
+        assert samples
+        assert "profiler_test.py:busy" in output
+        assert not profiler.running
+
+    def test_start_twice(self):
+        # Arrange
+        profiler = SamplingProfiler()
+        profiler.start()
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            profiler.start()
+        profiler.stop()
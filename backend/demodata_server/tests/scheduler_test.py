@@ -0,0 +1,77 @@
+import unittest
+from demodata_server.scheduler import PlaybackClock
+
+
+class TestPlaybackClock(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.now = 100.0
+        self.clock = PlaybackClock(64, clock=lambda: self.now)
+
+    def test_due_by_tick_number(self):
+        # Arrange
+        self.clock.anchor(1000)
+        self.now += 0.5
+        expected_output = 1032
+        # Act
+        output = self.clock.due_tick()
+        # Assert
+        assert output == expected_output
+
+    def test_no_drift(self):
+        # Arrange
+        self.clock.anchor(0)
+        # Act
+        for _ in range(1000):
+            self.now += 0.0173  # Late and uneven timer callbacks
+            self.clock.due_tick()
+        output = self.clock.due_tick()
+        # Assert
+        self.assertAlmostEqual(output, 17.3 * 64)
+
+    def test_is_due(self):
+        # Arrange
+        self.clock.anchor(0)
+        self.now += 0.25
+        # Act
+        output = [self.clock.is_due(16), self.clock.is_due(17)]
+        # Assert
+        assert output == [True, False]
+
+    def test_speed(self):
+        # Arrange
+        self.clock.anchor(0)
+        self.now += 1
+        # Act
+        self.clock.set_speed(0.25, 64)
+        self.now += 1
+        output = self.clock.due_tick()
+        # Assert
+        assert output == 80
+
+    def test_invalid_speed(self):
+        # Act & Assert
+        for speed in (0.1, 8.5):
+            with self.assertRaises(ValueError):
+                self.clock.set_speed(speed, 0)
+
+    def test_resync_after_stall(self):
+        # Arrange
+        self.clock.anchor(0)
+        self.now += 5
+        # Act
+        output = self.clock.is_due(16)
+        # Assert
+        assert output
+        assert self.clock.resyncs == 1
+        assert self.clock.time_of(16) == self.now
+
+    def test_pacing_error(self):
+        # Arrange
+        self.clock.anchor(0)
+        self.now += 0.5
+        # Act
+        output = self.clock.record(16)
+        # Assert
+        assert output == 0.25
+        assert self.clock.stats()["max_pacing_error_ms"] == 250.0
@@ -1,6 +1,11 @@
+import json
+import asyncio
+import tempfile
 import unittest
 from pathlib import Path
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
 from demodata_server import DemodataServer
+from demodata_server.coordinator import LiveCoordinator
 
 
 class TestDemodataServer(unittest.TestCase):
@@ -46,3 +51,179 @@ class TestDemodataServer(unittest.TestCase):
         output = len(self.demodata_server.connected_clients)
         # Assert
         assert output == expected_output
+
+    def test_playback_commands(self):
+        # Arrange
+        tmp_dir = tempfile.TemporaryDirectory()
+        ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.demodata_server.ticks_file(
+            write_ticks_file(Path(tmp_dir.name) / "demo.json", ticks)
+        )
+        self.demodata_server._read_source()
+        client = object()
+        commands = [
+            {"request": "pause"},
+            {"request": "rate", "rate": 2},
+            {"request": "seek", "tick": 105},
+            {"request": "lod", "level": 4},  # No tracks
+        ]
+        expected_output = {
+            "tick": 105,
+            "paused": True,
+            "rate": 2.0,
+            "lod": 1,
+        }
+
+        async def send_commands():
+            self.demodata_server._add_session(
+                client, self.demodata_server.source
+            )
+            for command in commands:
+                await self.demodata_server.on_message(
+                    client, json.dumps(command)
+                )
+            replies = list(self.demodata_server.writers[client].queue)
+            self.demodata_server._close_session(client)
+            return replies
+
+        # Act
+        replies = asyncio.run(send_commands())
+        output = json.loads(replies[-1])["state"]
+        self.demodata_server.source.close()
+        tmp_dir.cleanup()
+        # Assert
+        assert len(replies) == len(commands)
+        assert output == expected_output
+
+    def test_reconnect(self):
+        # Arrange
+        tmp_dir = tempfile.TemporaryDirectory()
+        ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.demodata_server.ticks_file(
+            write_ticks_file(Path(tmp_dir.name) / "demo.json", ticks)
+        )
+        self.demodata_server._read_source()
+        self.demodata_server.resume_seconds = 30
+        first, second = object(), object()
+
+        async def reconnect(with_token: bool) -> tuple[list, str]:
+            source = self.demodata_server.source
+            session = self.demodata_server._add_session(first, source)
+            session.next_burst(4)  # Ticks 100-103, 102 received last
+            self.demodata_server._close_session(first)
+            self.demodata_server._add_session(second, source)
+            token = session.token if with_token else "expired"
+            await self.demodata_server.on_message(
+                second,
+                json.dumps(
+                    {"request": "reconnect", "token": token, "tick": 102}
+                ),
+            )
+            replies = list(self.demodata_server.writers[second].queue)
+            self.demodata_server.resume_seconds = 0
+            self.demodata_server._close_session(second)
+            self.demodata_server.resume_seconds = 30
+            return [json.loads(reply) for reply in replies], token
+
+        # Act
+        resumed, token = asyncio.run(reconnect(True))
+        detached = len(self.demodata_server.detached)
+        continued, _ = asyncio.run(reconnect(False))
+        tmp_dir.cleanup()
+        # Assert
+        assert resumed[0]["tick"] == 103  # Missed frame from the ring
+        assert resumed[1]["resumed"] is True
+        assert resumed[1]["token"] == token
+        assert resumed[1]["state"]["tick"] == 104
+        assert detached == 0
+        assert continued == [
+            {
+                "resumed": False,
+                "token": continued[0]["token"],
+                "state": {
+                    "tick": 103,
+                    "paused": False,
+                    "rate": 1.0,
+                    "lod": 1,
+                },
+            }
+        ]
+
+    def test_join_live_broadcast(self):
+        # Arrange
+        tmp_dir = tempfile.TemporaryDirectory()
+        ticks = [sample_tick(tick) for tick in range(100, 200)]
+        self.demodata_server.ticks_file(
+            write_ticks_file(Path(tmp_dir.name) / "demo.json", ticks)
+        )
+        self.demodata_server._read_source()
+        coordinator = LiveCoordinator(clock=lambda: 10.0)
+        coordinator.live_tick(100, 199, 64, now=9.5)  # Another worker
+        self.demodata_server.coordinator = coordinator
+        client = object()
+
+        async def join():
+            session = self.demodata_server._add_session(
+                client, self.demodata_server.source
+            )
+            clients = coordinator.stats()["clients"]
+            self.demodata_server._close_session(client)
+            return session.current_tick(), clients
+
+        # Act
+        output, clients = asyncio.run(join())
+        self.demodata_server.source.close()
+        tmp_dir.cleanup()
+        # Assert
+        assert output == 132
+        assert clients == 1
+        assert coordinator.stats()["clients"] == 0
+
+    def test_routes_metrics_and_profiler_off(self):
+        # Arrange
+        self.demodata_server.srv_endpoint = self.srv_endpoint
+        # Act
+        output = [route[0] for route in self.demodata_server._routes()]
+        self.demodata_server.profiler_route = True
+        profiler_on = [route[0] for route in self.demodata_server._routes()]
+        # Assert
+        assert "/metrics" not in output and "/profile" not in output
+        assert "/profile" in profiler_on
+
+    def test_metrics(self):
+        # Arrange
+        self.demodata_server.record_parse_timings({"parse": 2.0})
+        self.demodata_server.frames_sent.inc()
+        # Act
+        output = self.demodata_server.metrics.render().splitlines()
+        # Assert
+        assert "eeict_frames_sent_total 1" in output
+        assert "eeict_clients 0" in output
+        assert 'eeict_parse_seconds_count{stage="parse"} 1' in output
+
+    def test_bytes_sent_utf8(self):
+        # Arrange
+        class Client:
+            async def write_message(self, message):
+                pass
+
+        client = Client()
+        self.demodata_server.connected_clients.add(client)
+        # Act
+        asyncio.run(self.demodata_server._transmit_ticks(client, '"Ünï"'))
+        asyncio.run(self.demodata_server._transmit_ticks(client, b"{}"))
+        output = self.demodata_server.metrics.render().splitlines()
+        # Assert
+        assert "eeict_bytes_sent_total 9" in output
+
+    def test_compression_options(self):
+        # Arrange
+        expected_output = {"compression_level": 1, "mem_level": 4}
+        # Act
+        disabled = self.demodata_server.compression_options()
+        self.demodata_server.compression_level = 1
+        self.demodata_server.compression_mem_level = 4
+        output = self.demodata_server.compression_options()
+        # Assert
+        assert disabled is None
+        assert output == expected_output
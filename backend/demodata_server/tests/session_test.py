@@ -0,0 +1,274 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.lod import write_tracks
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_parser.tick_index import parsing_filename
+from demodata_server.delta import DeltaDecoder
+from demodata_server.session import PlaybackSession
+from demodata_server.source import TickSource
+from demodata_server.subscription import Subscription
+
+
+class TestPlaybackSession(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.source = TickSource(self.ticks_filename).load()
+        self.burst_size = 4
+
+    def tearDown(self) -> None:
+        self.source.close()
+        self.tmp_dir.cleanup()
+
+    def test_sessions_independent(self):
+        # Arrange
+        first = PlaybackSession(self.source, self.burst_size)
+        second = PlaybackSession(self.source, self.burst_size)
+        # Act
+        first.next_burst()
+        first.next_burst()
+        output = second.next_burst()
+        # Assert
+        assert first.current_tick() == 108
+        assert [json.loads(tick) for tick in output] == self.ticks[:4]
+
+    def test_batch(self):
+        # Arrange
+        session = PlaybackSession(self.source, self.burst_size, batch=True)
+        # Act
+        output = session.next_burst()
+        # Assert
+        assert len(output) == 1
+        assert json.loads(output[0]) == self.ticks[:4]
+
+    def test_advance_rate(self):
+        # Arrange
+        now = [0.0]
+        session = PlaybackSession(
+            self.source, self.burst_size, clock=lambda: now[0]
+        )
+        session.set_rate(2.0)
+        # Act
+        first_burst = session.advance()
+        output = []
+        for _ in range(2):
+            now[0] += 2 / 128  # Two ticks at 2x speed
+            output.append(len(session.advance()))
+        # Assert
+        assert len(first_burst) == self.burst_size
+        assert output == [0, self.burst_size]
+
+    def test_advance_catch_up(self):
+        # Arrange
+        now = [0.0]
+        session = PlaybackSession(
+            self.source, self.burst_size, clock=lambda: now[0]
+        )
+        session.advance()
+        # Act
+        now[0] += 8 / 64  # Stalled past the next two bursts
+        output = session.advance()
+        # Assert
+        assert len(output) == len(self.ticks) - self.burst_size
+
+    def test_play_nth(self):
+        # Arrange
+        self.ticks[3] = sample_tick(103, kills=True)
+        write_ticks_file(self.ticks_filename, self.ticks)
+        source = TickSource(self.ticks_filename).load()
+        session = PlaybackSession(source, self.burst_size, play_nth=2)
+        expected_output = [100, 102, 103, 104, 106]
+        # Act
+        output = [json.loads(tick)["tick"] for tick in session.next_burst()]
+        source.close()
+        # Assert
+        assert output == expected_output
+
+    def test_advance_paused(self):
+        # Arrange
+        session = PlaybackSession(self.source, self.burst_size)
+        session.pause()
+        # Act
+        output = session.advance()
+        # Assert
+        assert output == []
+
+    def test_end_of_file(self):
+        # Arrange
+        session = PlaybackSession(self.source, len(self.ticks))
+        # Act
+        session.next_burst()
+        # Assert
+        assert session.ended
+
+    def test_loop_mode(self):
+        # Arrange
+        session = PlaybackSession(self.source, len(self.ticks), True)
+        # Act
+        session.next_burst()
+        # Assert
+        assert not session.ended
+        assert session.current_tick() == 100
+
+    def test_seek(self):
+        # Arrange
+        session = PlaybackSession(self.source, 2)
+        expected_output = self.ticks[5:7]
+        # Act
+        tick = session.seek(105)
+        output = session.next_burst()
+        # Assert
+        assert tick == 105
+        assert [json.loads(frame) for frame in output] == expected_output
+
+    def test_seek_past_end(self):
+        # Arrange
+        session = PlaybackSession(self.source, 2)
+        expected_output = -1
+        # Act
+        output = session.seek(500)
+        # Assert
+        assert output == expected_output
+
+    def test_invalid_rate(self):
+        # Arrange
+        session = PlaybackSession(self.source)
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            session.set_rate(0)
+        with self.assertRaises(ValueError):
+            session.set_rate(16)
+
+    def test_delta_mode(self):
+        # Arrange
+        session = PlaybackSession(self.source, len(self.ticks))
+        session.set_mode("delta", keyframe_interval=4)
+        decoder = DeltaDecoder()
+        expected_output = self.ticks
+        # Act
+        output = [
+            decoder.apply(json.loads(frame)) for frame in session.next_burst()
+        ]
+        # Assert
+        assert output == expected_output
+
+    def test_invalid_mode(self):
+        # Arrange
+        session = PlaybackSession(self.source)
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            session.set_mode("compressed")
+
+    def test_wait_for_growing_file(self):
+        # Arrange
+        marker = parsing_filename(self.ticks_filename)
+        marker.touch()
+        source = TickSource(self.ticks_filename, growing=True).load()
+        session = PlaybackSession(source, len(self.ticks))
+        # Act
+        first_burst = session.advance()
+        waiting = session.advance()
+        waiting_ended = session.ended
+        marker.unlink()
+        source.refresh()
+        output = session.advance()
+        source.close()
+        # Assert
+        assert len(first_burst) == len(self.ticks)
+        assert waiting == [] and not waiting_ended
+        assert output == [] and session.ended
+
+    def test_subscribe_events_only(self):
+        # Arrange
+        self.ticks[3] = sample_tick(103, kills=True)
+        write_ticks_file(self.ticks_filename, self.ticks)
+        source = TickSource(self.ticks_filename).load()
+        session = PlaybackSession(source, len(self.ticks))
+        session.subscribe(Subscription(fields=["kills"], events_only=True))
+        expected_output = [{"tick": 103, "kills": self.ticks[3]["kills"]}]
+        # Act
+        output = [json.loads(tick) for tick in session.next_burst()]
+        source.close()
+        # Assert
+        assert output == expected_output
+
+    def test_seek_round(self):
+        # Arrange
+        self.ticks[2] = sample_tick(102, round_start=True)
+        self.ticks[6] = sample_tick(106, round_start=True)
+        write_ticks_file(self.ticks_filename, self.ticks)
+        source = TickSource(self.ticks_filename).load()
+        session = PlaybackSession(source, 2)
+        # Act
+        output = [session.seek_round(2), session.seek_round(3)]
+        source.close()
+        # Assert
+        assert output == [106, -1]
+        assert session.current_tick() == 106
+
+    def test_rate_selects_track(self):
+        # Arrange
+        write_tracks(self.ticks_filename, [2, 4])
+        source = TickSource(self.ticks_filename).load()
+        session = PlaybackSession(source, 2)
+        session.next_burst()
+        # Act
+        session.set_rate(4.0)
+        output = [json.loads(tick)["tick"] for tick in session.next_burst()]
+        # Assert
+        assert session.state()["lod"] == 4
+        assert output == [104, 108]
+        session.set_lod(1)
+        assert session.set_rate(8.0) == 8.0
+        assert session.current_tick() == 109
+        source.close()
+
+    def test_adapt_lod(self):
+        # Arrange
+        write_tracks(self.ticks_filename, [2, 4])
+        source = TickSource(self.ticks_filename).load()
+        session = PlaybackSession(source, 2)
+        # Act
+        output = [
+            session.adapt_lod(0.75, now=10.0),
+            session.adapt_lod(0.75, now=10.5),  # Held
+            session.adapt_lod(0.75, now=11.0),
+            session.adapt_lod(0.75, now=12.0),  # Highest level
+            session.adapt_lod(0.0, now=13.0),
+        ]
+        source.close()
+        # Assert
+        assert output == [2, 2, 4, 4, 2]
+
+    def test_resume_frames(self):
+        # Arrange
+        session = PlaybackSession(self.source, self.burst_size, ring_size=4)
+        session.next_burst()
+        session.next_burst()
+        # Act
+        missed = session.resume_frames(105)
+        gap = session.resume_frames(102)  # No longer in the ring
+        # Assert
+        assert [json.loads(tick)["tick"] for tick in missed] == [106, 107]
+        assert [json.loads(tick)["tick"] for tick in gap] == [107]
+        assert session.current_tick() == 108
+
+    def test_resume_frames_delta_snapshot(self):
+        # Arrange
+        session = PlaybackSession(self.source, self.burst_size, ring_size=2)
+        session.set_mode("delta")
+        decoder = DeltaDecoder()
+        session.next_burst()
+        # Act
+        snapshot = session.resume_frames(100)
+        for tick in snapshot + session.next_burst():
+            output = decoder.apply(json.loads(tick))
+        # Assert
+        assert "key" in json.loads(snapshot[0])
+        assert output == self.ticks[7]
@@ -0,0 +1,275 @@
+import json
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from demodata_parser.lod import write_tracks
+from demodata_parser.postprocess import Pipeline
+from demodata_parser.tick_index import TickIndex, parsing_filename
+from demodata_parser.timeline import timeline_filename
+from demodata_parser.tests.sample_ticks import sample_tick, write_ticks_file
+from demodata_server.source import TickSource
+from demodata_server.subscription import Subscription
+from demodata_server.tick_cache import TickCache
+
+
+class TestTickSource(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ticks = [sample_tick(tick) for tick in range(100, 110)]
+        self.ticks_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "demo.json", self.ticks
+        )
+        self.cache = TickCache()
+        self.source = TickSource(
+            self.ticks_filename, chunk_size=4, cache=self.cache
+        )
+
+    def tearDown(self) -> None:
+        self.source.close()
+        self.tmp_dir.cleanup()
+
+    def test_load_without_index(self):
+        # Arrange
+        expected_output = len(self.ticks)
+        # Act
+        output = len(self.source.load())
+        # Assert
+        assert output == expected_output
+
+    def test_load_with_index(self):
+        # Arrange
+        index_filename = TickIndex.index_filename(self.ticks_filename)
+        TickIndex.build(self.ticks_filename).write(index_filename)
+        expected_output = len(self.ticks)
+        # Act
+        output = len(self.source.load())
+        # Assert
+        assert output == expected_output
+
+    def test_read_raw_frames(self):
+        # Arrange
+        self.source.load()
+        expected_output = [
+            json.dumps(tick, separators=(",", ":")).encode("utf-8")
+            for tick in self.ticks[3:9]
+        ]
+        # Act
+        output = self.source.read(3, 6)
+        # Assert
+        assert output == expected_output
+
+    def test_read_pretty_printed(self):
+        # Arrange
+        with open(self.ticks_filename, "w") as f:
+            json.dump({"ticks": self.ticks}, f, indent=2)
+        self.source.load()
+        expected_output = self.ticks[3:9]
+        # Act
+        output = [json.loads(frame) for frame in self.source.read(3, 6)]
+        # Assert
+        assert output == expected_output
+        assert self.source.data_filename.name == "demo_lines.json"
+
+    def test_read_past_end(self):
+        # Arrange
+        self.source.load()
+        expected_output = 2
+        # Act
+        output = self.source.read(8, 16)
+        # Assert
+        assert len(output) == expected_output
+
+    def test_cache_bounded(self):
+        # Arrange
+        self.source.load()
+        self.cache.max_bytes = self.cache._size(self.source.read(0, 8))
+        self.cache.clear()
+        # Act
+        self.source.read(0, len(self.ticks))
+        output = self.cache.stats()
+        # Assert
+        assert output["bytes"] <= self.cache.max_bytes
+        assert output["chunks"] == 2
+        assert output["evictions"] == 1
+
+    def test_cache_shared(self):
+        # Arrange
+        self.source.load()
+        other = TickSource(self.ticks_filename, cache=self.cache).load()
+        other_filename = write_ticks_file(
+            Path(self.tmp_dir.name) / "other.json", self.ticks
+        )
+        third = TickSource(other_filename, cache=self.cache).load()
+        # Act
+        self.source.read(0, len(self.ticks))
+        first = other.read(0, len(self.ticks))
+        second = other.read(0, len(self.ticks))
+        third.read(0, len(self.ticks))
+        third.close()
+        other.close()
+        output = self.cache.stats()
+        # Assert
+        assert first == second
+        assert output["hits"] == 1  # The 2nd read of the 2nd source
+        assert output["chunks"] == 0  # Dropped when the demo was closed
+
+    def test_growing_file(self):
+        # Arrange
+        lines = [
+            json.dumps(tick, separators=(",", ":")).encode("utf-8")
+            for tick in self.ticks
+        ]
+        marker = parsing_filename(self.ticks_filename)
+        marker.touch()
+        self.ticks_filename.write_bytes(
+            b'{"ticks": [\n' + b",\n".join(lines[:5])
+        )
+        source = TickSource(self.ticks_filename, growing=True)
+        # Act
+        source.load()
+        first_count = len(source)
+        first_ticks = source.read(0, 10)
+        with open(self.ticks_filename, "ab") as file:
+            file.write(b",\n" + b",\n".join(lines[5:]) + b"\n]}")
+        marker.unlink()
+        source.refresh()
+        output = source.read(0, 10)
+        source.close()
+        # Assert
+        assert first_count == 4  # The last line may still be written
+        assert first_ticks == lines[:4]
+        assert source.complete
+        assert output == lines
+
+    def test_read_mapped(self):
+        # Arrange
+        self.source.load()
+        source = TickSource(self.ticks_filename, mapped=True).load()
+        expected_output = self.source.read(0, len(self.ticks))
+        # Act
+        output = source.read(0, len(self.ticks))
+        source.close()
+        # Assert
+        assert output == expected_output
+        assert all(isinstance(tick, bytes) for tick in output)
+
+    def test_read_processed(self):
+        # Arrange
+        Pipeline.from_names(["intern_players"]).write(self.ticks_filename)
+        source = TickSource(self.ticks_filename, processed=True).load()
+        # Act
+        output = json.loads(source.read(0, 1)[0])
+        source.close()
+        # Assert
+        assert output["players"][0]["sid"] == 0
+
+    def test_subscribe_interned_players(self):
+        # Arrange
+        sid = self.ticks[0]["players"][0]["sid"]
+        Pipeline.from_names(["intern_players"]).write(self.ticks_filename)
+        source = TickSource(self.ticks_filename, processed=True).load()
+        # Act
+        by_sid = json.loads(source.read(0, 1, Subscription(players=[sid]))[0])
+        by_number = json.loads(source.read(0, 1, Subscription(players=[0]))[0])
+        other = json.loads(source.read(0, 1, Subscription(players=[1]))[0])
+        source.close()
+        # Assert
+        assert [player["sid"] for player in by_sid["players"]] == [0]
+        assert by_number == by_sid
+        assert other["players"] == []
+
+    def test_read_processed_missing(self):
+        # Arrange
+        source = TickSource(self.ticks_filename, processed=True).load()
+        expected_output = self.ticks[0]
+        # Act
+        output = json.loads(source.read(0, 1)[0])
+        source.close()
+        # Assert
+        assert output == expected_output
+
+    def test_track(self):
+        # Arrange
+        write_tracks(self.ticks_filename, [2, 4])
+        self.source.load()
+        # Act
+        output = self.source.track(3)
+        self.source.read(0, 4)
+        output.read(0, 4)
+        # Assert
+        assert output.level == 2
+        assert list(output.index.ticks) == [100, 102, 104, 106, 108, 109]
+        assert self.source.track(1) is self.source
+        assert len(self.cache) == 2  # A chunk of each track
+        self.source.close()
+        assert len(self.cache) == 0
+
+    def test_reload_keeps_tracks(self):
+        # Arrange
+        write_tracks(self.ticks_filename, [2])
+        self.source.load()
+        track = self.source.track(2)
+        track.read(0, 4)
+        ticks = [sample_tick(tick) for tick in range(200, 220)]
+        write_ticks_file(self.ticks_filename, ticks)
+        write_tracks(self.ticks_filename, [2])
+        # Act
+        self.source.reload()
+        output = track.read(0, 2)
+        # Assert
+        assert len(self.source) == 20
+        assert self.source.track(2) is track
+        assert [json.loads(frame)["tick"] for frame in output] == [200, 202]
+
+    def test_track_processed_differently(self):
+        # Arrange
+        write_tracks(self.ticks_filename, [2])
+        Pipeline.from_names(["flip_yz"]).write(self.ticks_filename)
+        source = TickSource(self.ticks_filename, processed=True).load()
+        # Act
+        output = source.track(2)
+        source.close()
+        # Assert
+        assert output is source
+
+    def test_timeline_built_once(self):
+        # Arrange
+        self.source.load()
+
+        async def read_twice():
+            return await asyncio.gather(
+                self.source.timeline(), self.source.timeline()
+            )
+
+        # Act
+        first, second = asyncio.run(read_twice())
+        # Assert
+        assert first is second
+        assert timeline_filename(self.ticks_filename).exists()
+
+    def test_growing_file_not_created(self):
+        # Arrange
+        self.ticks_filename.unlink()
+        parsing_filename(self.ticks_filename).touch()
+        source = TickSource(self.ticks_filename, growing=True)
+        # Act
+        output = len(source.load())
+        # Assert
+        assert output == 0
+        assert not source.complete
+
+    def test_projection_shared(self):
+        # Arrange
+        self.source.load()
+        expected_output = [
+            {"tick": tick["tick"], "round_time": tick["round_time"]}
+            for tick in self.ticks[:3]
+        ]
+        # Act
+        first = self.source.read(0, 3, Subscription(fields=["round_time"]))
+        second = self.source.read(0, 3, Subscription(fields=["round_time"]))
+        # Assert
+        assert [json.loads(tick) for tick in first] == expected_output
+        assert all(a is b for a, b in zip(first, second))
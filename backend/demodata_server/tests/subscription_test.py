@@ -0,0 +1,72 @@
+import json
+import unittest
+from demodata_parser.tests.sample_ticks import sample_tick
+from demodata_server.subscription import Subscription
+
+
+class TestSubscription(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tick = sample_tick(100)
+
+    def test_field_projection(self):
+        # Arrange
+        subscription = Subscription.from_message(
+            {"fields": ["players"], "player_fields": ["x", "y"]}
+        )
+        expected_output = {
+            "tick": 100,
+            "players": [
+                {"sid": 76561198837117408, "x": -163.25, "y": -2178.5}
+            ],
+        }
+        # Act
+        output = subscription.apply(self.tick)
+        # Assert
+        assert output == expected_output
+
+    def test_player_subset(self):
+        # Arrange
+        subscription = Subscription(players=[1])
+        # Act
+        output = subscription.apply(self.tick)
+        # Assert
+        assert output["players"] == []
+        assert output["bomb"] == self.tick["bomb"]
+
+    def test_events_only(self):
+        # Arrange
+        subscription = Subscription(fields=["kills"], events_only=True)
+        kill_tick = sample_tick(101, kills=True)
+        # Act
+        output = [subscription.apply(self.tick), subscription.apply(kill_tick)]
+        # Assert
+        assert output == [None, {"tick": 101, "kills": kill_tick["kills"]}]
+
+    def test_equal_subscriptions(self):
+        # Arrange
+        first = Subscription(fields=["players", "tick"], players=[2, 1])
+        second = Subscription(fields=["tick", "players"], players=[1, 2])
+        # Act & Assert
+        assert first == second
+        assert hash(first) == hash(second)
+
+    def test_full(self):
+        # Act
+        output = Subscription.from_message({"request": "subscribe"})
+        # Assert
+        assert output.is_full()
+
+    def test_frame(self):
+        # Arrange
+        subscription = Subscription(fields=["round_time"])
+        tick_json = json.dumps(self.tick).encode("utf-8")
+        # Act
+        output = subscription.frame(tick_json)
+        # Assert
+        assert json.loads(output) == {"tick": 100, "round_time": 100 / 64}
+
+    def test_unknown_field(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            Subscription(fields=["positions"])
@@ -0,0 +1,56 @@
+import unittest
+from demodata_server.tick_cache import TICK_OVERHEAD, TickCache
+
+
+class TestTickCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ticks = [b'{"tick":1}', None, b'{"tick":3}']
+        self.size = 2 * (len(self.ticks[0]) + TICK_OVERHEAD)
+        self.cache = TickCache(max_bytes=2 * self.size)
+
+    def test_get_counts_hits(self):
+        # Arrange
+        self.cache.put(("demo", None, 0), self.ticks)
+        # Act
+        hit = self.cache.get(("demo", None, 0))
+        miss = self.cache.get(("demo", None, 1))
+        output = self.cache.stats()
+        # Assert
+        assert hit == self.ticks
+        assert miss is None
+        assert output["hit_rate"] == 0.5
+        assert output["bytes"] == self.size
+
+    def test_put_evicts_least_recently_used(self):
+        # Arrange
+        self.cache.put(("demo", None, 0), self.ticks)
+        self.cache.put(("demo", None, 1), self.ticks)
+        self.cache.get(("demo", None, 0))
+        # Act
+        self.cache.put(("demo", None, 2), self.ticks)
+        # Assert
+        assert ("demo", None, 0) in self.cache
+        assert ("demo", None, 1) not in self.cache
+        assert self.cache.stats()["evictions"] == 1
+        assert self.cache.bytes == 2 * self.size
+
+    def test_put_over_budget(self):
+        # Arrange
+        ticks = self.ticks * 3
+        # Act
+        self.cache.put(("demo", None, 0), ticks)
+        # Assert
+        assert len(self.cache) == 0
+        assert self.cache.bytes == 0
+
+    def test_discard_where(self):
+        # Arrange
+        self.cache.put(("demo", None, 0), self.ticks)
+        self.cache.put(("other", None, 0), self.ticks)
+        # Act
+        self.cache.discard_where(lambda key: key[0] == "demo")
+        # Assert
+        assert ("other", None, 0) in self.cache
+        assert len(self.cache) == 1
+        assert self.cache.bytes == self.size
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from collections.abc import Callable
+
+# Bytes of memory per cached tick on top of its frame (bytes object
+# header and list slot)
+TICK_OVERHEAD = 41
+
+
+class TickCache:
+    """Encoded ticks in memory, within a budget of max_bytes.
+
+    Ticks are cached in chunks, under keys that start with the ticks
+    file of the demo. One cache is shared by every TickSource of a
+    server, so a hot demo is read and projected once, and looped or
+    replayed from memory after that. When the budget is exceeded, the
+    least recently used chunks of any demo are dropped.
+    """
+
+    def __init__(self, max_bytes: int = 256 << 20):
+        self.max_bytes: int = max_bytes
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._chunks: OrderedDict[tuple, list[bytes | None]] = OrderedDict()
+        self._sizes: dict[tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._chunks
+
+    def _size(self, ticks: list[bytes | None]) -> int:
+        return sum(
+            len(tick) + TICK_OVERHEAD for tick in ticks if tick is not None
+        )
+
+    def get(self, key: tuple) -> list[bytes | None] | None:
+        """Returns the ticks of a chunk, or None on a miss."""
+        ticks = self._chunks.get(key)
+        if ticks is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._chunks.move_to_end(key)
+        return ticks
+
+    def put(self, key: tuple, ticks: list[bytes | None]) -> None:
+        """Caches the ticks of a chunk, dropping the least recently used."""
+        self.discard(key)
+        size = self._size(ticks)
+        if size > self.max_bytes:
+            return
+        self._chunks[key] = ticks
+        self._sizes[key] = size
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._chunks))
+            self.discard(oldest)
+            self.evictions += 1
+
+    def discard(self, key: tuple) -> None:
+        """Drops a chunk if it is cached."""
+        if self._chunks.pop(key, None) is not None:
+            self.bytes -= self._sizes.pop(key)
+
+    def discard_where(self, predicate: Callable[[tuple], bool]) -> None:
+        """Drops the chunks whose key matches, e.g. the chunks of a demo."""
+        for key in [key for key in self._chunks if predicate(key)]:
+            self.discard(key)
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        """Returns the hit rate and memory use of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "chunks": len(self._chunks),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -1,9 +1,14 @@
 import json
+import time
 import logging
 import argparse
 from pathlib import Path
 from demodata_parser import DemodataParser
+from demodata_parser.batch import BatchParser
+from demodata_parser.tick_index import parsing_filename
 from demodata_server import DemodataServer
+from demodata_server.coordinator import LiveCoordinator
+from demodata_server.scheduler import MIN_SPEED, MAX_SPEED
 from multiprocessing import Process, Queue
 
 # Configure logging
@@ -15,6 +20,9 @@ logging.basicConfig(
 with open(Path(__file__).parent / "settings.json") as f:
     settings_file = json.load(f)
 
+DEMOFILE_FOLDER = Path(__file__).parent / "demofiles"
+PARSED_FOLDER = DEMOFILE_FOLDER / "parsed"  # Batch parsed demos
+
 
 def get_arguments() -> argparse.Namespace:
     """Parse and return command-line arguments."""
@@ -25,10 +33,28 @@ def get_arguments() -> argparse.Namespace:
     parser.add_argument(
         "-f",
         type=str,
-        required=True,
+        required=False,
+        default=None,
         dest="filename",
         help="input CS2 demodata filename: -f mirage.dem",
     )
+    parser.add_argument(
+        "-d",
+        dest="library",
+        action="store_true",
+        required=False,
+        default=False,
+        help="serve every parsed demo in demofiles/ from "
+        f"{settings_file['srv_endpoint']}/<demo_id>: -d",
+    )
+    parser.add_argument(
+        "-i",
+        dest="ingest",
+        action="store_true",
+        required=False,
+        default=False,
+        help="parse every demo in demofiles/ in parallel (to demofiles/parsed/): -i -d",
+    )
     parser.add_argument(
         "-l",
         dest="loop",
@@ -45,6 +71,22 @@ def get_arguments() -> argparse.Namespace:
         default=False,
         help="overwrites previously parsed JSON files: -o -f mirage.med",
     )
+    parser.add_argument(
+        "-b",
+        dest="packed",
+        action="store_true",
+        required=False,
+        default=False,
+        help="write and stream compact binary ticks files: -b -f mirage.dem",
+    )
+    parser.add_argument(
+        "-w",
+        dest="streaming",
+        action="store_true",
+        required=False,
+        default=False,
+        help="start streaming while the demo is still being parsed: -w -f mirage.dem",
+    )
     parser.add_argument(
         "-p",
         dest="frame",
@@ -53,6 +95,22 @@ def get_arguments() -> argparse.Namespace:
         default=1,
         help='play Nth frame, i.e. "-p 2" plays every 2nd frame: -p 2 -f mirage.med',
     )
+    parser.add_argument(
+        "-s",
+        dest="speed",
+        type=float,
+        required=False,
+        default=1.0,
+        help="playback speed from 0.25 to 8: -s 2 -f mirage.dem",
+    )
+    parser.add_argument(
+        "-n",
+        dest="workers",
+        type=int,
+        required=False,
+        default=1,
+        help="run N server worker processes on the same port: -n 4 -f mirage.dem",
+    )
     return parser.parse_args()
 
 
@@ -60,8 +118,7 @@ def get_relative_path(
     filename: str,
 ) -> Path:
     """Get the relative path of the demodata file."""
-    demofile_folder = "demofiles"
-    full_path = Path(__file__).parent / demofile_folder / filename
+    full_path = DEMOFILE_FOLDER / filename
     if not full_path.exists():
         logging.error(f"File {filename} does not exist.")
         return Path()
@@ -73,68 +130,211 @@ def parser_process(
     filename: Path,
     overwrite: bool,
     queue: Queue,
+    packed: bool = False,
 ) -> None:
     """Run the parser process on the demodata file."""
     demodata_parser = DemodataParser()
-    demodata_parser.demofile(filename, overwrite)
+    demodata_parser.demofile(
+        filename,
+        overwrite,
+        packed,
+        settings_file["post_processors"],
+        settings_file["lod_levels"],
+    )
     parser_status = demodata_parser.parse()
     parsed_filename = demodata_parser.parse_filename()
-    queue.put((parser_status, parsed_filename))
+    queue.put((parser_status, parsed_filename, demodata_parser.timings))
 
 
 def server_process(
-    filename: Path,
+    filename: Path | None,
     loop_mode: bool,
     play_nth: int,
+    library_mode: bool = False,
+    packed: bool = False,
+    speed: float = 1.0,
+    growing: bool = False,
+    coordinator: LiveCoordinator | None = None,
+    parse_timings: dict[str, float] | None = None,
 ) -> None:
     """Run the server process to stream the demodata."""
     demodata_server = DemodataServer()
-    demodata_server.ticks_file(filename)
+    if filename is not None:
+        demodata_server.ticks_file(filename)
+    if parse_timings:
+        demodata_server.record_parse_timings(parse_timings)
     demodata_server.start_server(
         settings_file["srv_address"],
         settings_file["srv_port"],
         settings_file["srv_endpoint"],
         loop_mode,
+        demo_folder=DEMOFILE_FOLDER if library_mode else None,
+        library_size=settings_file["library_size"],
+        packed=packed,
+        play_nth=play_nth,
+        speed=speed,
+        queue_size=settings_file["queue_size"],
+        slow_client_policy=settings_file["slow_client_policy"],
+        cache_mb=settings_file["cache_mb"],
+        mapped=settings_file["mapped"],
+        growing=growing,
+        coordinator=coordinator,
+        compression_level=settings_file["compression_level"],
+        compression_mem_level=settings_file["compression_mem_level"],
+        batch_ticks=settings_file["batch_ticks"],
+        processed=bool(settings_file["post_processors"]) and not growing,
+        parse_service=settings_file["parse_service"],
+        parse_workers=settings_file["parse_workers"],
+        processors=settings_file["post_processors"],
+        lod_levels=settings_file["lod_levels"],
+        resume_seconds=settings_file["resume_seconds"],
+        ring_size=settings_file["resume_frames"],
+        metrics=settings_file["metrics"],
+        profiler=settings_file["profiler"],
     )
 
 
 def start_processes(
-    filename: Path,
+    filename: Path | None,
     overwrite: bool,
     loop_mode: bool,
     play_nth: int,
+    library_mode: bool = False,
+    packed: bool = False,
+    speed: float = 1.0,
+    workers: int = 1,
 ) -> None:
-    """Start the parser and server processes."""
+    """Start the parser and server processes.
+
+    With more than one worker, the server processes share the listen port
+    and the live playhead of a LiveCoordinator.
+    """
     process_queue = Queue()
     # Parser
     if filename is not None:
         parser_proc = Process(
-            target=parser_process, args=(filename, overwrite, process_queue)
+            target=parser_process,
+            args=(filename, overwrite, process_queue, packed),
         )
         parser_proc.start()
         parser_proc.join()
-        parser_status, parsed_filename = process_queue.get()
+        parser_status, parsed_filename, parse_timings = process_queue.get()
         filename = parsed_filename
     else:
         parser_status = True
+        parse_timings = None
     # Server
-    if (parser_status or loop_mode) and filename is not None:
-        server_proc = Process(
-            target=server_process, args=(filename, loop_mode, play_nth)
-        )
-        server_proc.start()
-        server_proc.join()
+    if (parser_status or loop_mode) and (filename is not None or library_mode):
+        coordinator = LiveCoordinator() if workers > 1 else None
+        server_procs = [
+            Process(
+                target=server_process,
+                args=(
+                    filename,
+                    loop_mode,
+                    play_nth,
+                    library_mode,
+                    packed,
+                    speed,
+                    False,
+                    coordinator,
+                    parse_timings,
+                ),
+            )
+            for _ in range(max(1, workers))
+        ]
+        for server_proc in server_procs:
+            server_proc.start()
+        for server_proc in server_procs:
+            server_proc.join()
     else:
         logging.error(f"ORCHESTRATOR - Something went wrong!")
 
 
+def start_streaming_processes(
+    filename: Path,
+    overwrite: bool,
+    loop_mode: bool,
+    play_nth: int,
+    packed: bool = False,
+    speed: float = 1.0,
+) -> None:
+    """Start the server as soon as the parser starts writing ticks."""
+    process_queue = Queue()
+    demodata_parser = DemodataParser()
+    demodata_parser.demofile(filename)
+    parsed_filename = demodata_parser.parse_filename()
+    # Parser
+    parser_proc = Process(
+        target=parser_process,
+        args=(filename, overwrite, process_queue, packed),
+    )
+    parser_proc.start()
+    while (
+        parser_proc.is_alive()
+        and not parsing_filename(parsed_filename).exists()
+    ):
+        time.sleep(0.05)
+    # Server, reading the ticks file while it grows
+    server_proc = Process(
+        target=server_process,
+        args=(parsed_filename, loop_mode, play_nth, False, False, speed, True),
+    )
+    server_proc.start()
+    parser_status, _, _ = process_queue.get()
+    parser_proc.join()
+    if not parser_status:
+        logging.error(f"ORCHESTRATOR - Something went wrong!")
+    server_proc.join()
+
+
 if __name__ == "__main__":
     # Set arguments
     args = get_arguments()
-    filename = get_relative_path(args.filename)
+    filename = get_relative_path(args.filename) if args.filename else None
     loop_mode = args.loop
     overwrite_mode = args.overwrite
     play_nth = args.frame
 
-    # Start processes
-    start_processes(filename, overwrite_mode, loop_mode, play_nth)
+    library_mode = args.library
+    packed = args.packed
+    speed = args.speed
+    streaming = args.streaming
+    workers = args.workers
+    if args.ingest:
+        BatchParser(
+            PARSED_FOLDER,
+            settings_file["parse_workers"],
+            packed,
+            settings_file["post_processors"],
+            settings_file["lod_levels"],
+        ).run(DEMOFILE_FOLDER)
+    if filename is None and not library_mode:
+        if not args.ingest:
+            logging.error("ORCHESTRATOR - Give a demo file (-f) or use -d")
+    elif not MIN_SPEED <= speed <= MAX_SPEED:
+        logging.error(
+            f"ORCHESTRATOR - Speed must be from {MIN_SPEED} to {MAX_SPEED}"
+        )
+    elif workers > 1 and library_mode and settings_file["parse_service"]:
+        logging.error(
+            "ORCHESTRATOR - The parse service needs a single worker (-n 1)"
+        )
+    elif streaming and filename is not None:
+        if workers > 1:
+            logging.warning("ORCHESTRATOR - Streaming uses a single worker")
+        start_streaming_processes(
+            filename, overwrite_mode, loop_mode, play_nth, packed, speed
+        )
+    else:
+        # Start processes
+        start_processes(
+            filename,
+            overwrite_mode,
+            loop_mode,
+            play_nth,
+            library_mode,
+            packed,
+            speed,
+            workers,
+        )